@@ -0,0 +1,121 @@
+# benchmarks/result_allocations.py — время и память на шаг Fsm.process_state:
+# ленивый FsmResult против прежнего (eager) FsmResult, который на каждом кадре строил словарь счётчиков,
+# копию истории и datetime.now(). Прежнее поведение воспроизводит EagerFsm — Fsm с исходным _build_result.
+# Память считается по удерживаемым результатам: сколько байт/блоков остаётся за каждым шагом.
+# Непрочитанный удерживаемый ленивый результат занимает меньше байт, но больше блоков (объект снимка счётчиков,
+# float времени, записи журнала отмены), чем прежний; после чтения полей снимки освобождаются
+# и остаются те же значения, что у прежнего результата (вариант "held, read later").
+# Запуск из корня репозитория: python -m benchmarks.result_allocations
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.neuro_fsm.core import FsmManager, Fsm
+from src.neuro_fsm.models.result import FsmResult
+
+STEPS = 20_000
+HELD_STEPS = 2_000
+
+
+class EagerFsm(Fsm):
+    """ Fsm с прежним построением результата: counters/history/timestamp материализуются на каждом кадре. """
+
+    __slots__ = ()
+
+    def _build_result(self, cur_state, stage_done, is_profile_changed):
+        profile = self._profile_manager.active_profile
+        return FsmResult(
+            active_profile=profile.name,
+            prev_profile=self._profile_manager.prev_active_profile.name,
+            state=cur_state,
+            resetter=cur_state.is_resetter,
+            breaker=cur_state.is_breaker,
+            stable=profile.is_state_stable(cur_state),
+            stage_done=stage_done,
+            profile_changed=is_profile_changed,
+            counters=profile.get_counters(),
+            history=profile.get_history(),
+            step_index=self._step_index,
+            timestamp=datetime.now(),
+        )
+
+
+def config(n_states: int) -> dict:
+    return {
+        "ENABLE": True,
+        "STATES": [{"cls_id": i, "name": f"S{i}", "stable_min_lim": 5, "reset_trigger": i % 7 == 0}
+                   for i in range(n_states)],
+        "STATE_PROFILES": [
+            {"name": "p1", "expected_sequences": (("S0", "S1", "S0"),), "init_states": 0, "default_states": 1},
+            {"name": "p2", "expected_sequences": (("S0", "S2", "S0"),), "init_states": 0, "default_states": 1},
+        ],
+        "PROFILE_SWITCHER_STRATEGY": "BY_MAPPED_ID",
+        "DEFAULT_PROFILE": "p1",
+        "PROFILE_IDS_MAP": {"p2": [2], "p1": []},
+        "RAW_HISTORY_WRITER": {"enable": False, "name": "{timestamp}_raw.txt"},
+        "STABLE_HISTORY_WRITER": {"enable": False, "name": "{timestamp}_stable.yaml"},
+    }
+
+
+def stream(n: int) -> list[int]:
+    return [(i // 10) % 3 for i in range(n)]
+
+
+def read_all(result: FsmResult) -> None:
+    result.counters, result.history, result.timestamp
+
+
+def measure(fsm_cls: type, n_states: int, read_fields: bool, read_later: bool = False) -> tuple[float, float, float]:
+    """
+        Возвращает (мкс на шаг, байт на удерживаемый результат, блоков памяти на удерживаемый результат).
+        read_fields — поля читаются на каждом шаге, read_later — у всех удерживаемых результатов после шагов.
+    """
+    fsm = fsm_cls(FsmManager(config(n_states))._config)
+    cls_ids = stream(STEPS)
+
+    start = time.perf_counter()
+    for cls_id in cls_ids:
+        result = fsm.process_state(cls_id)
+        if read_fields:
+            read_all(result)
+        result.stage_done, result.active_profile
+    us_per_step = (time.perf_counter() - start) / STEPS * 1e6
+
+    held = []
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    bytes_before, _ = tracemalloc.get_traced_memory()
+    for cls_id in cls_ids[:HELD_STEPS]:
+        result = fsm.process_state(cls_id)
+        if read_fields:
+            read_all(result)
+        held.append(result)
+    if read_later:
+        for result in held:
+            read_all(result)
+    bytes_after, _ = tracemalloc.get_traced_memory()
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+    return us_per_step, (bytes_after - bytes_before) / HELD_STEPS, (blocks_after - blocks_before) / HELD_STEPS
+
+
+def main() -> None:
+    os.chdir(tempfile.mkdtemp())
+    variants = (
+        ("baseline eager FsmResult", EagerFsm, False),
+        ("lazy, every field read", Fsm, True),
+        ("lazy, stage_done/profile only", Fsm, False),
+        ("lazy, held, read later", Fsm, False, True),
+    )
+    for n_states in (40, 2000):
+        print(f"{n_states} states")
+        for name, fsm_cls, *flags in variants:
+            us, size, blocks = measure(fsm_cls, n_states, *flags)
+            print(f"  {name:32s} {us:8.2f} us/step  {size:10.1f} B/step  {blocks:6.2f} blocks/step")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,36 @@ from .neuro_fsm import FsmConfig
 from .neuro_fsm import ProfileConfig
 from .neuro_fsm import StateConfig
 from .neuro_fsm import HistoryWriterConfig
+from .neuro_fsm import RawHistoryConfig
+from .neuro_fsm import FlightRecorderConfig
 from .neuro_fsm import FsmManager
 from .neuro_fsm import Fsm
+from .neuro_fsm import AsyncFsm
+from .neuro_fsm import FsmPool
+from .neuro_fsm import BaseHistorySink
+from .neuro_fsm import MemoryRingSink
+from .neuro_fsm import SqliteEventSink
+from .neuro_fsm import SqliteEventStore
+from .neuro_fsm import LogRetentionManager
+from .neuro_fsm import HistoryFilePool
+from .neuro_fsm import ConfigCatalog
+from .neuro_fsm import FlightRecorder
+from .neuro_fsm import BinaryRawHistoryReader
+from .neuro_fsm import JsonlEventReader
+from .neuro_fsm import StableRuntimeReader
+from .neuro_fsm import SqliteEventReader
+from .neuro_fsm import open_history_log
 from .neuro_fsm import FsmResult
+from .neuro_fsm import FsmBatchResult
+from .neuro_fsm import FsmPoolResult
+from .neuro_fsm import FsmStepFlags
 from .neuro_fsm import ProfileSwitcherStrategies
 from .neuro_fsm import ProfileNames
+from .neuro_fsm import CountersModes
+from .neuro_fsm import HistoryLengthUnits
+from .neuro_fsm import WriterOverflowPolicies
+from .neuro_fsm import HistoryFormats
+from .neuro_fsm import HistorySinks
+from .neuro_fsm import HistoryCompressions
 from .neuro_fsm import State
 from .neuro_fsm import ActiveProfileView
@@ -2,12 +2,40 @@ from .configs import FsmConfig
 from .configs import ProfileConfig
 from .configs import StateConfig
 from .configs import HistoryWriterConfig
+from .configs import RawHistoryConfig
+from .configs import FlightRecorderConfig
 
 from .core import FsmManager
 from .core import Fsm
+from .core import AsyncFsm
+from .core import FsmPool
 from .core import State
 from .core import ActiveProfileView
 
+from .history_writer import BaseHistorySink
+from .history_writer import MemoryRingSink
+from .history_writer import SqliteEventSink
+from .history_writer import SqliteEventStore
+from .history_writer import LogRetentionManager
+from .history_writer import HistoryFilePool
+from .history_writer import ConfigCatalog
+from .history_writer import FlightRecorder
+
+from .history_reader import BinaryRawHistoryReader
+from .history_reader import JsonlEventReader
+from .history_reader import StableRuntimeReader
+from .history_reader import SqliteEventReader
+from .history_reader import open_history_log
+
 from .models import FsmResult
+from .models import FsmBatchResult
+from .models import FsmPoolResult
+from .models import FsmStepFlags
 from .models import ProfileSwitcherStrategies
 from .models import ProfileNames
+from .models import CountersModes
+from .models import HistoryLengthUnits
+from .models import WriterOverflowPolicies
+from .models import HistoryFormats
+from .models import HistorySinks
+from .models import HistoryCompressions
@@ -6,8 +6,11 @@ from typing import Any, ClassVar, Union, Iterable
 
 from ..configs.state_config import StateConfig, StateConfigDict, StateConfigTuple, StateConfigTupleTuple
 from ..configs.history_writer_config import HistoryWriterConfig
-from ..models import ProfileSwitcherStrategies, ProfileNames
-from .parsing_utils import normalize_enum_str
+from ..configs.raw_history_config import RawHistoryConfig
+from ..configs.flight_recorder_config import FlightRecorderConfig
+from ..models import ProfileSwitcherStrategies, ProfileNames, CountersModes, HistoryLengthUnits, FsmStepFlags, \
+    WriterOverflowPolicies, HistoryFormats, HistorySinks, HistoryCompressions
+from .parsing_utils import normalize_enum_str, parse_bool
 from .config_keys import ConfigKeys
 
 
@@ -53,6 +56,19 @@ class BaseconfigParser(ABC):
                 raise ValueError(f"ProfileSwitcherStrategies has no member '{value}'")
         raise TypeError(f"Cannot parse ProfileSwitcherStrategies from value: {value!r}")
 
+    @staticmethod
+    def _parse_counters_mode(value: str | None | CountersModes) -> CountersModes:
+        if value is None:
+            return CountersModes.DENSE
+        if isinstance(value, Enum):
+            return CountersModes[value.name]
+        if isinstance(value, str):
+            try:
+                return CountersModes[value.upper()]
+            except KeyError:
+                raise ValueError(f"CountersModes has no member '{value}'")
+        raise TypeError(f"Cannot parse CountersModes from value: {value!r}")
+
     @staticmethod
     def _parse_profile_ids_map(value: Union[dict[str, Any], None]) -> dict[str, list[Any]]:
         """
@@ -113,15 +129,154 @@ class BaseconfigParser(ABC):
         fields = data.get("fields", ())
         if isinstance(fields, list):
             fields = tuple(fields)
+        # Необязательные настройки писателя (политика сброса, фон, приёмники, формат): по умолчанию — значения HistoryWriterConfig
+        options = {
+            key: cast(data[key])
+            for key, cast in (("flush_bytes", int), ("flush_records", int), ("flush_interval", float))
+            if key in data
+        }
+        if "flush_on_events" in data:
+            options["flush_on_events"] = BaseconfigParser._parse_step_flags(data["flush_on_events"])
+        # Необязательные настройки фонового режима
+        if "background" in data:
+            options["background"] = parse_bool(data["background"])
+        for key in ("queue_size", "sample_every"):
+            if key in data:
+                options[key] = int(data[key])
+        if "sinks" in data:
+            options["sinks"] = BaseconfigParser._parse_history_sinks(data["sinks"])
+        if "memory_capacity" in data:
+            options["memory_capacity"] = int(data["memory_capacity"])
+        if "sqlite_path" in data:
+            options["sqlite_path"] = str(data["sqlite_path"])
+        if "sqlite_batch_size" in data:
+            options["sqlite_batch_size"] = int(data["sqlite_batch_size"])
+        if "log_format" in data:
+            options["log_format"] = BaseconfigParser._parse_history_format(data["log_format"])
+        if "compression" in data:
+            options["compression"] = BaseconfigParser._parse_history_compression(data["compression"])
+        if "retention_interval" in data:
+            options["retention_interval"] = float(data["retention_interval"])
+        for key in ("compression_level", "compression_block_bytes", "max_total_bytes", "runtime_keyframe_every"):
+            if key in data:
+                options[key] = int(data[key])
+        if "overflow_policy" in data:
+            options["overflow_policy"] = BaseconfigParser._parse_overflow_policy(data["overflow_policy"])
         # Конструктор
         return HistoryWriterConfig(
             name=data["name"],
             fields=fields,
             enable=data.get("enable", False),
             max_age_days=int(data.get("max_age_days", 14)),
-            async_mode=bool(data.get("async_mode", False))
+            async_mode=bool(data.get("async_mode", False)),
+            **options
         )
 
+    @staticmethod
+    def _parse_history_sinks(value: str | HistorySinks | Iterable | None) -> tuple[HistorySinks, ...]:
+        """ Приводит имя приёмника или список имён к кортежу HistorySinks (None — без приёмников). """
+        if value is None:
+            return ()
+        if isinstance(value, (str, Enum)):
+            value = (value, )
+        sinks = []
+        for item in value:
+            name = normalize_enum_str(item, case="upper") if isinstance(item, str) else item.name
+            try:
+                sinks.append(HistorySinks[name])
+            except KeyError:
+                raise ValueError(f"HistorySinks has no member '{item}'")
+        return tuple(sinks)
+
+    @staticmethod
+    def _parse_history_format(value: str | HistoryFormats) -> HistoryFormats:
+        if isinstance(value, Enum):
+            return HistoryFormats[value.name]
+        if isinstance(value, str):
+            try:
+                return HistoryFormats[value.upper()]
+            except KeyError:
+                raise ValueError(f"HistoryFormats has no member '{value}'")
+        raise TypeError(f"Cannot parse HistoryFormats from value: {value!r}")
+
+    @staticmethod
+    def _parse_history_compression(value: str | HistoryCompressions | None) -> HistoryCompressions:
+        """ Приводит имя сжатия к HistoryCompressions (None / false — без сжатия). """
+        if value is None or value is False:
+            return HistoryCompressions.NONE
+        if isinstance(value, Enum):
+            return HistoryCompressions[value.name]
+        if isinstance(value, str):
+            try:
+                return HistoryCompressions[value.upper()]
+            except KeyError:
+                raise ValueError(f"HistoryCompressions has no member '{value}'")
+        raise TypeError(f"Cannot parse HistoryCompressions from value: {value!r}")
+
+    @staticmethod
+    def _parse_overflow_policy(value: str | WriterOverflowPolicies) -> WriterOverflowPolicies:
+        if isinstance(value, Enum):
+            return WriterOverflowPolicies[value.name]
+        if isinstance(value, str):
+            try:
+                return WriterOverflowPolicies[value.upper()]
+            except KeyError:
+                raise ValueError(f"WriterOverflowPolicies has no member '{value}'")
+        raise TypeError(f"Cannot parse WriterOverflowPolicies from value: {value!r}")
+
+    @staticmethod
+    def _parse_step_flags(value: str | int | Iterable | None | FsmStepFlags) -> FsmStepFlags:
+        """ Приводит имя события, список имён или число к FsmStepFlags (None / пустой список — без событий). """
+        if value is None:
+            return FsmStepFlags.NONE
+        if isinstance(value, (int, FsmStepFlags)):
+            return FsmStepFlags(value)
+        if isinstance(value, str):
+            value = (value, )
+        flags = FsmStepFlags.NONE
+        for name in value:
+            try:
+                flags |= FsmStepFlags[normalize_enum_str(name, case="upper")]
+            except KeyError:
+                raise ValueError(f"FsmStepFlags has no member '{name}'")
+        return flags
+
+    @staticmethod
+    def _parse_raw_history_config(data: dict[str, Any] | None) -> RawHistoryConfig:
+        if data is None:
+            return RawHistoryConfig()
+        unit = data.get("unit", HistoryLengthUnits.RUNS)
+        if isinstance(unit, str):
+            try:
+                unit = HistoryLengthUnits[unit.upper()]
+            except KeyError:
+                raise ValueError(f"HistoryLengthUnits has no member '{unit}'")
+        elif isinstance(unit, Enum):
+            unit = HistoryLengthUnits[unit.name]
+        else:
+            raise TypeError(f"Cannot parse HistoryLengthUnits from value: {unit!r}")
+        return RawHistoryConfig(
+            max_len=int(data.get("max_len", 100)),
+            unit=unit
+        )
+
+    @staticmethod
+    def _parse_flight_recorder_config(data: dict[str, Any] | None) -> FlightRecorderConfig:
+        """ Настройки бортового самописца; отсутствующие ключи — значения FlightRecorderConfig. """
+        if data is None:
+            return FlightRecorderConfig()
+        options: dict[str, Any] = {}
+        if "enable" in data:
+            options["enable"] = parse_bool(data["enable"])
+        for key in ("capacity", "max_age_days"):
+            if key in data:
+                options[key] = int(data[key])
+        if "triggers" in data:
+            options["triggers"] = BaseconfigParser._parse_step_flags(data["triggers"])
+        if "name" in data:
+            options["name"] = str(data["name"])
+        return FlightRecorderConfig(**options)
+
     @staticmethod
     def _map_sequence(seq_list: list, state_configs: StateConfigDict) -> StateConfigTupleTuple:
         """
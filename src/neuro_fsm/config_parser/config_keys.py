@@ -16,6 +16,9 @@ class ConfigKeys:
     RAW_HISTORY_WRITER = 'RAW_HISTORY_WRITER'
     STABLE_HISTORY_WRITER = 'STABLE_HISTORY_WRITER'
     PROFILE_IDS_MAP = 'PROFILE_IDS_MAP'
+    COUNTERS_MODE = 'COUNTERS_MODE'
+    RAW_HISTORY = 'RAW_HISTORY'
+    FLIGHT_RECORDER = 'FLIGHT_RECORDER'
 
     ALL = {
         STATES,
@@ -29,6 +32,9 @@ class ConfigKeys:
         RAW_HISTORY_WRITER,
         STABLE_HISTORY_WRITER,
         PROFILE_IDS_MAP,
+        COUNTERS_MODE,
+        RAW_HISTORY,
+        FLIGHT_RECORDER,
     }
 
     @classmethod
@@ -30,6 +30,9 @@ class ConfigWithProfileParser(BaseconfigParser):
             ],
             "PROFILE_SWITCHER_STRATEGY": "mixed",
             "DEFAULT_PROFILE": ProfileNames.EMPTY_THEN_FILL,
+            "COUNTERS_MODE": "sparse", # optional: dense (по умолчанию) | sparse | auto
+            "RAW_HISTORY": {"max_len": 100, "unit": "runs"}, # optional: unit — frames | runs (по умолчанию)
+            "FLIGHT_RECORDER": {"enable": true, "capacity": 4096, "triggers": ["profile_changed", "breaker"]}, # optional
         }
     """
 
@@ -50,6 +53,9 @@ class ConfigWithProfileParser(BaseconfigParser):
         profile_ids_map = self._parse_profile_ids_map(self._config.get(ConfigKeys.PROFILE_IDS_MAP, None))
         raw_history_writer = self._parse_history_writer_config(self._config.get(ConfigKeys.RAW_HISTORY_WRITER, None))
         stable_history_writer = self._parse_history_writer_config(self._config.get(ConfigKeys.STABLE_HISTORY_WRITER, None))
+        counters_mode = self._parse_counters_mode(self._config.get(ConfigKeys.COUNTERS_MODE, None))
+        raw_history = self._parse_raw_history_config(self._config.get(ConfigKeys.RAW_HISTORY, None))
+        flight_recorder = self._parse_flight_recorder_config(self._config.get(ConfigKeys.FLIGHT_RECORDER, None))
 
         base_state_configs = StateConfigParser.build_dict(self._config[ConfigKeys.STATES])
 
@@ -90,5 +96,8 @@ class ConfigWithProfileParser(BaseconfigParser):
             profile_ids_map=profile_ids_map,
             meta=self._extract_meta(),
             raw_history_writer=raw_history_writer,
-            stable_history_writer=stable_history_writer
+            stable_history_writer=stable_history_writer,
+            counters_mode=counters_mode,
+            raw_history=raw_history,
+            flight_recorder=flight_recorder
         )
@@ -2,3 +2,5 @@ from .fsm_config import FsmConfig
 from .profile_config import ProfileConfig
 from .state_config import StateConfig
 from .history_writer_config import HistoryWriterConfig
+from .raw_history_config import RawHistoryConfig
+from .flight_recorder_config import FlightRecorderConfig
@@ -0,0 +1,33 @@
+__all__ = ['FlightRecorderConfig']
+
+from dataclasses import dataclass
+
+from ..models.enums import FsmStepFlags
+
+
+@dataclass(frozen=True, slots=True)
+class FlightRecorderConfig:
+    """
+        Настройки бортового самописца FSM (FlightRecorder).
+        Самописец держит в памяти последние capacity записей сырого входа (step, cls_id, run_length, confidence,
+        флаги шага) и при срабатывании триггера дописывает их в двоичный файл в фоне — вместо постоянного
+        сырого лога на диске остаются только кадры, предшествующие интересным событиям.
+        Args:
+            enable (bool): Включён ли самописец.
+            capacity (int): Ёмкость кольцевого буфера (записей; серия тихих кадров — одна запись).
+            triggers (FsmStepFlags): Флаги шага, по которым буфер сбрасывается в файл
+                                     (вручную — Fsm.dump_flight_recorder()).
+            name (str): Имя файла в fsm_logs/ (подстановки {timestamp} и {stream}, как у писателей истории).
+            max_age_days (int): Файлы самописца старше указанного числа дней удаляются LogRetentionManager.
+    """
+    enable: bool = False
+    capacity: int = 4096
+    triggers: FsmStepFlags = FsmStepFlags.PROFILE_CHANGED | FsmStepFlags.BREAKER
+    name: str = "{timestamp}_flight.bin"
+    max_age_days: int = 14
+
+    def __post_init__(self):
+        if self.capacity <= 0:
+            raise ValueError(f"[{__class__.__name__}] capacity must be > 0, got {self.capacity}")
+        if self.max_age_days < 0:
+            raise ValueError(f"[{__class__.__name__}] max_age_days must be >= 0, got {self.max_age_days}")
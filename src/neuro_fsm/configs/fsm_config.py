@@ -2,12 +2,16 @@ from __future__ import annotations
 
 __all__ = ['FsmConfig']
 
+import hashlib
+import json
 from typing import Optional, Any
 
+from .flight_recorder_config import FlightRecorderConfig
 from .history_writer_config import HistoryWriterConfig
 from .profile_config import ProfileConfigTuple
+from .raw_history_config import RawHistoryConfig
 from .state_config import StateConfig, StateConfigDict
-from ..models.enums import ProfileSwitcherStrategies, ProfileNames
+from ..models.enums import ProfileSwitcherStrategies, ProfileNames, CountersModes
 
 
 class FsmConfig:
@@ -30,7 +34,10 @@ class FsmConfig:
             profile_ids_map,
             meta: dict[str, Any],
             raw_history_writer: HistoryWriterConfig,
-            stable_history_writer: HistoryWriterConfig
+            stable_history_writer: HistoryWriterConfig,
+            counters_mode: CountersModes = CountersModes.DENSE,
+            raw_history: RawHistoryConfig = RawHistoryConfig(),
+            flight_recorder: FlightRecorderConfig = FlightRecorderConfig()
     ) -> None:
         self._enable: bool = enable
         self._state_configs: StateConfigDict = state_configs
@@ -41,6 +48,11 @@ class FsmConfig:
         self._meta: dict[str, Any] = meta
         self._raw_history_writer: HistoryWriterConfig = raw_history_writer
         self._stable_history_writer: HistoryWriterConfig = stable_history_writer
+        self._counters_mode: CountersModes = counters_mode
+        self._raw_history: RawHistoryConfig = raw_history
+        self._flight_recorder: FlightRecorderConfig = flight_recorder
+        # Хэш содержимого (считается один раз, см. config_hash)
+        self._config_hash: Optional[str] = None
 
     @property
     def enable(self) -> bool:
@@ -80,6 +92,28 @@ class FsmConfig:
     def stable_history_writer(self) -> HistoryWriterConfig:
         return self._stable_history_writer
 
+    @property
+    def counters_mode(self) -> CountersModes:
+        """ Способ хранения счётчиков в профилях (плотный / разреженный / авто). """
+        return self._counters_mode
+
+    @property
+    def raw_history(self) -> RawHistoryConfig:
+        """ Настройки сырой истории состояний (граница длины и её единицы). """
+        return self._raw_history
+
+    @property
+    def flight_recorder(self) -> FlightRecorderConfig:
+        """ Настройки бортового самописца (кольцевой буфер сырого входа, сбрасываемый по триггерам). """
+        return self._flight_recorder
+
+    @property
+    def config_hash(self) -> str:
+        """ Хэш содержимого конфигурации (ключ в ConfigCatalog); считается при первом обращении. """
+        if self._config_hash is None:
+            self._config_hash = hashlib.sha256(self.to_json().encode('utf-8')).hexdigest()[:16]
+        return self._config_hash
+
     def get_state_by_cls_id(self, cls_id: int) -> Optional[StateConfig]:
         return self.state_configs.get(cls_id) if self.state_configs else None
 
@@ -102,6 +136,7 @@ class FsmConfig:
         self._enable = False
         self._profile_configs = None
         self._meta = None
+        self._config_hash = None
 
     def to_dict(self) -> dict:
         return {
@@ -110,4 +145,10 @@ class FsmConfig:
             "profile_configs": [profile_config.to_dict() for profile_config in self._profile_configs],
             "switcher_strategy": self._switcher_strategy.name,
             "def_profile": self._def_profile,
+            "counters_mode": self._counters_mode.name,
+            "raw_history": {"max_len": self._raw_history.max_len, "unit": self._raw_history.unit.name},
         }
+
+    def to_json(self) -> str:
+        """ Каноническое JSON-представление to_dict() (ключи отсортированы): одинаковые конфигурации дают одну строку. """
+        return json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
@@ -2,11 +2,110 @@ __all__ = ['HistoryWriterConfig']
 
 from dataclasses import dataclass
 
+from ..models.enums import FsmStepFlags, WriterOverflowPolicies, HistoryFormats, HistorySinks, HistoryCompressions
+
 
 @dataclass(frozen=True, slots=True)
 class HistoryWriterConfig:
+    """
+        Настройки писателя истории.
+        enable (bool): Писать ли историю. Выключенный писатель (или пустой sinks) заменяется NullHistoryWriter:
+                       FSM не создаёт файлов и не форматирует записи.
+        sinks (tuple[HistorySinks, ...]): Приёмники записей; несколько — запись уходит во все (fan-out).
+        memory_capacity (int): Ёмкость кольцевого буфера приёмника MEMORY (записей).
+        Приёмник SQLITE (только стабильная история; общий SqliteEventStore на файл базы, запись пачками в фоне):
+            sqlite_path (str): Имя файла базы в fsm_logs/ (общая для всех FSM процесса с тем же именем).
+            sqlite_batch_size (int): Строк в пачке (одна транзакция); неполная пачка пишется не позже
+                                     flush_interval секунд и при закрытии писателя (flush_on_events
+                                     на пачки не влияет, чтобы частые события не дробили транзакции).
+        Хранение логов (общий LogRetentionManager каталога, очистка в фоне):
+            max_age_days (int): Файлы старше указанного числа дней удаляются.
+            max_total_bytes (int): Суммарный объём файлов с тем же суффиксом; сверх него удаляются самые старые
+                                   (0 — без лимита).
+            retention_interval (float): Период фоновой очистки, секунд.
+        log_format (HistoryFormats): Формат файла. Для BINARY (только сырая история) fields задаёт
+                                     необязательные колонки: "confidence", "timestamp", "run_length".
+                                     JSONL — только для стабильной истории.
+        compression (HistoryCompressions): Потоковое сжатие файла (к имени добавляется .gz / .xz).
+                                           Файл — последовательность независимо сжатых блоков, поэтому при аварии
+                                           теряется не больше одного блока, а файл читается потоково
+                                           (open_history_log, JsonlEventReader). С BINARY не совместимо.
+                                           Сжатое выталкивается на диск явным flush() писателя (в том числе
+                                           по flush_on_events), сбросом по flush_interval и завершением блока;
+                                           сброс по flush_records / flush_bytes сжатое не выталкивает.
+                                           gzip выталкивает без завершения блока (Z_SYNC_FLUSH), xz-поток
+                                           читается только завершённым, поэтому такой сброс завершает блок xz.
+                                           Каждый блок xz сжимается с пустым словарём, поэтому при частых
+                                           событиях выгоднее gzip или flush_on_events=[].
+        compression_level (int): Уровень сжатия 0..9 (compresslevel для gzip, preset для LZMA).
+        compression_block_bytes (int): Несжатый объём блока; блок завершается также при закрытии файла.
+        runtime_keyframe_every (int): Снимки RUNTIME стабильной истории пишутся разностно (только изменившиеся
+                                      счётчики и истории профилей); каждый runtime_keyframe_every-й снимок —
+                                      полный (ключевой), с него читатель восстанавливает состояние
+                                      (1 — все снимки полные).
+        Политика сброса буфера на диск (срабатывает первое выполненное условие; 0 — условие отключено).
+        По умолчанию, как и раньше, буфер сбрасывается после каждой записи (flush_records=1); буферизация
+        включается явно, например flush_records=0, flush_bytes=65536, flush_interval=1.0:
+            flush_bytes (int): Накоплено не меньше указанного числа байт (символов) с последнего сброса.
+            flush_records (int): Записано не меньше указанного числа записей (1 — сброс после каждой записи).
+            flush_interval (float): С последнего сброса прошло не меньше указанного числа секунд
+                                    (проверяется при очередной записи).
+            flush_on_events (FsmStepFlags): События шага FSM, после которых буфер сбрасывается сразу.
+        При закрытии писателя и при завершении интерпретатора буфер сбрасывается всегда.
+        Фоновый режим (запись не блокирует поток инференса):
+            background (bool): Писатель кладёт готовые строки в ограниченную очередь, которую разбирает отдельный поток.
+            queue_size (int): Ёмкость очереди (записей).
+            overflow_policy (WriterOverflowPolicies): Поведение при переполнении очереди.
+            sample_every (int): Для SAMPLE — при переполнении сохраняется каждая sample_every-я запись.
+        Сырой и стабильный писатели одной FSM делят одну очередь: если фоновые оба, queue_size, overflow_policy
+        и sample_every у них должны совпадать (иначе ValueError при создании FSM).
+    """
     name: str
     fields: tuple
     enable: bool = False
     max_age_days: int = 14
     async_mode: bool = False
+    flush_bytes: int = 0
+    flush_records: int = 1
+    flush_interval: float = 1.0
+    flush_on_events: FsmStepFlags = FsmStepFlags.STAGE_DONE | FsmStepFlags.PROFILE_CHANGED
+    background: bool = False
+    queue_size: int = 10000
+    overflow_policy: WriterOverflowPolicies = WriterOverflowPolicies.BLOCK
+    sample_every: int = 10
+    log_format: HistoryFormats = HistoryFormats.TEXT
+    sinks: tuple[HistorySinks, ...] = (HistorySinks.FILE, )
+    memory_capacity: int = 10000
+    sqlite_path: str = "fsm_events.sqlite"
+    sqlite_batch_size: int = 1000
+    compression: HistoryCompressions = HistoryCompressions.NONE
+    compression_level: int = 6
+    compression_block_bytes: int = 1024 * 1024
+    max_total_bytes: int = 0
+    retention_interval: float = 3600.0
+    runtime_keyframe_every: int = 16
+
+    def __post_init__(self):
+        if self.flush_bytes < 0 or self.flush_records < 0 or self.flush_interval < 0:
+            raise ValueError(f"[{__class__.__name__}] flush_bytes, flush_records and flush_interval must be >= 0")
+        if self.queue_size <= 0 or self.sample_every <= 0 or self.memory_capacity <= 0 \
+                or self.runtime_keyframe_every <= 0 or self.sqlite_batch_size <= 0:
+            raise ValueError(f"[{__class__.__name__}] queue_size, sample_every, memory_capacity, "
+                             f"runtime_keyframe_every and sqlite_batch_size must be > 0")
+        if self.max_age_days < 0 or self.max_total_bytes < 0 or self.retention_interval <= 0:
+            raise ValueError(f"[{__class__.__name__}] max_age_days and max_total_bytes must be >= 0, "
+                             f"retention_interval > 0")
+        if not 0 <= self.compression_level <= 9 or self.compression_block_bytes <= 0:
+            raise ValueError(f"[{__class__.__name__}] compression_level must be in 0..9, compression_block_bytes > 0")
+        if self.compression is not HistoryCompressions.NONE and self.log_format is HistoryFormats.BINARY:
+            raise ValueError(f"[{__class__.__name__}] BINARY history is memory-mapped and cannot be compressed")
+
+    @property
+    def is_active(self) -> bool:
+        """ Пишется ли история хотя бы в один приёмник. """
+        return self.enable and bool(self.sinks)
+
+    @property
+    def writes_file(self) -> bool:
+        """ Пишется ли история в файл. """
+        return self.is_active and HistorySinks.FILE in self.sinks
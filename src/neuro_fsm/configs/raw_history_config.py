@@ -0,0 +1,21 @@
+__all__ = ['RawHistoryConfig']
+
+from dataclasses import dataclass
+
+from ..models.enums import HistoryLengthUnits
+
+
+@dataclass(frozen=True, slots=True)
+class RawHistoryConfig:
+    """
+        Настройки сырой истории (RawStateHistory).
+        Args:
+            max_len (int): Граница длины истории.
+            unit (HistoryLengthUnits): В чём измеряется max_len: в кадрах или в сериях (runs) одинаковых cls_id.
+    """
+    max_len: int = 100
+    unit: HistoryLengthUnits = HistoryLengthUnits.RUNS
+
+    def __post_init__(self):
+        if self.max_len <= 0:
+            raise ValueError(f"[{__class__.__name__}] max_len must be > 0, got {self.max_len}")
@@ -1,4 +1,6 @@
 from .fsm import Fsm
+from .async_fsm import AsyncFsm
 from .fsm_manager import FsmManager
+from .fsm_pool import FsmPool
 from .states import State
 from .active_profile_view import ActiveProfileView
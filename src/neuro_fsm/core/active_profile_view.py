@@ -25,6 +25,8 @@ class ActiveProfileView:
             - Импорты типов — только под TYPE_CHECKING, чтобы не ломать рантайм.
     """
 
+    __slots__ = ('_active_profile',)
+
     def __init__(self, profile: Profile) -> None:
         self._active_profile: Profile = profile
 
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+__all__ = ['AsyncFsm']
+
+import asyncio
+import math
+from typing import Any, ClassVar, Iterable, Sequence
+
+from ..configs import FsmConfig
+from ..history_writer import (AsyncBinaryRawHistoryWriter, AsyncJsonlStableHistoryWriter, AsyncRawHistoryWriter,
+                              AsyncStableHistoryWriter, NullHistoryWriter)
+from ..models.batch_result import FsmBatchResult
+from ..models.enums import HistoryFormats
+from ..models.result import FsmResult
+from .fsm import Fsm
+
+
+class AsyncFsm(Fsm):
+    """
+        Машина состояний для asyncio-конвейеров.
+        Логика шага та же, что у Fsm (синхронная и быстрая), но история пишется асинхронными писателями:
+        на шаге записи только копятся в памяти, а process_state()/process_batch() после шага ожидают
+        drain() писателей — перенос накопленного на диск одной операцией (через общий HistoryFilePool
+        в потоке исполнителя), и только когда сработала политика сброса из HistoryWriterConfig.
+        Цикл событий не блокируется диском.
+        Закрывать — через aclose() (или async with); синхронный close() дописывает накопленное блокирующей записью.
+    """
+
+    __slots__ = ()
+
+    RAW_WRITERS: ClassVar[dict[HistoryFormats, type]] = {
+        HistoryFormats.TEXT: AsyncRawHistoryWriter,
+        HistoryFormats.BINARY: AsyncBinaryRawHistoryWriter,
+    }
+    STABLE_WRITERS: ClassVar[dict[HistoryFormats, type]] = {
+        HistoryFormats.TEXT: AsyncStableHistoryWriter,
+        HistoryFormats.JSONL: AsyncJsonlStableHistoryWriter,
+    }
+
+    def _create_writers(
+            self, config: FsmConfig
+    ) -> tuple[AsyncRawHistoryWriter | AsyncBinaryRawHistoryWriter | NullHistoryWriter,
+               AsyncStableHistoryWriter | AsyncJsonlStableHistoryWriter | NullHistoryWriter]:
+        """
+            Создаёт асинхронных писателей истории по форматам из конфигурации
+            (фоновая очередь не используется; выключенные — NullHistoryWriter).
+        """
+        raw_format = config.raw_history_writer.log_format
+        stable_format = config.stable_history_writer.log_format
+        if raw_format not in self.RAW_WRITERS:
+            raise ValueError(f"[{self.__class__.__name__}] Unsupported raw history format: {raw_format.name}")
+        if stable_format not in self.STABLE_WRITERS:
+            raise ValueError(f"[{self.__class__.__name__}] Unsupported stable history format: {stable_format.name}")
+        return (
+            self.RAW_WRITERS[raw_format](config.raw_history_writer, self._stream_id)
+            if config.raw_history_writer.is_active else NullHistoryWriter(),
+            self.STABLE_WRITERS[stable_format](config.stable_history_writer, self._stream_id)
+            if config.stable_history_writer.is_active else NullHistoryWriter(),
+        )
+
+    async def process_state(self, cls_id: int) -> FsmResult:
+        """ Асинхронный вариант Fsm.process_state(): шаг и перенос истории на диск по политике сброса. """
+        result = super().process_state(cls_id)
+        await self.drain()
+        return result
+
+    async def process_batch(self, cls_ids: Iterable[int]) -> FsmBatchResult:
+        """ Асинхронный вариант Fsm.process_batch(): история всей пачки переносится на диск после неё. """
+        result = super().process_batch(cls_ids)
+        await self.drain()
+        return result
+
+    async def process_run(self, cls_id: int, count: int) -> list[FsmResult]:
+        """ Асинхронный вариант Fsm.process_run(). """
+        results = super().process_run(cls_id, count)
+        await self.drain()
+        return results
+
+    async def process_scores(self, scores: Sequence[float]) -> FsmResult:
+        """ Асинхронный вариант Fsm.process_scores() (выбранный класс обрабатывается через process_state()). """
+        cls_id, self._confidence = self._choose_cls_id(scores)
+        try:
+            return await self.process_state(cls_id)
+        finally:
+            self._confidence = math.nan
+
+    async def process_scores_batch(self, scores: Any) -> FsmBatchResult:
+        """ Асинхронный вариант Fsm.process_scores_batch(). """
+        result = super().process_scores_batch(scores)
+        await self.drain()
+        return result
+
+    async def drain(self, force: bool = False) -> None:
+        """ Переносит накопленные записи писателей на диск (force — независимо от политики сброса). """
+        await self._raw_history_writer.drain(force)
+        await self._stable_history_writer.drain(force)
+
+    async def aclose(self) -> None:
+        """ Дописывает всё накопленное и закрывает дескрипторы писателей (и ждёт сбросов самописца). """
+        await self._raw_history_writer.aclose()
+        await self._stable_history_writer.aclose()
+        if self._recorder is not None and self._recorder.pending is not None:
+            await asyncio.wrap_future(self._recorder.pending)
+
+    def close(self) -> None:
+        """ Синхронно дописывает накопленное (для вызова вне цикла событий, например из FsmManager.destroy()). """
+        self._raw_history_writer._close()
+        self._stable_history_writer._close()
+        if self._recorder is not None:
+            self._recorder.close()
+
+    async def __aenter__(self) -> AsyncFsm:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
@@ -1,2 +1,4 @@
 from .stable_state_counters import StableStateCounters
+from .sparse_state_counters import SparseStateCounters
+from .counters_journal import CountersJournal, CountersSnapshot
 from .types import CountersDict
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+__all__ = ['CountersJournal', 'CountersSnapshot']
+
+from typing import Any, Optional
+
+from ...models.result import LazySnapshot
+from ..states import State
+from ..states.types import StateDict
+from .types import CountersDict
+
+
+class _JournalSegment:
+    """ Участок журнала: записи отмены по порядку изменений и копия значений на момент закрытия (None — открыт). """
+
+    __slots__ = ('entries', 'end')
+
+    def __init__(self) -> None:
+        self.entries: list[tuple] = []
+        self.end: Any = None
+
+
+class CountersSnapshot(LazySnapshot):
+    """
+        Снимок счётчиков на момент CountersJournal.snapshot(): позиция в участке журнала, значения не копируются.
+        Словарь строится при первом чтении — откатом значений конца участка по его записям до позиции снимка.
+    """
+
+    __slots__ = ('_counters', '_segment', '_position', '_values')
+
+    def __init__(self, counters: CountersJournal, segment: _JournalSegment) -> None:
+        self._counters: Optional[CountersJournal] = counters
+        self._segment: Optional[_JournalSegment] = segment
+        self._position: int = len(segment.entries)
+        self._values: Optional[CountersDict] = None
+
+    def as_dict(self) -> CountersDict:
+        """ Счётчики снимка {cls_id: count}. """
+        if self._values is None:
+            self._values = self._counters.rollback(self._segment, self._position)
+            self._segment = None
+        return self._values
+
+    def materialize(self) -> dict[State, int]:
+        """ Счётчики снимка {State: count} (значение поля FsmResult.counters). """
+        states = self._counters.states
+        return {states[cls_id]: count for cls_id, count in self.as_dict().items()}
+
+
+class CountersJournal:
+    """
+        Журнал отмены изменений счётчиков — основа снимков без копирования (StableStateCounters, SparseStateCounters).
+        Снимок — позиция в текущем участке журнала. Пока у участка есть снимки, каждое изменение перед применением
+        дописывает в него запись для своей отмены. Участок закрывается, набрав max(MIN_LENGTH, размер) записей:
+        в него кладётся одна копия текущих значений, а следующий снимок начинает новый участок.
+        Снимок материализуется при чтении: копия значений конца участка (живых значений — для открытого участка)
+        откатывается по записям до позиции снимка.
+        Поэтому шаг FSM стоит амортизированно O(1) при любом числе состояний: копия значений — одна на участок,
+        участок держат только его снимки, а удерживаемый непрочитанный результат стоит O(1) памяти.
+        Подкласс реализует _current_values(), _copy(), _undo() и _values_as_dict().
+    """
+
+    MIN_LENGTH: int = 64
+
+    __slots__ = ('_states', '_segment', '_segment_limit')
+
+    def __init__(self, states: StateDict, size: int) -> None:
+        self._states: StateDict = states
+        # Текущий участок журнала (None — после закрытия участка снимков не было, изменения не журналируются)
+        self._segment: Optional[_JournalSegment] = None
+        self._segment_limit: int = max(self.MIN_LENGTH, size)
+
+    @property
+    def states(self) -> StateDict:
+        """ State по cls_id (ключи словаря FsmResult.counters). """
+        return self._states
+
+    def snapshot(self) -> CountersSnapshot:
+        """ Снимок текущих значений (O(1), без копирования). """
+        if self._segment is None:
+            self._segment = _JournalSegment()
+        return CountersSnapshot(self, self._segment)
+
+    def rollback(self, segment: _JournalSegment, position: int) -> CountersDict:
+        """ Значения на позиции position участка segment в виде словаря {cls_id: count}. """
+        values = self._copy(segment.end if segment.end is not None else self._current_values())
+        entries, undo = segment.entries, self._undo
+        for pos in range(len(entries) - 1, position - 1, -1):
+            undo(values, entries[pos])
+        return self._values_as_dict(values)
+
+    def _log(self, entry: tuple) -> None:
+        """ Дописывает запись отмены перед изменением (вызывается, только если у участка есть снимки). """
+        segment = self._segment
+        if len(segment.entries) >= self._segment_limit:
+            # Изменение, записываемое сейчас, уже не входит в закрытый участок
+            segment.end = self._copy(self._current_values())
+            self._segment = None
+            return
+        segment.entries.append(entry)
+
+    def _current_values(self) -> Any:
+        """ Текущие значения (без копирования). """
+        raise NotImplementedError
+
+    def _copy(self, values: Any) -> Any:
+        """ Изменяемая копия значений. """
+        raise NotImplementedError
+
+    def _undo(self, values: Any, entry: tuple) -> None:
+        """ Отменяет в копии values изменение, записанное в entry. """
+        raise NotImplementedError
+
+    def _values_as_dict(self, values: Any) -> CountersDict:
+        """ Раскладывает значения в словарь {cls_id: count}. """
+        raise NotImplementedError
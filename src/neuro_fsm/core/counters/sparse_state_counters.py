@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+__all__ = ['SparseStateCounters']
+
+from typing import Collection, Optional
+
+from ..states.types import StateDict
+from .counters_journal import CountersJournal
+from .types import CountersDict
+
+
+class SparseStateCounters(CountersJournal):
+    """
+        Разреженный вариант StableStateCounters для больших словарей классов.
+        Хранит только ненулевые счётчики {cls_id: count}: память и стоимость as_dict()/сброса
+        пропорциональны числу активных классов, а не числу состояний в конфигурации.
+        Интерфейс совпадает с StableStateCounters; as_dict() возвращает только живые (ненулевые) счётчики.
+        Снимки snapshot() не копируют словарь: изменения после снимка журналируются (CountersJournal),
+        а массовый сброс заменяет словарь новым, оставляя прежний журналу.
+    """
+
+    __slots__ = ('_values', '_resettable_ids')
+
+    def __init__(self, states: StateDict):
+        super().__init__(states, len(states))
+        # Ключи появляются только при первом инкременте
+        self._values: CountersDict = {}
+        self._resettable_ids: frozenset[int] = frozenset(cls_id for cls_id, s in states.items() if s.is_resettable)
+
+    def increment(self, cls_id: int, count: int = 1) -> int:
+        """ Увеличивает счётчик состояния (на count) и возвращает новое значение. """
+        values = self._values
+        old = values.get(cls_id)
+        if self._segment is not None:
+            self._log((cls_id, old))
+        value = values[cls_id] = (old or 0) + count
+        return value
+
+    def reset_all(self) -> None:
+        """ Сбрасывает счётчики всех состояний. """
+        if self._segment is not None:
+            self._log((None, self._values))
+        self._values = {}
+
+    def reset_all_except(self, *cls_ids: int) -> None:
+        """ Сбрасывает все счётчики, кроме указанных состояний. """
+        values = self._values
+        if self._segment is not None:
+            self._log((None, values))
+        self._values = {cls_id: values[cls_id] for cls_id in cls_ids if cls_id in values}
+
+    def reset_resettable(self, except_id: Optional[int] = None) -> None:
+        """ Сбрасывает счётчики состояний с флагом is_resettable, кроме except_id (O(число живых счётчиков)). """
+        self.reset_many(self._resettable_ids, except_id)
+
+    def reset_many(self, cls_ids: Collection[int], except_id: Optional[int] = None) -> None:
+        """
+            Сбрасывает счётчики перечисленных состояний, кроме except_id.
+            Проходит только по живым счётчикам, поэтому cls_ids лучше передавать множеством.
+        """
+        values = self._values
+        for cls_id in [cls_id for cls_id in values if cls_id != except_id and cls_id in cls_ids]:
+            if self._segment is not None:
+                self._log((cls_id, values[cls_id]))
+            del values[cls_id]
+
+    def get(self, cls_id: int) -> int:
+        """ Возвращает текущее значение счётчика состояния. """
+        return self._values.get(cls_id, 0)
+
+    def as_dict(self) -> CountersDict:
+        """ Возвращает копию живых (ненулевых) счётчиков. """
+        return dict(self._values)
+
+    def reset(self, cls_id: int) -> None:
+        """ Метод сброса счётчика cls_id. """
+        if cls_id in self._values:
+            if self._segment is not None:
+                self._log((cls_id, self._values[cls_id]))
+            del self._values[cls_id]
+
+    def _current_values(self) -> CountersDict:
+        return self._values
+
+    def _copy(self, values: CountersDict) -> CountersDict:
+        return dict(values)
+
+    def _undo(self, values: CountersDict, entry: tuple) -> None:
+        cls_id, old = entry
+        if cls_id is None:
+            # Массовый сброс: возвращаем словарь, который был до него
+            values.clear()
+            values.update(old)
+        elif old is None:
+            values.pop(cls_id, None)
+        else:
+            values[cls_id] = old
+
+    def _values_as_dict(self, values: CountersDict) -> CountersDict:
+        return dict(values)
+
+    def __len__(self) -> int:
+        """ Число живых (ненулевых) счётчиков. """
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(counters={self.as_dict()})"
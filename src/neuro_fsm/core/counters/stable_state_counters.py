@@ -2,46 +2,152 @@ from __future__ import annotations
 
 __all__ = ['StableStateCounters']
 
+from array import array
+from typing import Iterable, Optional
+
 from ..states.types import StateDict
+from .counters_journal import CountersJournal
 from .types import CountersDict
 
 
-class StableStateCounters:
+class StableStateCounters(CountersJournal):
     """
         Хранит счётчики повторений состояний по cls_id.
         Работает только с конфигурацией состояний, нужной для логики сброса.
+        Значения лежат в плоском array('q'), индексируемом cls_id - min(cls_id) (как StateTable).
+        Сброс — через поколения (epoch): рядом со значением хранится номер поколения, в котором оно записано,
+        а для каждой группы состояний (обычные и is_resettable) — нижняя граница живых поколений.
+        Значение живо, только если его поколение не меньше границы его группы, поэтому reset_all()
+        и reset_resettable() — это новое поколение и сдвиг границ (O(1)), а reset_all_except()
+        дополнительно переносит в новое поколение только сохраняемые счётчики.
+        Снимки snapshot() не копируют буферы: изменения после снимка журналируются (CountersJournal).
     """
 
+    __slots__ = ('_ids', '_offset', '_values', '_stamps', '_groups', '_floors', '_epoch')
+
+    # Группы состояний: индекс в _floors
+    _COMMON: int = 0
+    _RESETTABLE: int = 1
+
     def __init__(self, states: StateDict):
-        self._counters: CountersDict = {cls_id: 0 for cls_id in states}
+        self._ids: tuple[int, ...] = tuple(states)
+        self._offset: int = min(states)
+        size = max(states) - self._offset + 1
+        super().__init__(states, size)
+        self._values: array = array('q', bytes(8 * size))
+        self._stamps: array = array('Q', bytes(8 * size))
+        groups = bytearray(size)
+        for cls_id, state in states.items():
+            if state.is_resettable:
+                groups[cls_id - self._offset] = self._RESETTABLE
+        self._groups: bytes = bytes(groups)
+        # Нижние границы живых поколений по группам (граница сбрасываемых не меньше общей)
+        self._floors: tuple[int, int] = (0, 0)
+        self._epoch: int = 0
 
-    def increment(self, cls_id: int) -> int:
-        """ Увеличивает счётчик состояния и возвращает новое значение. """
-        self._counters[cls_id] += 1
-        return self._counters[cls_id]
+    @property
+    def epoch(self) -> int:
+        """ Номер текущего поколения счётчиков. """
+        return self._epoch
+
+    def increment(self, cls_id: int, count: int = 1) -> int:
+        """ Увеличивает счётчик состояния (на count) и возвращает новое значение. """
+        idx = cls_id - self._offset
+        values, stamps = self._values, self._stamps
+        if self._segment is not None:
+            self._log((idx, values[idx], stamps[idx]))
+        if stamps[idx] >= self._floors[self._groups[idx]]:
+            value = values[idx] + count
+        else:
+            value = count
+        values[idx] = value
+        stamps[idx] = self._epoch
+        return value
 
     def reset_all(self) -> None:
-        """ Сбрасывает счётчики всех состояний. """
-        for cls_id in self._counters:
-            self.reset(cls_id)
+        """ Сбрасывает счётчики всех состояний (O(1): начинает новое поколение, буферы не трогает). """
+        self._new_floors(common=True)
+
+    def reset_resettable(self, except_id: Optional[int] = None) -> None:
+        """ Сбрасывает счётчики состояний с флагом is_resettable, кроме except_id (O(1)). """
+        kept = self.get(except_id) if except_id is not None else 0
+        self._new_floors(common=False)
+        if kept:
+            self._put(except_id - self._offset, kept)
 
     def reset_all_except(self, *cls_ids: int) -> None:
-        """ Сбрасывает все счётчики, кроме указанных состояний. """
-        for cls_id in self._counters:
-            if cls_id not in cls_ids:
-                self.reset(cls_id)
+        """ Сбрасывает все счётчики, кроме указанных состояний (O(len(cls_ids))). """
+        kept = [(cls_id, self.get(cls_id)) for cls_id in cls_ids]
+        self.reset_all()
+        offset, size = self._offset, len(self._values)
+        for cls_id, value in kept:
+            idx = cls_id - offset
+            if value and 0 <= idx < size:
+                self._put(idx, value)
+
+    def reset_many(self, cls_ids: Iterable[int], except_id: Optional[int] = None) -> None:
+        """ Сбрасывает счётчики перечисленных состояний, кроме except_id (O(len(cls_ids)); см. reset_resettable). """
+        values, stamps, offset = self._values, self._stamps, self._offset
+        for cls_id in cls_ids:
+            if cls_id != except_id:
+                idx = cls_id - offset
+                if self._segment is not None:
+                    self._log((idx, values[idx], stamps[idx]))
+                values[idx] = 0
 
     def get(self, cls_id: int) -> int:
         """ Возвращает текущее значение счётчика состояния. """
-        return self._counters.get(cls_id, 0)
+        idx = cls_id - self._offset
+        if 0 <= idx < len(self._values) and self._stamps[idx] >= self._floors[self._groups[idx]]:
+            return self._values[idx]
+        return 0
 
     def as_dict(self) -> CountersDict:
         """Возвращает копию всех счётчиков."""
-        return self._counters.copy()
+        return self._values_as_dict(self._current_values())
 
     def reset(self, cls_id: int) -> None:
         """ Метод сброса счётчика cls_id. """
-        self._counters[cls_id] = 0
+        idx = cls_id - self._offset
+        if self._segment is not None:
+            self._log((idx, self._values[idx], self._stamps[idx]))
+        self._values[idx] = 0
+
+    def _new_floors(self, common: bool) -> None:
+        """ Начинает новое поколение и поднимает до него границу сбрасываемых (common — и общую) группы. """
+        if self._segment is not None:
+            self._log((-1, self._floors, 0))
+        self._epoch += 1
+        self._floors = (self._epoch if common else self._floors[self._COMMON], self._epoch)
+
+    def _put(self, idx: int, value: int) -> None:
+        """ Записывает значение в текущем поколении. """
+        if self._segment is not None:
+            self._log((idx, self._values[idx], self._stamps[idx]))
+        self._values[idx] = value
+        self._stamps[idx] = self._epoch
+
+    def _current_values(self) -> list:
+        return [self._values, self._stamps, self._floors]
+
+    def _copy(self, values: list) -> list:
+        return [array('q', values[0]), array('Q', values[1]), values[2]]
+
+    def _undo(self, values: list, entry: tuple) -> None:
+        idx, value, stamp = entry
+        if idx < 0:
+            values[2] = value
+        else:
+            values[0][idx] = value
+            values[1][idx] = stamp
+
+    def _values_as_dict(self, values: list) -> CountersDict:
+        counts, stamps, floors = values
+        offset, groups = self._offset, self._groups
+        return {
+            cls_id: counts[idx] if stamps[idx] >= floors[groups[idx]] else 0
+            for cls_id, idx in ((cls_id, cls_id - offset) for cls_id in self._ids)
+        }
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(counters={self._counters})"
+        return f"{self.__class__.__name__}(counters={self.as_dict()})"
@@ -2,17 +2,36 @@ from __future__ import annotations
 
 __all__ = ['Fsm']
 
-from datetime import datetime
-from typing import Optional, Any
+import math
+import time
+from array import array
+from itertools import groupby
+from concurrent.futures import Future
+from typing import Optional, Any, ClassVar, Iterable, Iterator, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
 
 from ..config_parser.parsing_utils import normalize_enum_str
 from ..configs import FsmConfig
-from ..history_writer import StableHistoryWriter, RawHistoryWriter
-from ..models import ProfileNames
+from ..history_writer import StableHistoryWriter, RawHistoryWriter, BinaryRawHistoryWriter, BackgroundWriteQueue, \
+    JsonlStableHistoryWriter, NullHistoryWriter, FlightRecorder
+from ..models import ProfileNames, FsmStepFlags, HistoryFormats
+from ..models.batch_result import FsmBatchResult
 from ..models.result import FsmResult
 from .active_profile_view import ActiveProfileView
 from .profiles.profile_manager import ProfileManager
 from .history import RawStateHistory
+from .memory_footprint import deep_sizeof
+from .states import State, StateInterner
+
+# Флаги шага как int: на шаге с самописцем не создаются объекты IntFlag
+_RESETTER_FLAG, _BREAKER_FLAG, _STABLE_FLAG, _STAGE_DONE_FLAG, _PROFILE_CHANGED_FLAG = map(int, (
+    FsmStepFlags.RESETTER, FsmStepFlags.BREAKER, FsmStepFlags.STABLE, FsmStepFlags.STAGE_DONE,
+    FsmStepFlags.PROFILE_CHANGED,
+))
 
 
 class Fsm:
@@ -26,44 +45,145 @@ class Fsm:
         Все бизнес-решения и сценарии обработки происходят на этом уровне.
     """
 
-    def __init__(self, config: FsmConfig) -> None:
+    __slots__ = (
+        '_enable', '_meta', '_raw_history', '_profile_manager', '_raw_history_writer', '_stable_history_writer',
+        '_write_queue', '_result', '_last_state', '_step_index', '_confidence', '_log_raw', '_log_stable',
+        '_event_writer', '_stream_id', '_recorder', '_touched',
+    )
+
+    # Писатели истории по формату файла
+    RAW_WRITERS: ClassVar[dict[HistoryFormats, type]] = {
+        HistoryFormats.TEXT: RawHistoryWriter,
+        HistoryFormats.BINARY: BinaryRawHistoryWriter,
+    }
+    STABLE_WRITERS: ClassVar[dict[HistoryFormats, type]] = {
+        HistoryFormats.TEXT: StableHistoryWriter,
+        HistoryFormats.JSONL: JsonlStableHistoryWriter,
+    }
+
+    def __init__(
+            self,
+            config: FsmConfig,
+            state_interner: Optional[StateInterner] = None,
+            stream_id: Optional[str] = None
+    ) -> None:
         """
             Инициализация машины состояний на основе переданной конфигурации.
             Args:
                 config (FsmConfig): Конфигурация, содержащая состояния, профили, стратегию переключения
                                     и настройки логирования.
+                state_interner (Optional[StateInterner]): Общая таблица State (передаётся FsmManager,
+                                    чтобы все его FSM разделяли одни и те же State и таблицы состояний).
+                stream_id (Optional[str]): Id потока (камеры). Если задан, история пишется в отдельные файлы
+                                    потока через общий HistoryFilePool; иначе — в файлы по имени из конфигурации.
         """
         self._enable: bool = config.enable
+        self._stream_id: Optional[str] = stream_id
         self._meta: dict[str, Any] = config.meta
-        self._raw_history = RawStateHistory()
         self._profile_manager: ProfileManager = ProfileManager(
             state_configs=config.state_configs,
             profile_configs=config.profile_configs,
             switcher_strategy=config.switcher_strategy,
             def_profile=config.def_profile,
-            profile_ids_map=config.profile_ids_map
+            profile_ids_map=config.profile_ids_map,
+            counters_mode=config.counters_mode,
+            state_interner=state_interner
+        )
+        # Сырая история хранит индексы таблицы состояний (одинаковой по набору cls_id во всех профилях)
+        self._raw_history = RawStateHistory(
+            self._profile_manager.active_profile.table,
+            config.raw_history.max_len,
+            config.raw_history.unit
         )
-        # Писатель сырой истории
-        self._raw_history_writer = RawHistoryWriter(config.raw_history_writer)
-        # Писатель стабильной истории
-        self._stable_history_writer = StableHistoryWriter(config.stable_history_writer)
-        # Записываем настройки и конфигурацию профилей
-        self._stable_history_writer.write_configs(config.to_dict())
-        self._stable_history_writer.write_profile_configs(self._profile_manager.profiles)
         # Результат работы fsm
         self._result: Optional[FsmResult] = None
+        self._last_state: Optional[State] = None
         self._step_index: int = 0
+        # Уверенность выбранного класса для сырого лога (известна только при обработке по вероятностям)
+        self._confidence: float = math.nan
+        # Писатели сырой и стабильной истории
+        self._write_queue: Optional[BackgroundWriteQueue] = None
+        self._raw_history_writer, self._stable_history_writer = self._create_writers(config)
+        # Выключенная история (NullHistoryWriter): шаг пропускает не только запись, но и подготовку её аргументов
+        self._log_raw: bool = not isinstance(self._raw_history_writer, NullHistoryWriter)
+        self._log_stable: bool = not isinstance(self._stable_history_writer, NullHistoryWriter)
+        # Номер кадра событий стабильной истории (JSONL, приёмник SQLITE) берётся у FSM только при записи события
+        if self._log_stable:
+            self._stable_history_writer.bind_step_source(self._current_step)
+        # cls_id, зарегистрированные после последнего снимка RUNTIME (разностный снимок проверяет только их)
+        self._touched: set[int] = set()
+        # Писатель событий профилей (None — события не пишутся)
+        self._event_writer = self._stable_history_writer if self._log_stable else None
+        # Бортовой самописец: последние кадры в памяти, в файл — только по триггерам (None — выключен)
+        self._recorder: Optional[FlightRecorder] = (
+            FlightRecorder(config.flight_recorder, stream_id) if config.flight_recorder.enable else None
+        )
+        # Конфигурация пишется в ConfigCatalog один раз на содержимое; в лог — только ссылка на неё по хэшу
+        if self._log_stable:
+            self._stable_history_writer.write_config_ref(config)
+
+    def _create_writers(
+            self, config: FsmConfig
+    ) -> tuple[RawHistoryWriter | BinaryRawHistoryWriter | NullHistoryWriter,
+               StableHistoryWriter | JsonlStableHistoryWriter | NullHistoryWriter]:
+        """
+            Создаёт писателей истории по форматам из конфигурации (точка расширения для AsyncFsm).
+            Выключенный писатель (enable=False или пустой sinks) заменяется NullHistoryWriter.
+        """
+        raw_format = config.raw_history_writer.log_format
+        stable_format = config.stable_history_writer.log_format
+        if raw_format not in self.RAW_WRITERS:
+            raise ValueError(f"[{self.__class__.__name__}] Unsupported raw history format: {raw_format.name}")
+        if stable_format not in self.STABLE_WRITERS:
+            raise ValueError(f"[{self.__class__.__name__}] Unsupported stable history format: {stable_format.name}")
+        # Общая фоновая очередь писателей (None, если оба писателя синхронные)
+        self._write_queue = BackgroundWriteQueue.from_configs(config.stable_history_writer, config.raw_history_writer)
+        stable_writer = NullHistoryWriter()
+        if config.stable_history_writer.is_active:
+            stable_writer = self.STABLE_WRITERS[stable_format](
+                config.stable_history_writer, self._write_queue, self._stream_id
+            )
+        raw_writer = NullHistoryWriter()
+        if config.raw_history_writer.is_active:
+            raw_writer = self.RAW_WRITERS[raw_format](config.raw_history_writer, self._write_queue, self._stream_id)
+        return raw_writer, stable_writer
+
+    def _current_step(self) -> int:
+        return self._step_index
+
+    @property
+    def stream_id(self) -> Optional[str]:
+        """ Id потока, история которого пишется в отдельные файлы (None — общие файлы). """
+        return self._stream_id
 
     @property
     def profile(self) -> ActiveProfileView:
         """ Read-only представление активного профиля. """
         return ActiveProfileView(self._profile_manager.active_profile)
 
+    @property
+    def raw_history(self) -> RawStateHistory:
+        """ Сырая история состояний (серии cls_id; только для чтения). """
+        return self._raw_history
+
     @property
     def result(self) -> Optional[FsmResult]:
         """ Последний FsmResult или None, если ещё не было шагов/последний сброшен. """
         return self._result
 
+    @property
+    def flight_recorder(self) -> Optional[FlightRecorder]:
+        """ Бортовой самописец (None — выключен в конфигурации). """
+        return self._recorder
+
+    def dump_flight_recorder(self) -> Optional[Future]:
+        """
+            Ручной триггер самописца: кадры, накопленные с прошлого сброса, дописываются в его файл в фоне.
+            Returns:
+                Optional[Future]: Сброс (None — самописец выключен или ещё ничего не записал).
+        """
+        return self._recorder.dump() if self._recorder is not None else None
+
     def switch_profile_by_pid(self, pid: Optional[int]) -> None:
         """ Сменить активный профиль по id продукции (используется при ручной или полуавтоматической стратегии). """
         self._profile_manager.switch_profile_by_pid(pid)
@@ -91,27 +211,283 @@ class Fsm:
         if not self._enable:
             return FsmResult.create_empty()
 
+        cur_state, stage_done, is_profile_changed = self._step(cls_id)
+
+        result = self._build_result(cur_state, stage_done, is_profile_changed)
+        self._result = result
+
+        return result
+
+    def process_batch(self, cls_ids: Iterable[int]) -> FsmBatchResult:
+        """
+            Пакетная обработка входных состояний от нейросети.
+            Каждый кадр проходит ту же логику, что и в process_state (счётчики, сбросы, стабильная история,
+            проверка ожидаемой последовательности, переключение профиля, запись истории),
+            но вместо FsmResult на каждый кадр возвращается один колоночный FsmBatchResult.
+            Полный FsmResult строится один раз — для последнего кадра пачки (доступен через Fsm.result).
+            Args:
+                cls_ids (Iterable[int]): Последовательность cls_id (list, tuple, array, numpy.ndarray).
+            Returns:
+                FsmBatchResult: Флаги, индекс активного профиля и позиции stage_done по кадрам.
+        """
+        profile_names = self._profile_manager.profile_names
+        if not self._enable:
+            return FsmBatchResult.create_empty(profile_names)
+
+        if hasattr(cls_ids, "tolist"):
+            # numpy.ndarray: итерация по питоновским int быстрее, чем по numpy-скалярам
+            cls_ids = cls_ids.tolist()
+        cls_ids = array('l', cls_ids)
+        if not cls_ids:
+            return FsmBatchResult.create_empty(profile_names, self._step_index + 1)
+
+        return self._process_frames(cls_ids)
+
+    def process_run(self, cls_id: int, count: int) -> list[FsmResult]:
+        """
+            Обработка серии из count одинаковых кадров cls_id (run-length вход).
+            Результат эквивалентен count вызовам process_state, но кадры, на которых меняются только счётчики,
+            продвигаются одной операцией: стоимость зависит от числа событий внутри серии, а не от её длины.
+            Args:
+                cls_id (int): Идентификатор класса состояния.
+                count (int): Длина серии (кадров), > 0.
+            Returns:
+                list[FsmResult]: Результаты граничных кадров — тех, на которых выполнялся полный такт
+                                 (первый кадр, впервые достигнутая стабильность, stage_done, смена профиля),
+                                 и последнего кадра серии. Каждый совпадает с результатом process_state
+                                 на том же step_index; последний доступен через Fsm.result.
+        """
+        if count <= 0:
+            raise ValueError(f"[{self.__class__.__name__}] count must be > 0, got {count}")
+        if not self._enable:
+            return [FsmResult.create_empty()]
+
+        results: list[FsmResult] = []
+        for cur_state, stage_done, is_profile_changed, frames in self._step_run(cls_id, count):
+            if frames == 1:
+                results.append(self._build_result(cur_state, stage_done, is_profile_changed))
+        if results[-1].step_index != self._step_index:
+            # Серия закончилась тихими кадрами: на них stage_done и смены профиля не было
+            results.append(self._build_result(cur_state, False, False))
+        self._result = results[-1]
+        return results
+
+    def process_scores(self, scores: Sequence[float]) -> FsmResult:
+        """
+            Обработка одного кадра по вектору вероятностей (scores/softmax) вместо готового cls_id.
+            Выбирается класс с максимальной вероятностью (столбец j — cls_id j); если его вероятность ниже порога
+            threshold этого состояния в активном профиле, используется состояние по умолчанию профиля
+            (первое из default_states). Далее — как process_state.
+            Args:
+                scores (Sequence[float]): Вектор вероятностей (list, array, numpy.ndarray).
+            Returns:
+                FsmResult: Результат обработки кадра.
+        """
+        cls_id, self._confidence = self._choose_cls_id(scores)
+        try:
+            return self.process_state(cls_id)
+        finally:
+            self._confidence = math.nan
+
+    def _choose_cls_id(self, scores: Sequence[float]) -> tuple[int, float]:
+        """
+            Выбор класса кадра по вектору вероятностей для активного профиля (см. process_scores()).
+            Returns:
+                tuple[int, float]: cls_id для обработки и вероятность лучшего класса (уверенность кадра).
+        """
+        profile = self._profile_manager.active_profile
+        if hasattr(scores, "argmax"):
+            best = int(scores.argmax())
+        else:
+            best = max(range(len(scores)), key=scores.__getitem__)
+        table = profile.table
+        passed = best in table and scores[best] >= table.threshold(best)
+        return (best if passed else profile.default_states[0].cls_id), float(scores[best])
+
+    def process_scores_batch(self, scores: Any) -> FsmBatchResult:
+        """
+            Пакетная обработка по матрице вероятностей [кадры x классы] (столбец j — cls_id j).
+            argmax и сравнение с порогами выполняются векторно (NumPy) сразу для всех профилей,
+            а на каждом кадре берётся выбор того профиля, который активен на этом кадре
+            (профиль может переключиться внутри пачки). Не прошедшие порог кадры получают
+            состояние по умолчанию профиля (первое из default_states).
+            Args:
+                scores: Матрица вероятностей (numpy.ndarray или вложенные последовательности).
+            Returns:
+                FsmBatchResult: Как в process_batch; колонка cls_ids — фактически обработанные cls_id.
+        """
+        profile_names = self._profile_manager.profile_names
+        if not self._enable:
+            return FsmBatchResult.create_empty(profile_names)
+        if np is None:  # pragma: no cover
+            raise RuntimeError("Fsm.process_scores_batch requires 'numpy' to be installed.")
+
+        scores = np.asarray(scores, dtype=np.float64)
+        if scores.ndim != 2:
+            raise ValueError(f"[{self.__class__.__name__}] scores must be a 2D matrix, got shape {scores.shape}")
+        if not len(scores):
+            return FsmBatchResult.create_empty(profile_names, self._step_index + 1)
+
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(scores)), best]
+        # Профили с общей таблицей и одинаковым состоянием по умолчанию дают одинаковый выбор
+        choices_by_key: dict[tuple[int, int], array] = {}
+        choices: list[array] = []
+        for name in profile_names:
+            profile = self._profile_manager.profiles[name]
+            default_id = profile.default_states[0].cls_id
+            key = (id(profile.table), default_id)
+            if key not in choices_by_key:
+                passed = best_scores >= profile.table.score_thresholds(scores.shape[1])[best]
+                choices_by_key[key] = array('l', np.where(passed, best, default_id).tolist())
+            choices.append(choices_by_key[key])
+
+        if len(choices_by_key) == 1:
+            return self._process_frames(choices[0])
+        return self._process_frames(array('l', bytes(choices[0].itemsize * len(scores))), tuple(choices))
+
+    def _process_frames(self, cls_ids: array, choices: Optional[tuple[array, ...]] = None) -> FsmBatchResult:
+        """
+            Общий цикл пакетной обработки.
+            Args:
+                cls_ids (array): cls_id по кадрам; при заданном choices заполняется выбранными cls_id.
+                choices (Optional[tuple[array, ...]]): cls_id по кадрам для каждого профиля (по индексу профиля):
+                                                       на кадре берётся выбор активного профиля.
+        """
+        profile_names = self._profile_manager.profile_names
+        first_step_index = self._step_index + 1
+        flags = array('B', bytes(len(cls_ids)))
+        profile_idx = array('H', bytes(2 * len(cls_ids)))
+        stage_done_positions: list[int] = []
+
+        manager = self._profile_manager
+        resetter_flag = int(FsmStepFlags.RESETTER)
+        breaker_flag = int(FsmStepFlags.BREAKER)
+        stable_flag = int(FsmStepFlags.STABLE)
+        stage_done_flag = int(FsmStepFlags.STAGE_DONE)
+        profile_changed_flag = int(FsmStepFlags.PROFILE_CHANGED)
+
+        pos = 0
+        cur_state = stage_done = is_profile_changed = None
+        for cur_state, stage_done, is_profile_changed, frames in self._segments(cls_ids, choices):
+            frame_flags = 0
+            if cur_state.is_resetter:
+                frame_flags |= resetter_flag
+            if cur_state.is_breaker:
+                frame_flags |= breaker_flag
+            if manager.active_profile.is_state_stable(cur_state):
+                frame_flags |= stable_flag
+            if stage_done:
+                frame_flags |= stage_done_flag
+                stage_done_positions.append(pos)
+            if is_profile_changed:
+                frame_flags |= profile_changed_flag
+            if frames == 1:
+                flags[pos] = frame_flags
+                profile_idx[pos] = manager.active_profile_index
+            else:
+                # Серия «тихих» кадров: флаги и профиль одинаковы на всех её кадрах
+                flags[pos:pos + frames] = array('B', (frame_flags,)) * frames
+                profile_idx[pos:pos + frames] = array('H', (manager.active_profile_index,)) * frames
+            pos += frames
+
+        self._result = self._build_result(cur_state, stage_done, is_profile_changed)
+
+        return FsmBatchResult(
+            profiles=profile_names,
+            cls_ids=cls_ids,
+            flags=flags,
+            profile_idx=profile_idx,
+            stage_done_positions=tuple(stage_done_positions),
+            first_step_index=first_step_index,
+        )
+
+    def _segments(
+            self,
+            cls_ids: array,
+            choices: Optional[tuple[array, ...]] = None
+    ) -> Iterator[tuple[State, bool, bool, int]]:
+        """
+            Прогоняет кадры пачки и отдаёт сегменты (состояние, stage_done, profile_changed, число кадров).
+            Без choices повторы одного cls_id обрабатываются сериями (_step_run), иначе — по кадру.
+        """
+        if choices is None:
+            for cls_id, group in groupby(cls_ids):
+                yield from self._step_run(cls_id, sum(1 for _ in group))
+            return
+        manager = self._profile_manager
+        for pos in range(len(cls_ids)):
+            cls_id = cls_ids[pos] = choices[manager.active_profile_index][pos]
+            yield *self._step(cls_id), 1
+
+    def _step_run(self, cls_id: int, count: int) -> Iterator[tuple[State, bool, bool, int]]:
+        """
+            Обрабатывает count повторов cls_id, эквивалентно count тактам _step.
+            Полный такт выполняется только там, где что-то может произойти: на первом кадре серии,
+            на кадре, где состояние впервые становится стабильным в каком-либо профиле,
+            после stage_done и смены профиля. Кадры между ними («тихие») меняют только счётчики,
+            поэтому продвигаются одной операцией (_advance_run).
+            Yields:
+                (State, stage_done, profile_changed, frames): frames == 1 — полный такт, иначе серия тихих кадров.
+        """
+        manager = self._profile_manager
+        remaining = count
+        while remaining:
+            cur_state, stage_done, is_profile_changed = self._step(cls_id)
+            remaining -= 1
+            yield cur_state, stage_done, is_profile_changed, 1
+            if remaining and not stage_done and not is_profile_changed:
+                quiet = manager.quiet_frames(remaining)
+                if quiet:
+                    self._advance_run(cur_state, quiet)
+                    remaining -= quiet
+                    yield cur_state, False, False, quiet
+
+    def _advance_run(self, cur_state: State, frames: int) -> None:
+        """ Продвигает frames тихих повторов текущего состояния: счётчики, сырая история и её лог. """
+        if self._log_raw:
+            self._raw_history_writer.write_frames(self._step_index + 1, cur_state.cls_id, frames)
+        if self._log_stable:
+            self._touched.add(cur_state.cls_id)
+        if self._recorder is not None:
+            self._recorder.record_run(
+                self._step_index + 1, cur_state.cls_id, frames, self._step_flags(cur_state, False, False)
+            )
+        self._step_index += frames
+        self._profile_manager.advance_state(frames)
+        self._raw_history.add_repeated(cur_state, frames)
+
+    def _step(self, cls_id: int) -> tuple[State, bool, bool]:
+        """
+            Один такт машины состояний без формирования результата.
+            Returns:
+                tuple[State, bool, bool]: текущее состояние, stage_done, profile_changed.
+        """
         self._step_index += 1
         is_profile_changed: bool = False
 
         self._profile_manager.register_state(cls_id)
 
         cur_state = self._profile_manager.active_profile.cur_state
-        prev_state = self._result.state if self._result else None
+        prev_state = self._last_state
+        self._last_state = cur_state
 
         # Добавляем в сырую историю
-        self._raw_history_writer.write(str(cls_id))
+        if self._log_raw:
+            self._raw_history_writer.write_frame(self._step_index, cls_id, self._confidence)
 
         # Если статус сменился, то записываем событие в историю
-        if prev_state and prev_state.cls_id != cur_state.cls_id:
-            self._stable_history_writer.write_action(
-                cur_state=prev_state,
-                count=self._profile_manager.active_profile.get_counter_by_cls_id(prev_state.cls_id),
-                action="state_changed",
-                profile=self._profile_manager.active_profile
-            )
-        if not prev_state or prev_state.cls_id != cur_state.cls_id:
-            self._stable_history_writer.write_state(cur_state)
+        if self._log_stable:
+            self._touched.add(cls_id)
+            if prev_state and prev_state.cls_id != cur_state.cls_id:
+                self._stable_history_writer.write_action(
+                    cur_state=prev_state,
+                    count=self._profile_manager.active_profile.get_counter_by_cls_id(prev_state.cls_id),
+                    action="state_changed",
+                    profile=self._profile_manager.active_profile
+                )
+            if not prev_state or prev_state.cls_id != cur_state.cls_id:
+                self._stable_history_writer.write_state(cur_state)
 
         # Добавляет состояние в сырую историю
         self._raw_history.add(cur_state)
@@ -120,44 +496,139 @@ class Fsm:
         self._profile_manager.reset_by_trigger()
 
         # Если текущее состояние стабильное, то прибавляем его счётчик, добавляем в историю и сбрасываем все счётчики состояний, кроме текущего
-        self._profile_manager.commit_stable_states(self._stable_history_writer)
+        self._profile_manager.commit_stable_states(self._event_writer)
 
         # Проверяем, сработала ли последовательность из активного профиля
-        stage_done = self._profile_manager.active_profile.is_expected_seq_valid(self._stable_history_writer)
+        stage_done = self._profile_manager.active_profile.is_expected_seq_valid(self._event_writer)
         if not stage_done:
             # Если ожидаемая последовательность НЕ сработала, то проверяем не надо ли сменить активный профиль
             is_profile_changed = self._profile_manager.update_active_profile()
             if is_profile_changed:
-                self._stable_history_writer.write_action(
-                    cur_state=cur_state,
-                    count=self._profile_manager.active_profile.get_counter_by_cls_id(cur_state.cls_id),
-                    action="profile_changed",
-                    profile=self._profile_manager.active_profile
-                )
+                if self._log_stable:
+                    self._stable_history_writer.write_action(
+                        cur_state=cur_state,
+                        count=self._profile_manager.active_profile.get_counter_by_cls_id(cur_state.cls_id),
+                        action="profile_changed",
+                        profile=self._profile_manager.active_profile
+                    )
                 # self._raw_history.recalculate_for(self._profile_manager.active_profile)
                 self._profile_manager.active_profile.reset_to_init_state()
 
-        if stage_done or is_profile_changed:
-            self._stable_history_writer.write_runtime(self._profile_manager.profiles, self._profile_manager.active_profile)
+        if (stage_done or is_profile_changed) and (self._log_raw or self._log_stable):
+            self._stable_history_writer.write_runtime(
+                self._profile_manager.profiles, self._profile_manager.active_profile, self._touched
+            )
+            self._touched.clear()
+            flags = FsmStepFlags.STAGE_DONE if stage_done else FsmStepFlags.NONE
+            if is_profile_changed:
+                flags |= FsmStepFlags.PROFILE_CHANGED
+            self._raw_history_writer.on_event(flags)
+            self._stable_history_writer.on_event(flags)
+
+        if self._recorder is not None:
+            self._recorder.record(
+                self._step_index, cls_id, self._confidence, self._step_flags(cur_state, stage_done, is_profile_changed)
+            )
+
+        return cur_state, stage_done, is_profile_changed
 
-        result = FsmResult(
-            active_profile=self._profile_manager.active_profile.name,
+    def _step_flags(self, cur_state: State, stage_done: bool, is_profile_changed: bool) -> int:
+        """ Флаги шага FsmStepFlags (как в колонке flags FsmBatchResult). """
+        flags = 0
+        if cur_state.is_resetter:
+            flags |= _RESETTER_FLAG
+        if cur_state.is_breaker:
+            flags |= _BREAKER_FLAG
+        if self._profile_manager.active_profile.is_state_stable(cur_state):
+            flags |= _STABLE_FLAG
+        if stage_done:
+            flags |= _STAGE_DONE_FLAG
+        if is_profile_changed:
+            flags |= _PROFILE_CHANGED_FLAG
+        return flags
+
+    def _build_result(self, cur_state: State, stage_done: bool, is_profile_changed: bool) -> FsmResult:
+        """ Формирует снимок FsmResult по итогам последнего такта (без копирования счётчиков и истории). """
+        profile = self._profile_manager.active_profile
+        return FsmResult(
+            active_profile=profile.name,
             prev_profile=self._profile_manager.prev_active_profile.name,
             state=cur_state,
             resetter=cur_state.is_resetter,
             breaker=cur_state.is_breaker,
-            stable=self._profile_manager.active_profile.is_state_stable(cur_state),
+            stable=profile.is_state_stable(cur_state),
             stage_done=stage_done,
             profile_changed=is_profile_changed,
-            counters=self._profile_manager.active_profile.get_counters(),
-            history=self._profile_manager.active_profile.get_history(),
+            # counters/history/timestamp материализуются только при чтении
+            counters=profile.snapshot_counters(),
+            history=profile.snapshot_history(),
             step_index=self._step_index,
-            timestamp=datetime.now(),
+            timestamp=time.time(),
         )
-        self._result = result
 
-        return result
+    def shared_objects(self) -> tuple[Any, ...]:
+        """ Неизменяемые объекты, общие с другими FSM менеджера: State, таблицы, автоматы, метаданные. """
+        shared: list[Any] = [self._meta, self._profile_manager.state_interner]
+        for profile in self._profile_manager.profiles.values():
+            shared += [
+                profile.states, profile.table, profile.init_states, profile.default_states,
+                profile.expected_sequences, profile.history_automaton,
+            ]
+        return tuple(shared)
+
+    def memory_footprint(self, shared_seen: Optional[set[int]] = None) -> dict[str, int]:
+        """
+            Отчёт о занимаемой памяти в байтах (оценка по sys.getsizeof с обходом ссылок).
+            Args:
+                shared_seen (Optional[set[int]]): id уже учтённых общих объектов (для отчёта по нескольким FSM).
+            Returns:
+                dict[str, int]:
+                    - profiles: профили (счётчики, стабильные истории, ссылки) без общих объектов;
+                    - raw_history: сырая история;
+                    - writers: писатели истории;
+                    - result: последний FsmResult;
+                    - fsm: сам объект Fsm и прочие собственные данные;
+                    - private: сумма собственных данных — байты на один поток;
+                    - shared: общие объекты (State, таблицы, автоматы), ещё не учтённые в shared_seen.
+        """
+        if shared_seen is None:
+            shared_seen = set()
+        shared = deep_sizeof(self.shared_objects(), shared_seen)
+        seen = set(shared_seen)
+        report = {
+            "profiles": deep_sizeof((self._profile_manager,), seen),
+            "raw_history": deep_sizeof((self._raw_history,), seen),
+            "writers": deep_sizeof((self._raw_history_writer, self._stable_history_writer, self._recorder), seen),
+            "result": deep_sizeof((self._result,), seen),
+            "fsm": deep_sizeof((self,), seen),
+        }
+        report["private"] = sum(report.values())
+        report["shared"] = shared
+        return report
+
+    @property
+    def dropped_records(self) -> dict[str, int]:
+        """ Число записей истории, потерянных при переполнении фоновой очереди писателей. """
+        return {"raw": self._raw_history_writer.dropped, "stable": self._stable_history_writer.dropped}
+
+    def close(self) -> None:
+        """
+            Сбрасывает буферы писателей истории на диск и закрывает их файлы (фоновую очередь — дописывает);
+            дожидается поставленных сбросов самописца.
+        """
+        self._raw_history_writer.close()
+        self._stable_history_writer.close()
+        if self._recorder is not None:
+            self._recorder.close()
+        if self._write_queue is not None:
+            self._write_queue.stop()
 
     def reset(self) -> None:
+        """ Возвращает машину к состоянию сразу после создания (без повторного построения профилей). """
+        self._profile_manager.reset()
+        self._raw_history.clear()
+        if self._recorder is not None:
+            self._recorder.clear()
         self._result = None
-        self._step_index = 0
\ No newline at end of file
+        self._last_state = None
+        self._step_index = 0
@@ -2,14 +2,21 @@ from __future__ import annotations
 
 __all__ = ['FsmManager']
 
+from itertools import count
 from typing import Optional, Any, TYPE_CHECKING
 
 from ..models import ProfileNames
+from .async_fsm import AsyncFsm
 from .fsm import Fsm
+from .fsm_pool import FsmPool
+from .states import StateInterner
 
 if TYPE_CHECKING:
     from ..configs.state_config import StateConfigDict
 
+# Автоматические id потоков: уникальны в процессе, чтобы файлы FSM разных менеджеров не совпадали
+_STREAM_IDS = count()
+
 
 class FsmManager:
     """
@@ -29,25 +36,86 @@ class FsmManager:
         self._config: Optional[FsmConfig] = None
         if raw_config: self.set_config(raw_config)
         self._fsms: list[Fsm] = []
+        # Общие для всех FSM менеджера State и таблицы состояний
+        self._state_interner: StateInterner = StateInterner()
+
+    @property
+    def state_interner(self) -> StateInterner:
+        """ Таблица интернированных State, общая для всех FSM менеджера. """
+        return self._state_interner
 
     @property
     def state_configs(self) -> StateConfigDict:
         """ Словарь допустимых статусов и их настроек. """
         return self._config.state_configs
 
-    def create_fsm(self, raw_config: Optional[Any] = None) -> Fsm:
+    def create_fsm(self, raw_config: Optional[Any] = None, stream_id: Optional[str] = None) -> Fsm:
         """
             Создаёт новую машину состояний и возвращает её.
+            История каждой FSM менеджера пишется в собственные файлы потока (см. Fsm.stream_id).
             Args:
                 raw_config: Необязательная индивидуальная конфигурация.
+                stream_id: Id потока (камеры) для имён файлов истории; по умолчанию — fsm<N>.
             Returns:
                 Fsm: новая машина состояний.
         """
         self.set_config(raw_config)
-        fsm = Fsm(self._config)
+        fsm = Fsm(self._config, self._state_interner, self._new_stream_id(stream_id))
         self._fsms.append(fsm)
         return fsm
 
+    def create_async_fsm(self, raw_config: Optional[Any] = None, stream_id: Optional[str] = None) -> AsyncFsm:
+        """
+            Создаёт машину состояний с асинхронной записью истории (для asyncio-конвейеров).
+            Args:
+                raw_config: Необязательная индивидуальная конфигурация.
+                stream_id: Id потока (камеры) для имён файлов истории; по умолчанию — fsm<N>.
+            Returns:
+                AsyncFsm: новая машина состояний.
+        """
+        self.set_config(raw_config)
+        fsm = AsyncFsm(self._config, self._state_interner, self._new_stream_id(stream_id))
+        self._fsms.append(fsm)
+        return fsm
+
+    def create_pool(self, n_streams: int, raw_config: Optional[Any] = None) -> FsmPool:
+        """
+            Создаёт векторизованный пул из n_streams машин состояний с текущей конфигурацией.
+            Пул не попадает в список FSM менеджера: им управляют напрямую.
+            Args:
+                n_streams: Количество потоков (камер) в пуле.
+                raw_config: Необязательная индивидуальная конфигурация.
+            Returns:
+                FsmPool: новый пул.
+        """
+        self.set_config(raw_config)
+        return FsmPool(self._config, n_streams, self._state_interner)
+
+    def memory_footprint(self) -> dict[str, int]:
+        """
+            Отчёт о памяти всех FSM менеджера в байтах.
+            Returns:
+                dict[str, int]:
+                    - fsms: количество FSM;
+                    - shared: общие объекты (интернированные State, таблицы, автоматы) — учитываются один раз;
+                    - private: сумма собственных данных всех FSM;
+                    - per_fsm: среднее собственных данных на одну FSM (байты на поток);
+                    - total: shared + private.
+        """
+        shared_seen: set[int] = set()
+        shared = private = 0
+        for fsm in self._fsms:
+            report = fsm.memory_footprint(shared_seen)
+            shared += report["shared"]
+            private += report["private"]
+        return {
+            "fsms": len(self._fsms),
+            "shared": shared,
+            "private": private,
+            "per_fsm": private // len(self._fsms) if self._fsms else 0,
+            "total": shared + private,
+        }
+
     def set_config(self, raw_config: Optional[Any] = None) -> None:
         """
             Устанавливает новую конфигурацию для последующих StateMachine.
@@ -93,7 +161,7 @@ class FsmManager:
     def reset_all(self) -> None:
         """Сбросить все FSM."""
         for fsm in self._fsms:
-            fsm.reset_all_states()
+            fsm.reset()
 
     def update_all(self, cls_id: int) -> None:
         """Отправить новое состояние всем FSM (если нужно массовое обновление, например, при синхронизации)."""
@@ -105,9 +173,21 @@ class FsmManager:
         return {i: fsm.active_profile.name for i, fsm in enumerate(self._fsms)}
 
     def destroy(self) -> None:
-        """ Сбрасывает конфигурацию и список созданных машин. """
+        """ Сбрасывает конфигурацию и список созданных машин (буферы их писателей истории сбрасываются на диск). """
+        for fsm in self._fsms:
+            fsm.close()
         self._config = None
         self._fsms.clear()
+        self._state_interner.clear()
+
+    def _new_stream_id(self, stream_id: Optional[str]) -> str:
+        """ Возвращает id потока новой FSM; два потока менеджера не могут писать в одни файлы. """
+        if stream_id is None:
+            return f"fsm{next(_STREAM_IDS)}"
+        stream_id = str(stream_id)
+        if any(fsm.stream_id == stream_id for fsm in self._fsms):
+            raise ValueError(f"[{self.__class__.__name__}] Stream id '{stream_id}' is already used")
+        return stream_id
 
     @staticmethod
     def _parse_raw_config(raw_config: Any) -> 'FsmConfig':
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+__all__ = ['FsmPool']
+
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from ..config_parser.parsing_utils import normalize_enum_str
+from ..configs import FsmConfig
+from ..models import ProfileNames, ProfileSwitcherStrategies, FsmStepFlags
+from ..models.pool_result import FsmPoolResult
+from ..models.result import FsmResult
+from .profiles.profile_manager import ProfileManager
+from .states import StateTable, StateInterner
+
+
+class FsmPool:
+    """
+        Векторизованный движок для множества независимых потоков (камер) с общей конфигурацией.
+        Эквивалентен N независимым Fsm, но хранит состояние всех потоков в массивах NumPy (struct-of-arrays):
+            - счётчики: [stream, profile, state];
+            - стабильная история: кольцевые буферы индексов состояний [stream, profile, HISTORY_MAX_LEN];
+            - активный профиль: [stream].
+        Один такт (`step`) обрабатывает кадр всех потоков несколькими векторными операциями.
+        Ограничения:
+            - Поддерживаются стратегии SINGLE и BY_MAPPED_ID (профиль переключается вручную по pid/имени).
+            - Писатели истории не используются: пул отдаёт только результаты.
+            - Зависимость numpy обязательна для пула, проверяется при создании.
+    """
+
+    HISTORY_MAX_LEN = 100
+    SUPPORTED_STRATEGIES = (ProfileSwitcherStrategies.SINGLE, ProfileSwitcherStrategies.BY_MAPPED_ID)
+
+    def __init__(self, config: FsmConfig, n_streams: int, state_interner: Optional[StateInterner] = None) -> None:
+        """
+            Args:
+                config (FsmConfig): Та же конфигурация, что используется для Fsm.
+                n_streams (int): Количество потоков в пуле.
+                state_interner (Optional[StateInterner]): Общая таблица State менеджера.
+        """
+        if np is None:  # pragma: no cover
+            raise RuntimeError("FsmPool requires 'numpy' to be installed.")
+        if n_streams <= 0:
+            raise ValueError(f"[{self.__class__.__name__}] n_streams must be > 0, got {n_streams}")
+        if config.switcher_strategy not in self.SUPPORTED_STRATEGIES:
+            raise ValueError(f"[{self.__class__.__name__}] Unsupported switcher strategy: {config.switcher_strategy}")
+
+        self._enable: bool = config.enable
+        self._n_streams: int = n_streams
+        # Шаблонный менеджер профилей: источник State, таблиц, ожидаемых последовательностей и карты pid
+        self._profile_manager: ProfileManager = ProfileManager(
+            state_configs=config.state_configs,
+            profile_configs=config.profile_configs,
+            switcher_strategy=config.switcher_strategy,
+            def_profile=config.def_profile,
+            profile_ids_map=config.profile_ids_map,
+            state_interner=state_interner
+        )
+        self._profile_names: tuple[str, ...] = self._profile_manager.profile_names
+        self._profiles = tuple(self._profile_manager.profiles[name] for name in self._profile_names)
+        self._compile_tables()
+        self._init_streams()
+
+    @property
+    def n_streams(self) -> int:
+        return self._n_streams
+
+    @property
+    def profile_names(self) -> tuple[str, ...]:
+        """ Имена профилей в порядке их индексов. """
+        return self._profile_names
+
+    def step(self, cls_ids: Sequence[int] | Any) -> FsmPoolResult:
+        """
+            Один такт для всех потоков: cls_ids[i] — входное состояние потока i.
+            Семантика шага совпадает с Fsm.process_state: инкремент счётчиков, сброс по триггеру,
+            фиксация стабильных состояний в истории, проверка ожидаемой последовательности активного профиля.
+            Args:
+                cls_ids: Массив/последовательность длины n_streams.
+            Returns:
+                FsmPoolResult: Флаги, индекс активного профиля и step_index по потокам.
+            Raises:
+                ValueError: если длина cls_ids не равна n_streams.
+                KeyError: если встретился не сконфигурированный cls_id.
+        """
+        cls_ids = np.asarray(cls_ids)
+        if cls_ids.shape != (self._n_streams,):
+            raise ValueError(f"[{self.__class__.__name__}] cls_ids must have shape ({self._n_streams},), got {cls_ids.shape}")
+        if not self._enable:
+            return self._empty_result(cls_ids)
+
+        idx = cls_ids.astype(np.intp) - self._offset
+        self._validate_indexes(idx, cls_ids)
+
+        streams = self._streams
+        self._step_index += 1
+
+        # 1. Текущее состояние и инкремент счётчика во всех профилях
+        self._cur_idx[:] = idx[:, None]
+        cur_counts = self._counters[streams, :, idx] + 1
+        self._counters[streams, :, idx] = cur_counts
+
+        # 2. Сброс по триггеру (только resettable) и после стабилизации (все), кроме текущего состояния
+        is_resetter = self._resetter[:, idx].T
+        stable_lims = self._stable_lims[:, idx].T
+        is_stable = (stable_lims > 0) & (cur_counts >= stable_lims)
+        to_zero = (is_resetter[:, :, None] & self._resettable[None, :, :]) | is_stable[:, :, None]
+        to_zero[streams, :, idx] = False
+        self._counters[to_zero] = 0
+
+        # 3. Стабильное состояние, отличное от последнего в истории, дописывается в историю
+        last = self._hist[streams[:, None], self._profile_range[None, :], (self._hist_head - 1) % self.HISTORY_MAX_LEN]
+        to_append = is_stable & (self._hist_len > 0) & (last != idx[:, None])
+        if to_append.any():
+            self._append_history(*to_append.nonzero(), idx)
+
+        # 4. Флаги шага по активному профилю
+        active = self._active
+        flags = (is_resetter[streams, active] * np.uint8(FsmStepFlags.RESETTER)
+                 | self._breaker[active, idx] * np.uint8(FsmStepFlags.BREAKER)
+                 | is_stable[streams, active] * np.uint8(FsmStepFlags.STABLE)
+                 | self._matched[streams, active] * np.uint8(FsmStepFlags.STAGE_DONE)).astype(np.uint8)
+        self._last_flags = flags
+
+        return FsmPoolResult(
+            profiles=self._profile_names,
+            cls_ids=cls_ids,
+            flags=flags,
+            profile_idx=active.copy(),
+            step_index=self._step_index.copy(),
+        )
+
+    def result(self, stream: int) -> Optional[FsmResult]:
+        """
+            Полный снимок FsmResult потока по итогам последнего такта (как Fsm.result).
+            Счётчики и история читаются из текущих массивов пула.
+            None — если у потока ещё не было шагов (или он сброшен).
+        """
+        if not self._enable or not self._step_index[stream]:
+            return None
+        profile_idx = int(self._active[stream])
+        profile = self._profiles[profile_idx]
+        table = profile.table
+        cur_state = table.states[self._cur_idx[stream, profile_idx]]
+        flags = int(self._last_flags[stream])
+        return FsmResult(
+            active_profile=profile.name,
+            prev_profile=self._profiles[int(self._prev_active[stream])].name,
+            state=cur_state,
+            resetter=bool(flags & FsmStepFlags.RESETTER),
+            breaker=bool(flags & FsmStepFlags.BREAKER),
+            stable=bool(flags & FsmStepFlags.STABLE),
+            stage_done=bool(flags & FsmStepFlags.STAGE_DONE),
+            profile_changed=bool(flags & FsmStepFlags.PROFILE_CHANGED),
+            counters=self.get_counters(stream, profile_idx),
+            history=self.get_history(stream, profile_idx),
+            step_index=int(self._step_index[stream]),
+            timestamp=datetime.now(),
+        )
+
+    def get_counters(self, stream: int, profile_idx: Optional[int] = None) -> dict:
+        """ Словарь {State: count} профиля потока (по умолчанию — активного). """
+        profile_idx = int(self._active[stream]) if profile_idx is None else profile_idx
+        table = self._profiles[profile_idx].table
+        counters = self._counters[stream, profile_idx]
+        return {table.state(cls_id): int(counters[cls_id - self._offset]) for cls_id in table.all_ids}
+
+    def get_history(self, stream: int, profile_idx: Optional[int] = None) -> list:
+        """ Стабильная история профиля потока (по умолчанию — активного) в порядке добавления. """
+        profile_idx = int(self._active[stream]) if profile_idx is None else profile_idx
+        states = self._profiles[profile_idx].table.states
+        length = int(self._hist_len[stream, profile_idx])
+        head = int(self._hist_head[stream, profile_idx])
+        positions = (head - length + np.arange(length)) % self.HISTORY_MAX_LEN
+        return [states[i] for i in self._hist[stream, profile_idx, positions].tolist()]
+
+    def switch_profile_by_pid(self, pid: Optional[int], streams: Optional[Sequence[int]] = None) -> None:
+        """ Сменить активный профиль по id продукции у указанных потоков (по умолчанию — у всех). """
+        profile = self._profile_manager.choose_profile_by_pid(pid)
+        self._set_active(profile.name, streams)
+
+    def switch_profile_by_name(self, profile_name: ProfileNames | str, streams: Optional[Sequence[int]] = None) -> None:
+        """ Сменить активный профиль по имени у указанных потоков (по умолчанию — у всех). """
+        profile_name = normalize_enum_str(profile_name, case="lower")
+        profile = self._profile_manager.choose_profile_by_name(profile_name)
+        self._set_active(profile.name, streams)
+
+    def reset(self, streams: Optional[Sequence[int]] = None) -> None:
+        """
+            Возвращает потоки (по умолчанию — все) к состоянию сразу после создания, как Fsm.reset:
+            счётчики, стабильная история и текущее состояние профилей — начальные, активен профиль по умолчанию,
+            результата и step_index нет.
+        """
+        self._reset_streams(self._streams if streams is None else np.asarray(streams, dtype=np.intp))
+
+    # -------------------- Internal --------------------
+
+    def _compile_tables(self) -> None:
+        """ Собирает таблицы профилей в массивы [profile, state]. """
+        tables: list[StateTable] = [profile.table for profile in self._profiles]
+        self._offset: int = tables[0].offset
+        size = len(tables[0].states)
+        for table in tables:
+            if table.offset != self._offset or len(table.states) != size:
+                raise ValueError(f"[{self.__class__.__name__}] All profiles must share the same set of cls_id")
+
+        n_profiles = len(tables)
+        self._profile_range = np.arange(n_profiles)
+        self._configured = np.array([state is not None for state in tables[0].states], dtype=bool)
+        self._stable_lims = np.array([table.stable_lims for table in tables], dtype=np.int64)
+        flags = np.frombuffer(b"".join(table.flags for table in tables), dtype=np.uint8).reshape(n_profiles, size)
+        self._resettable = (flags & StateTable.RESETTABLE) != 0
+        self._resetter = (flags & StateTable.RESETTER) != 0
+        self._breaker = (flags & StateTable.BREAKER) != 0
+
+        # Ожидаемые последовательности сравниваются по имени состояния (как в StableStateHistory.is_valid)
+        name_ids: dict[str, int] = {}
+        self._name_codes = np.full((n_profiles, size), -1, dtype=np.int32)
+        for p, table in enumerate(tables):
+            for i, state in enumerate(table.states):
+                if state is not None:
+                    self._name_codes[p, i] = name_ids.setdefault(state.name, len(name_ids))
+        self._seq_codes = tuple(
+            tuple(self._name_codes[p, [tables[p].index(s.cls_id) for s in seq]] for seq in profile.expected_sequences)
+            for p, profile in enumerate(self._profiles)
+        )
+        self._hist_dtype = np.int16 if size <= np.iinfo(np.int16).max else np.int32
+
+    def _init_streams(self) -> None:
+        """ Выделяет массивы состояния потоков и заполняет их начальным состоянием профилей. """
+        n_streams, n_profiles = self._n_streams, len(self._profiles)
+        size, max_len = len(self._configured), self.HISTORY_MAX_LEN
+        self._streams = np.arange(n_streams)
+        self._counters = np.zeros((n_streams, n_profiles, size), dtype=np.int64)
+        self._cur_idx = np.empty((n_streams, n_profiles), dtype=np.intp)
+        self._hist = np.zeros((n_streams, n_profiles, max_len), dtype=self._hist_dtype)
+        self._hist_len = np.zeros((n_streams, n_profiles), dtype=np.intp)
+        self._hist_head = np.zeros((n_streams, n_profiles), dtype=np.intp)
+        self._matched = np.zeros((n_streams, n_profiles), dtype=bool)
+        self._active = np.empty(n_streams, dtype=np.intp)
+        self._prev_active = np.empty(n_streams, dtype=np.intp)
+        self._last_flags = np.zeros(n_streams, dtype=np.uint8)
+        self._step_index = np.zeros(n_streams, dtype=np.int64)
+
+        # Начальное состояние профилей шаблона: текущее состояние и стабильная история (индексы таблицы)
+        self._init_cur_idx = tuple(profile.table.index(profile.cur_state.cls_id) for profile in self._profiles)
+        self._init_hist = tuple(
+            [profile.table.index(s.cls_id) for s in profile.get_history()][-max_len:] for profile in self._profiles
+        )
+        self._def_idx: int = self._profile_names.index(self._profile_manager.active_profile.name)
+        self._reset_streams(self._streams)
+
+    def _reset_streams(self, streams: Any) -> None:
+        """ Заполняет состояние указанных потоков начальным состоянием профилей. """
+        max_len = self.HISTORY_MAX_LEN
+        self._counters[streams] = 0
+        self._hist[streams] = 0
+        for p in range(len(self._profiles)):
+            init = self._init_hist[p]
+            self._cur_idx[streams, p] = self._init_cur_idx[p]
+            self._hist[streams, p, :len(init)] = init
+            self._hist_len[streams, p] = len(init)
+            self._hist_head[streams, p] = len(init) % max_len
+        n_profiles = len(self._profiles)
+        self._update_matched(np.repeat(streams, n_profiles), np.tile(self._profile_range, len(streams)))
+        self._active[streams] = self._def_idx
+        self._prev_active[streams] = self._def_idx
+        self._last_flags[streams] = 0
+        self._step_index[streams] = 0
+
+    def _validate_indexes(self, idx: Any, cls_ids: Any) -> None:
+        """ Проверяет, что все cls_id сконфигурированы. """
+        in_range = (idx >= 0) & (idx < len(self._configured))
+        valid = in_range.copy()
+        valid[in_range] = self._configured[idx[in_range]]
+        if not valid.all():
+            raise KeyError(int(cls_ids[np.argmin(valid)]))
+
+    def _append_history(self, stream_rows: Any, profile_rows: Any, idx: Any) -> None:
+        """ Дописывает текущее состояние в кольцевые буферы истории указанных (stream, profile). """
+        heads = self._hist_head[stream_rows, profile_rows]
+        self._hist[stream_rows, profile_rows, heads] = idx[stream_rows]
+        self._hist_head[stream_rows, profile_rows] = (heads + 1) % self.HISTORY_MAX_LEN
+        self._hist_len[stream_rows, profile_rows] = np.minimum(
+            self._hist_len[stream_rows, profile_rows] + 1, self.HISTORY_MAX_LEN
+        )
+        self._update_matched(stream_rows, profile_rows)
+
+    def _update_matched(self, stream_rows: Any, profile_rows: Any) -> None:
+        """ Пересчитывает совпадение хвоста истории с ожидаемыми последовательностями для (stream, profile). """
+        for p in np.unique(profile_rows).tolist():
+            rows = stream_rows[profile_rows == p]
+            lengths = self._hist_len[rows, p]
+            heads = self._hist_head[rows, p]
+            matched = np.zeros(len(rows), dtype=bool)
+            for seq in self._seq_codes[p]:
+                seq_len = len(seq)
+                positions = (heads[:, None] - seq_len + np.arange(seq_len)) % self.HISTORY_MAX_LEN
+                tail = self._name_codes[p, self._hist[rows[:, None], p, positions]]
+                matched |= (lengths >= seq_len) & (tail == seq).all(axis=1)
+            self._matched[rows, p] = matched
+
+    def _set_active(self, profile_name: str, streams: Optional[Sequence[int]]) -> None:
+        streams = slice(None) if streams is None else np.asarray(streams)
+        self._active[streams] = self._profile_names.index(profile_name)
+
+    def _empty_result(self, cls_ids: Any) -> FsmPoolResult:
+        """ Результат для выключенной машины состояний. """
+        return FsmPoolResult(
+            profiles=self._profile_names,
+            cls_ids=cls_ids,
+            flags=np.zeros(self._n_streams, dtype=np.uint8),
+            profile_idx=np.zeros(self._n_streams, dtype=np.intp),
+            step_index=np.zeros(self._n_streams, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return self._n_streams
+
+    def __repr__(self) -> str:
+        return f"<FsmPool streams={self._n_streams} profiles={len(self._profiles)}>"
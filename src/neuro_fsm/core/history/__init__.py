@@ -1,2 +1,3 @@
 from .raw_state_history import RawStateHistory
 from .stable_state_history import StableStateHistory
+from .sequence_automaton import SequenceAutomaton
@@ -10,6 +10,8 @@ from ..states import State
 class BaseStateHistory(ABC):
     """ Базовый класс истории состояний. """
 
+    __slots__ = ('_records', )
+
     def __init__(self, max_len: int = 100) -> None:
         self._records: Deque[State] = deque(maxlen=max_len)
 
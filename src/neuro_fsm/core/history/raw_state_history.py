@@ -2,36 +2,192 @@ from __future__ import annotations
 
 __all__ = ['RawStateHistory', ]
 
+from array import array
+from typing import Any, Iterator
+
+from ...models.enums import HistoryLengthUnits
+from ..states import State, StateTable
 from .base_state_history import BaseStateHistory
-from ..states import State
 
 
 class RawStateHistory(BaseStateHistory):
     """
         Простейшая история всех состояний без логики профилей и стабильности.
-        Хранит полную последовательность и предоставляет базовые методы доступа.
+        Хранится в виде серий (run-length encoding): для каждой серии подряд идущих одинаковых cls_id —
+        (cls_id, run_length, first_step) в трёх параллельных array. Повтор состояния — инкремент длины
+        последней серии, поэтому count_last_repeats() — O(1), а при той же памяти помещается гораздо больше кадров.
+        Граница длины (max_len) задаётся в кадрах или в сериях (HistoryLengthUnits).
+        first_step — номер кадра начала серии (с 1, совпадает со step_index FSM; сбрасывается clear()).
+        Объекты State восстанавливаются по StateTable только при чтении.
+        Замечания:
+            - to_numpy() отдаёт представления без копирования; они отражают текущий буфер и действительны
+              до следующего изменения истории.
     """
 
-    def __init__(self, max_len: int = 100) -> None:
-        super().__init__(max_len)
+    __slots__ = ('_table', '_max_len', '_unit', '_cls_ids', '_run_lengths', '_first_steps',
+                 '_start', '_end', '_frames', '_next_step')
+
+    def __init__(
+            self,
+            table: StateTable,
+            max_len: int = 100,
+            unit: HistoryLengthUnits = HistoryLengthUnits.RUNS
+    ) -> None:
+        """
+            Args:
+                table (StateTable): Таблица состояний для восстановления State по cls_id.
+                max_len (int): Граница длины истории.
+                unit (HistoryLengthUnits): Единицы max_len — кадры или серии.
+        """
+        if max_len <= 0:
+            raise ValueError(f"[{self.__class__.__name__}] max_len must be > 0, got {max_len}")
+        # Хранилище базового класса (deque) не создаём: серии лежат в параллельных array
+        self._table: StateTable = table
+        self._max_len: int = max_len
+        self._unit: HistoryLengthUnits = unit
+        # Буфер с запасом вдвое: серии дописываются в конец, а при его заполнении живая часть сдвигается в начало
+        capacity = 2 * max_len
+        self._cls_ids: array = array('i', bytes(4 * capacity))
+        self._run_lengths: array = array('q', bytes(8 * capacity))
+        self._first_steps: array = array('q', bytes(8 * capacity))
+        self._start: int = 0
+        self._end: int = 0
+        self._frames: int = 0
+        self._next_step: int = 1
+
+    @property
+    def max_len(self) -> int:
+        return self._max_len
+
+    @property
+    def unit(self) -> HistoryLengthUnits:
+        return self._unit
+
+    @property
+    def records(self) -> tuple[State, ...]:
+        """ Возвращает всю историю состояний по кадрам (серии развёрнуты). """
+        return tuple(self)
+
+    @property
+    def runs_count(self) -> int:
+        """ Количество серий в истории. """
+        return self._end - self._start
+
+    def add(self, *states: State) -> None:
+        """ Добавляет состояния в историю (по кадру на состояние). """
+        for state in states:
+            self.add_repeated(state, 1)
+
+    def add_repeated(self, state: State, count: int) -> None:
+        """ Добавляет состояние count раз подряд за O(1). """
+        if count <= 0:
+            return
+        cls_id = state.cls_id
+        if self._end > self._start and self._cls_ids[self._end - 1] == cls_id:
+            self._run_lengths[self._end - 1] += count
+        else:
+            if self._end == len(self._cls_ids):
+                self._compact()
+            end = self._end
+            self._cls_ids[end] = cls_id
+            self._run_lengths[end] = count
+            self._first_steps[end] = self._next_step
+            self._end = end + 1
+        self._frames += count
+        self._next_step += count
+        self._trim()
+
+    def clear(self) -> None:
+        """ Очищает историю (буферы не перевыделяются). """
+        self._start = self._end = 0
+        self._frames = 0
+        self._next_step = 1
 
     def last(self) -> State | None:
         """ Возвращает последнее состояние (если есть). """
-        return self._records[-1] if self._records else None
+        return self._table.state(self._cls_ids[self._end - 1]) if self._end > self._start else None
 
     def count_last_repeats(self) -> int:
-        """ Возвращает количество подряд идущих повторений последнего состояния. """
-        if not self._records:
-            return 0
-        last = self._records[-1]
-        count = 1
-        for state in reversed(list(self._records)[:-1]):
-            if state.cls_id == last.cls_id:
-                count += 1
-            else:
-                break
-        return count
+        """ Возвращает количество подряд идущих повторений последнего состояния (O(1)). """
+        return self._run_lengths[self._end - 1] if self._end > self._start else 0
+
+    def runs(self) -> Iterator[tuple[State, int, int]]:
+        """ Итерирует по сериям от старых к новым: (State, run_length, first_step). """
+        state = self._table.state
+        for i in range(self._start, self._end):
+            yield state(self._cls_ids[i]), self._run_lengths[i], self._first_steps[i]
 
     def as_list(self) -> list[State]:
         """ Возвращает список всех состояний. """
-        return list(self._records)
+        return list(self)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """
+            Возвращает колонки серий как массивы NumPy без копирования: cls_id, run_length, first_step.
+            Зависимость numpy опциональна, проверяется лениво.
+        """
+        try:
+            import numpy as np  # noqa: WPS433
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError("RawStateHistory.to_numpy requires 'numpy' to be installed.") from exc
+
+        start, count = self._start, self._end - self._start
+        return {
+            "cls_id": np.frombuffer(self._cls_ids, dtype=np.int32, count=count, offset=4 * start),
+            "run_length": np.frombuffer(self._run_lengths, dtype=np.int64, count=count, offset=8 * start),
+            "first_step": np.frombuffer(self._first_steps, dtype=np.int64, count=count, offset=8 * start),
+        }
+
+    def _compact(self) -> None:
+        """ Сдвигает живые серии в начало буфера (без перевыделения: открытые представления остаются валидными). """
+        start, end = self._start, self._end
+        n = end - start
+        for column in (self._cls_ids, self._run_lengths, self._first_steps):
+            column[0:n] = column[start:end]
+        self._start, self._end = 0, n
+
+    def _trim(self) -> None:
+        """ Вытесняет самые старые кадры/серии сверх max_len. """
+        if self._unit is HistoryLengthUnits.RUNS:
+            if self._end - self._start > self._max_len:
+                self._frames -= self._run_lengths[self._start]
+                self._start += 1
+            return
+        excess = self._frames - self._max_len
+        while excess > 0:
+            start = self._start
+            run_length = self._run_lengths[start]
+            if run_length > excess:
+                # Частично вытесняем самую старую серию
+                self._run_lengths[start] = run_length - excess
+                self._first_steps[start] += excess
+                self._frames -= excess
+                return
+            self._frames -= run_length
+            excess -= run_length
+            self._start = start + 1
+
+    def __len__(self) -> int:
+        """ Количество кадров в истории. """
+        return self._frames
+
+    def __getitem__(self, idx: int) -> State:
+        if idx < 0:
+            idx += self._frames
+        if not 0 <= idx < self._frames:
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        for i in range(self._start, self._end):
+            run_length = self._run_lengths[i]
+            if idx < run_length:
+                return self._table.state(self._cls_ids[i])
+            idx -= run_length
+        raise IndexError(f"{self.__class__.__name__} index out of range")  # pragma: no cover
+
+    def __iter__(self) -> Iterator[State]:
+        for state, run_length, _ in self.runs():
+            for _ in range(run_length):
+                yield state
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} frames={self._frames} runs={self._end - self._start} "
+                f"max_len={self._max_len} {self._unit.name.lower()}>")
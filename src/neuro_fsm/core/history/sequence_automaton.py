@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+__all__ = ['SequenceAutomaton']
+
+from collections import deque
+from functools import lru_cache
+from typing import Hashable, Sequence
+
+
+class SequenceAutomaton:
+    """
+        Автомат Ахо — Корасик над ожидаемыми последовательностями профиля.
+        История подаётся в автомат по одному символу (имени состояния), текущий узел хранится снаружи
+        (в StableStateHistory), поэтому один скомпилированный автомат разделяется всеми историями
+        с одинаковыми последовательностями.
+        Для каждого узла заранее известны:
+            - matched: хвост истории совпадает с одной из последовательностей целиком;
+            - depth: длина самого длинного хвоста истории, являющегося префиксом какой-либо последовательности.
+        Переход — одно обращение к словарю; символ вне алфавита последовательностей ведёт в корень.
+    """
+
+    ROOT = 0
+
+    __slots__ = ('_transitions', '_matched', '_depth', '_max_len')
+
+    def __init__(self, sequences: Sequence[Sequence[Hashable]]) -> None:
+        """
+            Args:
+                sequences: Ожидаемые последовательности символов (например, имён состояний).
+        """
+        goto: list[dict[Hashable, int]] = [{}]
+        matched: list[bool] = [False]
+        depth: list[int] = [0]
+        for seq in sequences:
+            node = self.ROOT
+            for symbol in seq:
+                nxt = goto[node].get(symbol)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][symbol] = nxt
+                    goto.append({})
+                    matched.append(False)
+                    depth.append(depth[node] + 1)
+                node = nxt
+            matched[node] = True
+
+        # Суффиксные ссылки и полная функция переходов (BFS по уровням)
+        alphabet = {symbol for seq in sequences for symbol in seq}
+        fail = [self.ROOT] * len(goto)
+        transitions: list[dict[Hashable, int]] = [{} for _ in goto]
+        queue: deque[int] = deque()
+        for symbol in alphabet:
+            nxt = goto[self.ROOT].get(symbol)
+            if nxt is None:
+                transitions[self.ROOT][symbol] = self.ROOT
+            else:
+                transitions[self.ROOT][symbol] = nxt
+                queue.append(nxt)
+        while queue:
+            node = queue.popleft()
+            matched[node] = matched[node] or matched[fail[node]]
+            for symbol in alphabet:
+                nxt = goto[node].get(symbol)
+                if nxt is None:
+                    transitions[node][symbol] = transitions[fail[node]][symbol]
+                else:
+                    fail[nxt] = transitions[fail[node]][symbol]
+                    transitions[node][symbol] = nxt
+                    queue.append(nxt)
+
+        self._transitions: tuple[dict[Hashable, int], ...] = tuple(transitions)
+        self._matched: tuple[bool, ...] = tuple(matched)
+        self._depth: tuple[int, ...] = tuple(depth)
+        self._max_len: int = max((len(seq) for seq in sequences), default=0)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def compile(cls, sequences: tuple[tuple[Hashable, ...], ...]) -> SequenceAutomaton:
+        """ Возвращает автомат для набора последовательностей, компилируя его один раз на процесс. """
+        return cls(sequences)
+
+    @property
+    def max_len(self) -> int:
+        """ Длина самой длинной последовательности. """
+        return self._max_len
+
+    def step(self, node: int, symbol: Hashable) -> int:
+        """ Возвращает узел после подачи символа. """
+        return self._transitions[node].get(symbol, self.ROOT)
+
+    def is_matched(self, node: int) -> bool:
+        """ True, если в узле завершается одна из последовательностей. """
+        return self._matched[node]
+
+    def depth(self, node: int) -> int:
+        """ Прогресс совпадения: длина совпавшего префикса самой длинной подходящей последовательности. """
+        return self._depth[node]
+
+    def __len__(self) -> int:
+        return len(self._transitions)
+
+    def __repr__(self) -> str:
+        return f"<SequenceAutomaton nodes={len(self._transitions)} max_len={self._max_len}>"
@@ -1,30 +1,87 @@
 __all__ = ['StableStateHistory']
 
+from typing import Optional
+
 from ...configs import ProfileConfig
-from ..states import StateTupleTuple, State
+from ..states import StateTuple, StateTupleTuple, State
 from .base_state_history import BaseStateHistory
+from .sequence_automaton import SequenceAutomaton
 
 
 class StableStateHistory(BaseStateHistory):
     """
         Хранит историю стабильных состояний и проверяет,
         соответствует ли она одной из ожидаемых последовательностей.
+        Ожидаемые последовательности скомпилированы в автомат Ахо — Корасик (SequenceAutomaton):
+        текущий узел продвигается один раз при добавлении состояния, поэтому проверки совпадения
+        и прогресса — O(1) и не зависят от числа и длины последовательностей.
+        Последовательности сравниваются по имени состояния (имена уникальны в пределах профиля).
     """
 
+    __slots__ = ('_expected_sequences', '_history_min_len', '_automaton', '_node', '_snapshot')
+
     def __init__(self, expected_sequences: StateTupleTuple, max_len: int = 100) -> None:
         """
             Args:
-                config (ProfileConfig): Конфигурация профиля с init_states и expected_sequences.
+                expected_sequences (StateTupleTuple): Ожидаемые последовательности состояний профиля.
                 max_len (int): Максимальная длина истории.
         """
         super().__init__(max_len)
         self._expected_sequences: StateTupleTuple = expected_sequences
         self._history_min_len: int = min(len(seq) for seq in self._expected_sequences)
+        # Последовательности длиннее max_len никогда не поместятся в историю — в автомат их не включаем
+        self._automaton: SequenceAutomaton = SequenceAutomaton.compile(
+            tuple(tuple(s.name for s in seq) for seq in expected_sequences if len(seq) <= max_len)
+        )
+        self._node: int = SequenceAutomaton.ROOT
+        # Кэш неизменяемого снимка истории, сбрасывается при изменении
+        self._snapshot: Optional[StateTuple] = None
 
     @property
     def records(self) -> list[State]:
         return list(self._records)
 
+    @property
+    def automaton(self) -> SequenceAutomaton:
+        """ Скомпилированный (общий для одинаковых наборов последовательностей) автомат. """
+        return self._automaton
+
+    @property
+    def progress(self) -> int:
+        """ Длина хвоста истории, совпадающего с началом какой-либо ожидаемой последовательности. """
+        return self._automaton.depth(self._node)
+
+    def add(self, *states: State) -> None:
+        super().add(*states)
+        automaton, node = self._automaton, self._node
+        for state in states:
+            node = automaton.step(node, state.name)
+        self._node = node
+        self._snapshot = None
+
+    def clear(self) -> None:
+        super().clear()
+        self._node = SequenceAutomaton.ROOT
+        self._snapshot = None
+
+    def checkpoint(self) -> tuple[StateTuple, int]:
+        """ Снимок истории вместе с узлом автомата — для последующего restore() без перепроверки шаблонов. """
+        return self.snapshot(), self._node
+
+    def restore(self, checkpoint: tuple[StateTuple, int]) -> None:
+        """ Восстанавливает историю из checkpoint(). """
+        records, node = checkpoint
+        self._records.clear()
+        self._records.extend(records)
+        self._node = node
+        self._snapshot = records
+
+    def snapshot(self) -> StateTuple:
+        """ Неизменяемый снимок истории; пока история не меняется, возвращается один и тот же кортеж. """
+        if self._snapshot is None:
+            self._snapshot = tuple(self._records)
+        return self._snapshot
+
     def last(self) -> State | None:
         """ Возвращает последнее состояние (если есть). """
         return self._records[-1] if self._records else None
@@ -35,8 +92,11 @@ class StableStateHistory(BaseStateHistory):
             Returns:
                 True - если последовательность отличается.
         """
-        history_tail = list(self._records)[-len(states):]
-        return any(h.cls_id != s.cls_id for h, s in zip(history_tail, states))
+        records = self._records
+        if len(states) == 1:
+            return bool(records) and records[-1].cls_id != states[0].cls_id
+        start = max(len(records) - len(states), 0) if states else 0
+        return any(records[start + i].cls_id != s.cls_id for i, s in zip(range(len(records) - start), states))
 
     def is_valid(self) -> bool:
         """
@@ -44,28 +104,15 @@ class StableStateHistory(BaseStateHistory):
             Returns:
                 True — если есть полное совпадение с одним из шаблонов.
         """
-        if len(self._records) < self._history_min_len:
-            return False
-
-        for expected_seq in self._expected_sequences:
-            if len(expected_seq) > len(self._records):
-                continue
-
-            history_slice = list(self._records)[-len(expected_seq):]
-            if all(h.name == e.name for h, e in zip(history_slice, expected_seq)):
-                return True
-
-        return False
+        return self._automaton.is_matched(self._node)
 
     def is_impossible(self) -> bool:
-        """ Возвращает True, если история больше не может соответствовать ни одной ожидаемой последовательности. """
-        for expected_seq in self._expected_sequences:
-            if len(expected_seq) > len(self._records):
-                continue
-            history_tail = list(self._records)[-len(expected_seq):]
-            if all(h.cls_id == e.cls_id for h, e in zip(history_tail, expected_seq)):
-                return False  # ещё возможен матч
-        return True
+        """
+            Проверяет, может ли история ещё привести к ожидаемой последовательности.
+            Returns:
+                True — если ни один хвост истории не является началом какого-либо шаблона (узел автомата — корень).
+        """
+        return self._node == SequenceAutomaton.ROOT
 
     def as_dict(self) -> dict:
         """ Сериализует только текущую историю состояний. """
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+__all__ = ['deep_sizeof']
+
+import sys
+from collections import deque
+from enum import Enum
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Iterable, Optional
+
+# Объекты, которые не принадлежат экземпляру и не обходятся: типы, модули, функции, члены Enum
+_SKIP_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, Enum)
+
+
+def deep_sizeof(objs: Iterable[Any], seen: Optional[set[int]] = None) -> int:
+    """
+        Оценивает суммарный размер объектов в байтах вместе со всем, на что они ссылаются.
+        Каждый объект учитывается один раз: его id добавляется в seen. Передавая один и тот же seen
+        в несколько вызовов, можно исключить из отчёта уже посчитанные (например, общие) объекты.
+        Обходятся контейнеры (dict/list/tuple/set/deque), атрибуты __dict__ и __slots__.
+        Args:
+            objs: Корневые объекты.
+            seen: Множество id уже учтённых объектов (дополняется).
+        Returns:
+            int: Размер в байтах (по sys.getsizeof).
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = list(objs)
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen or isinstance(obj, _SKIP_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif isinstance(obj, (str, bytes, bytearray, int, float, bool)):
+            continue
+        else:
+            if hasattr(obj, '__dict__'):
+                stack.append(vars(obj))
+            for cls in type(obj).__mro__:
+                slots = cls.__dict__.get('__slots__', ())
+                for name in (slots,) if isinstance(slots, str) else slots:
+                    if name not in ('__dict__', '__weakref__') and hasattr(obj, name):
+                        stack.append(getattr(obj, name))
+    return total
@@ -2,9 +2,9 @@ __all__ = ['Profile']
 
 from typing import TYPE_CHECKING, Optional
 
-from ..states import State, StateTuple, StateDict, StateTupleTuple
-from ..counters import StableStateCounters
-from ..history import StableStateHistory
+from ..states import State, StateTable, StateTuple, StateDict, StateTupleTuple
+from ..counters import StableStateCounters, SparseStateCounters, CountersSnapshot
+from ..history import StableStateHistory, SequenceAutomaton
 
 if TYPE_CHECKING:
     from ...history_writer import StableHistoryWriter
@@ -14,9 +14,17 @@ class Profile:
         Рабочая единица профиля в машине состояний.
         Содержит:
             - Ссылки на State (states, init_states, default_states, expected_sequences)
-            - Счётчики состояний
+            - Счётчики состояний (плотные StableStateCounters или разреженные SparseStateCounters)
             - Историю состояний
+            - Скомпилированную таблицу состояний (StateTable) для горячего пути
     """
+
+    __slots__ = (
+        '_name', '_description', '_states', '_init_states', '_default_states', '_expected_sequences', '_cur_state',
+        '_table', '_table_states', '_stable_lims', '_flags', '_cur_idx', '_counters', '_history',
+        '_init_cur_state', '_init_history',
+    )
+
     def __init__(
             self,
             name: str,
@@ -24,7 +32,9 @@ class Profile:
             init_states: StateTuple,
             default_states: StateTuple,
             expected_sequences: StateTupleTuple,
-            description: str = ""
+            description: str = "",
+            table: Optional[StateTable] = None,
+            sparse_counters: bool = False
         ) -> None:
         self._name: str  = name
         self._description: str = description
@@ -35,15 +45,31 @@ class Profile:
         self._expected_sequences: StateTupleTuple = expected_sequences
         self._cur_state: State = self._init_states[-1]
 
-        self._counters = StableStateCounters(states)
+        # Плоские массивы по cls_id вместо обращений к dict/dataclass на каждом кадре
+        self._table: StateTable = table if table is not None else StateTable(states)
+        self._table_states: tuple[Optional[State], ...] = self._table.states
+        self._stable_lims: tuple[int, ...] = self._table.stable_lims
+        self._flags: bytes = self._table.flags
+        self._cur_idx: int = self._table.index(self._cur_state.cls_id)
+
+        self._counters = SparseStateCounters(states) if sparse_counters else StableStateCounters(states)
         self._history = StableStateHistory(expected_sequences)
         self._add_init_states_to_history()
+        # Начальное состояние профиля: восстанавливается при сбросе вместо повторного построения
+        self._init_cur_state: State = self._cur_state
+        self._init_history: tuple[StateTuple, int] = self._history.checkpoint()
 
     def set_cur_state_by_id(self, cls_id: int) -> None:
-        self._cur_state = self._states[cls_id]
+        self._cur_idx = self._table.index(cls_id)
+        self._cur_state = self._table_states[self._cur_idx]
 
-    def increment_counter(self) -> None:
-        self._counters.increment(self._cur_state.cls_id)
+    def increment_counter(self, count: int = 1) -> None:
+        self._counters.increment(self._cur_state.cls_id, count)
+
+    def register_state(self, cls_id: int) -> None:
+        """ Делает состояние текущим и увеличивает его счётчик (один вызов на кадр). """
+        self.set_cur_state_by_id(cls_id)
+        self._counters.increment(cls_id)
 
     @property
     def name(self) -> str:
@@ -57,6 +83,10 @@ class Profile:
     def states(self) -> StateDict:
         return self._states
 
+    @property
+    def table(self) -> StateTable:
+        return self._table
+
     @property
     def init_states(self) -> StateTuple:
         return self._init_states
@@ -69,46 +99,77 @@ class Profile:
     def expected_sequences(self) -> StateTupleTuple:
         return self._expected_sequences
 
+    @property
+    def history_automaton(self) -> SequenceAutomaton:
+        """ Автомат ожидаемых последовательностей (общий для профилей с одинаковыми последовательностями). """
+        return self._history.automaton
+
     def is_cur_state_resetter(self) -> bool:
-        return self._cur_state.is_resetter
+        return bool(self._flags[self._cur_idx] & StateTable.RESETTER)
 
     def is_cur_state_breaker(self) -> bool:
-        return self._cur_state.is_breaker
+        return bool(self._flags[self._cur_idx] & StateTable.BREAKER)
 
     def is_state_stable(self, cur_state: Optional[State] = None) -> bool:
         """ Определяет стабильное ли состояние. Если stable_min_lim не задано, то состояние не может быть стабильным """
-        state = cur_state if cur_state else self._cur_state
+        if cur_state is None or cur_state is self._cur_state:
+            stable_lim = self._stable_lims[self._cur_idx]
+            return stable_lim > 0 and self._counters.get(self._cur_state.cls_id) >= stable_lim
+        # Состояние из другого профиля: порог берём из него самого
+        state = cur_state
         if state.stable_min_lim and state.stable_min_lim >= 0:
             return self._counters.get(state.cls_id) >= state.stable_min_lim
         else:
             return False
 
+    def frames_until_stable(self) -> Optional[int]:
+        """
+            Через сколько повторов текущего состояния (считая следующий кадр первым) оно станет стабильным.
+            None — если состояние не может стать стабильным или уже стабильно.
+        """
+        stable_lim = self._stable_lims[self._cur_idx]
+        count = self._counters.get(self._cur_state.cls_id)
+        return stable_lim - count if 0 < stable_lim and count < stable_lim else None
+
     def get_counter_by_cls_id(self, cls_id: int) -> int:
         """ Возвращает счётчик состояния, найденного по cls_id. """
         return self._counters.get(cls_id)
 
     def get_counters(self) -> dict[State, int]:
-        """ Возвращает словарь {State: count}, что удобно для логирования и отображения. """
+        """
+            Возвращает словарь {State: count}, что удобно для логирования и отображения.
+            В режиме разреженных счётчиков — только живые (ненулевые) счётчики.
+        """
         counters = self._counters.as_dict()
         return {self._states[cls_id]: count for cls_id, count in counters.items()}
 
     def get_history(self) -> list[State]:
         return self._history.records
 
-    def is_expected_seq_valid(self, writer: "StableHistoryWriter") -> bool:
+    def snapshot_counters(self) -> CountersSnapshot:
+        """ Снимок счётчиков без копирования (словарь {State: count} строится при чтении). """
+        return self._counters.snapshot()
+
+    def snapshot_history(self) -> StateTuple:
+        """ Неизменяемый снимок стабильной истории. """
+        return self._history.snapshot()
+
+    def is_expected_seq_valid(self, writer: Optional["StableHistoryWriter"] = None) -> bool:
+        """ Сработала ли ожидаемая последовательность; событие пишется в writer, если он передан. """
         if self._history.is_valid():
-            writer.write_action(
-                cur_state=self.cur_state,
-                count=self.get_counter_by_cls_id(self.cur_state.cls_id),
-                action="expected_seq_done",
-                profile=self
-            )
+            if writer is not None:
+                writer.write_action(
+                    cur_state=self.cur_state,
+                    count=self.get_counter_by_cls_id(self.cur_state.cls_id),
+                    action="expected_seq_done",
+                    profile=self
+                )
             return True
         return False
 
     def add_cur_state_to_history(self) -> bool:
         cur_state_count = self._counters.get(self._cur_state.cls_id)
-        if self._history.is_different_from_last(self._cur_state) and cur_state_count >= self._cur_state.stable_min_lim:
+        if self._history.is_different_from_last(self._cur_state) and cur_state_count >= self._stable_lims[self._cur_idx]:
             self._history.add(self._cur_state)
             return True
         return False
@@ -121,15 +182,23 @@ class Profile:
                                         Если False — сбрасываются все состояния, кроме указанных.
                 except_cur_state (bool): Сбрасывать ли счётчик текущего состояния.
         """
-        for state in self._states.values():
-            is_excepted = except_cur_state and state == self._cur_state
-            if not is_excepted and (not only_resettable or state.is_resettable):
-                self._counters.reset(state.cls_id)
+        if only_resettable:
+            self._counters.reset_resettable(self._cur_state.cls_id if except_cur_state else None)
+        elif except_cur_state:
+            self._counters.reset_all_except(self._cur_state.cls_id)
+        else:
+            self._counters.reset_all()
 
     def reset_to_init_state(self):
-        self.reset_counters(only_resettable=False, except_cur_state=False)
-        self._history.clear()
-        self._add_init_states_to_history()
+        """ Сбрасывает счётчики и возвращает историю к начальному снимку (текущее состояние сохраняется). """
+        self._counters.reset_all()
+        self._history.restore(self._init_history)
+
+    def reset(self) -> None:
+        """ Полный сброс профиля к состоянию сразу после создания. """
+        self.reset_to_init_state()
+        self._cur_state = self._init_cur_state
+        self._cur_idx = self._table.index(self._cur_state.cls_id)
 
     def _add_init_states_to_history(self) -> None:
         """Добавляет состояния из _init_states в историю, исключая уже присутствующие."""
@@ -4,8 +4,8 @@ from typing import Iterator, Optional, TYPE_CHECKING
 
 from ...configs.profile_config import ProfileConfig, ProfileConfigTuple
 from ...configs.state_config import StateConfigDict
-from ...models import ProfileSwitcherStrategies, ProfileNames
-from ..states import StateFactory
+from ...models import ProfileSwitcherStrategies, ProfileNames, CountersModes
+from ..states import StateFactory, StateInterner
 from .profile_switcher import ProfileSwitcher
 from .profile import Profile
 from .types import ProfileDict
@@ -20,17 +20,37 @@ class ProfileManager:
         Хранит активный профиль и управляет логикой обновления/сброса.
     """
 
+    # С какого числа состояний режим CountersModes.AUTO выбирает разреженные счётчики
+    SPARSE_COUNTERS_MIN_STATES: int = 500
+
+    __slots__ = (
+        '_state_interner', '_profiles', '_profile_names', '_profile_indexes', '_def_profile', '_active_profile',
+        '_prev_active_profile', '_switcher',
+    )
+
     def __init__(
             self,
             state_configs: StateConfigDict,
             profile_configs: ProfileConfigTuple,
             switcher_strategy: ProfileSwitcherStrategies,
             def_profile: str,
-            profile_ids_map
+            profile_ids_map,
+            counters_mode: CountersModes = CountersModes.DENSE,
+            state_interner: Optional[StateInterner] = None
     ) -> None:
-        self._profiles: ProfileDict = self._build_profiles(state_configs, profile_configs)
+        # Общие State/таблицы: между профилями и (если интернер передан снаружи) между FSM одного менеджера
+        self._state_interner: StateInterner = state_interner if state_interner is not None else StateInterner()
+        sparse_counters = (counters_mode is CountersModes.SPARSE or (
+            counters_mode is CountersModes.AUTO and len(state_configs) >= self.SPARSE_COUNTERS_MIN_STATES
+        ))
+        self._profiles: ProfileDict = self._build_profiles(
+            state_configs, profile_configs, self._state_interner, sparse_counters
+        )
         if not self._profiles:
             raise ValueError("No profiles initialized in StateProfilesManager")
+        # Порядковые номера профилей для компактных (колоночных) результатов
+        self._profile_names: tuple[str, ...] = tuple(self._profiles)
+        self._profile_indexes: dict[str, int] = {name: idx for idx, name in enumerate(self._profile_names)}
         self._def_profile: str = def_profile
         self._active_profile: Profile = self._profiles[def_profile]
         self._prev_active_profile: Profile = self._profiles[def_profile]
@@ -40,6 +60,11 @@ class ProfileManager:
     def profiles(self) -> ProfileDict:
         return self._profiles
 
+    @property
+    def state_interner(self) -> StateInterner:
+        """ Таблица интернированных State, на которых построены профили. """
+        return self._state_interner
+
     @property
     def active_profile(self) -> Profile:
         return self._active_profile
@@ -48,16 +73,43 @@ class ProfileManager:
     def prev_active_profile(self) -> Profile:
         return self._prev_active_profile
 
+    @property
+    def profile_names(self) -> tuple[str, ...]:
+        """ Имена профилей в порядке их индексов. """
+        return self._profile_names
+
+    @property
+    def active_profile_index(self) -> int:
+        """ Индекс активного профиля в profile_names. """
+        return self._profile_indexes[self._active_profile.name]
+
     def register_state(self, cls_id: int):
         for profile in self._profiles.values():
-            profile.set_cur_state_by_id(cls_id)
-            profile.increment_counter()
+            profile.register_state(cls_id)
 
-    def commit_stable_states(self, writer: "StableHistoryWriter") -> None:
-        """ Проверяет на стабильность текущее состояние во всех профилях """
+    def advance_state(self, count: int) -> None:
+        """ Продвигает счётчик текущего (уже зарегистрированного) состояния во всех профилях на count кадров. """
+        for profile in self._profiles.values():
+            profile.increment_counter(count)
+
+    def quiet_frames(self, limit: int) -> int:
+        """
+            Сколько следующих повторов текущего состояния (не больше limit) заведомо ничего не меняют,
+            кроме счётчиков: ни в одном профиле состояние не становится стабильным впервые.
+            Имеет смысл сразу после такта с тем же состоянием, не давшего stage_done и смены профиля.
+        """
+        quiet = limit
+        for profile in self._profiles.values():
+            frames = profile.frames_until_stable()
+            if frames is not None and frames - 1 < quiet:
+                quiet = frames - 1
+        return quiet
+
+    def commit_stable_states(self, writer: Optional["StableHistoryWriter"] = None) -> None:
+        """ Проверяет на стабильность текущее состояние во всех профилях (writer=None — без записи событий) """
         for profile in self._profiles.values():
             if profile.is_state_stable():
-                if profile.add_cur_state_to_history():
+                if profile.add_cur_state_to_history() and writer is not None:
                     writer.write_action(
                         cur_state=profile.cur_state,
                         count=profile.get_counter_by_cls_id(profile.cur_state.cls_id),
@@ -73,16 +125,24 @@ class ProfileManager:
 
     def switch_profile_by_pid(self, pid: Optional[int]) -> None:
         """ Сменить активный профиль по указанному pid """
-        profile = self._switcher.choose_by_mapped_id(pid)
+        profile = self.choose_profile_by_pid(pid)
         if profile and profile != self._active_profile:
             self._active_profile = profile
 
     def switch_profile_by_name(self, profile_name: ProfileNames | str) -> None:
         """ Сменить активный профиль по названию профиля. """
-        profile = self._switcher.choose_by_profile_name(profile_name)
+        profile = self.choose_profile_by_name(profile_name)
         if profile and profile != self._active_profile:
             self._active_profile = profile
 
+    def choose_profile_by_pid(self, pid: Optional[int]) -> Profile:
+        """ Возвращает профиль, соответствующий pid, не меняя активный. """
+        return self._switcher.choose_by_mapped_id(pid)
+
+    def choose_profile_by_name(self, profile_name: ProfileNames | str) -> Profile:
+        """ Возвращает профиль по названию, не меняя активный. """
+        return self._switcher.choose_by_profile_name(profile_name)
+
     def update_active_profile(self) -> bool:
         """ Определяет надо ли переключать профиль и если надо, то выставляет выбранный профиль активным """
         valid_profile = self._switcher.choose_valid_profile(self._active_profile)
@@ -92,26 +152,43 @@ class ProfileManager:
             return True
         return False
 
+    def reset(self) -> None:
+        """ Возвращает все профили к начальным снимкам и делает активным профиль по умолчанию. """
+        for profile in self._profiles.values():
+            profile.reset()
+        self._active_profile = self._profiles[self._def_profile]
+        self._prev_active_profile = self._profiles[self._def_profile]
+
     @staticmethod
-    def _build_profiles(config_states: StateConfigDict, profile_configs: ProfileConfigTuple) -> ProfileDict:
-        """ Создаёт все профили с собственными State-объектами."""
+    def _build_profiles(
+            config_states: StateConfigDict,
+            profile_configs: ProfileConfigTuple,
+            interner: StateInterner,
+            sparse_counters: bool = False
+    ) -> ProfileDict:
+        """ Создаёт все профили на интернированных State-объектах."""
         return {
-            profile_config.name: ProfileManager._build_profile(config_states, profile_config)
+            profile_config.name: ProfileManager._build_profile(config_states, profile_config, interner, sparse_counters)
             for profile_config in profile_configs
         }
 
     @staticmethod
-    def _build_profile(config_states: StateConfigDict, profile_config: ProfileConfig) -> Profile:
-        """ Для одного профиля создаёт структуру со ссылками на State """
-        state_dict = StateFactory.build(config_states, profile_config)
+    def _build_profile(
+            config_states: StateConfigDict,
+            profile_config: ProfileConfig,
+            interner: StateInterner,
+            sparse_counters: bool = False
+    ) -> Profile:
+        """ Для одного профиля создаёт структуру со ссылками на общие State и берёт общую таблицу состояний """
+        state_dict = StateFactory.build(config_states, profile_config, interner)
 
         # Преобразуем init_states, default_states, expected_sequences к ссылкам на State
-        init_states = tuple(state_dict[s.cls_id] for s in profile_config.init_states)
-        default_states = tuple(state_dict[s.cls_id] for s in profile_config.default_states)
-        expected_sequences = tuple(
-            tuple(state_dict[s.cls_id] for s in seq)
+        init_states = interner.intern_tuple(tuple(state_dict[s.cls_id] for s in profile_config.init_states))
+        default_states = interner.intern_tuple(tuple(state_dict[s.cls_id] for s in profile_config.default_states))
+        expected_sequences = interner.intern_tuple(tuple(
+            interner.intern_tuple(tuple(state_dict[s.cls_id] for s in seq))
             for seq in profile_config.expected_sequences
-        )
+        ))
 
         return Profile(
             name=profile_config.name,
@@ -119,6 +196,8 @@ class ProfileManager:
             init_states=init_states,
             default_states=default_states,
             expected_sequences=expected_sequences,
+            table=interner.intern_table(state_dict),
+            sparse_counters=sparse_counters,
         )
 
     def __getitem__(self, key: str | ProfileNames) -> Profile:
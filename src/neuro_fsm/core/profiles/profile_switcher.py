@@ -16,6 +16,8 @@ class ProfileSwitcher:
         - MIXED: сначала match, потом — исключение
     """
 
+    __slots__ = ('_strategy', '_profiles', '_id2profile', '_unmapped_ids_profile')
+
     def __init__(self, strategy: ProfileSwitcherStrategies, profiles: ProfileDict, profile_ids_map=None) -> None:
         self._strategy: ProfileSwitcherStrategies = strategy
         self._profiles: ProfileDict = profiles
@@ -1,3 +1,5 @@
 from .state_factory import StateFactory
 from .state import State
+from .state_table import StateTable
+from .state_interner import StateInterner
 from .types import StateId, StateDict, StateTuple, StateTupleTuple
@@ -6,14 +6,22 @@ from dataclasses import dataclass
 from typing import Optional
 
 
+class _HashCache:
+    """ Слот кэша хэша вне полей dataclass: не попадает в fields()/asdict() и не переносится при pickle/copy. """
+
+    __slots__ = ('_hash', )
+
+
 @dataclass(frozen=True, slots=True)
-class State:
+class State(_HashCache):
     """
         Класс объединяет описание состояния (StateMeta) и поведенческие параметры (StateParams).
         Используется в профилях машины состояний и хранит:
         — идентификатор состояния,
         — имя и отображаемое описание,
         — логику обработки (сбросы, прерывания и т.д.).
+        Хэш по (cls_id, name) — согласованно с __eq__ — считается при первом вызове и кэшируется в слоте,
+        поэтому State дёшево использовать ключом словарей и хранить в интернированных наборах.
     """
 
     cls_id: int
@@ -71,6 +79,15 @@ class State:
             return False
         return self.name == other.name and self.cls_id == other.cls_id
 
+    def __hash__(self) -> int:
+        """ Хэш по (cls_id, name); после pickle/copy пересчитывается в текущем процессе. """
+        try:
+            return self._hash
+        except AttributeError:
+            value = hash((self.cls_id, self.name))
+            object.__setattr__(self, '_hash', value)
+            return value
+
     def __str__(self) -> str:
         """ Краткое строковое представление состояния. """
         return f"<State {self.name} (id={self.cls_id})>"
@@ -1,33 +1,45 @@
 __all__ = ['StateFactory']
 
+from typing import Optional, TYPE_CHECKING
+
 from ...configs.state_config import StateConfigDict, StateConfig
 from ...configs.profile_config import ProfileConfig
 from .state import State
 from .types import StateDict
 
+if TYPE_CHECKING:
+    from .state_interner import StateInterner
+
 
 class StateFactory:
     """Создаёт словарь состояний из глобальной и профильной конфигурации."""
 
     @staticmethod
-    def build(global_config: StateConfigDict, profile_config: ProfileConfig) -> StateDict:
+    def build(
+            global_config: StateConfigDict,
+            profile_config: ProfileConfig,
+            interner: Optional["StateInterner"] = None
+    ) -> StateDict:
         """
             Создаёт словарь состояний для профиля с учётом перегрузки параметров.
             Args:
                 global_config (StateConfigDict): Глобальные настройки всех состояний.
                 profile_config (StateConfigDict): Частичные переопределения.
+                interner (Optional[StateInterner]): Таблица интернирования: одинаковые итоговые конфигурации
+                                                    получают общий State, одинаковые наборы — общий словарь.
             Returns:
                 StateDict: Словарь cls_id → State
         """
         states: StateDict = {}
+        create = interner.intern_state if interner is not None else StateFactory.create_state
 
         for cls_id in global_config:
             merged_config = StateFactory._merge_configs(global_config[cls_id], profile_config.states.get(cls_id))
-            states[cls_id] = StateFactory._create_state(merged_config)
+            states[cls_id] = create(merged_config)
 
         StateFactory._validate_aliases(states)
 
-        return states
+        return interner.intern_states(states) if interner is not None else states
 
     @staticmethod
     def _merge_configs(base: StateConfig, override: StateConfig) -> StateConfig:
@@ -46,7 +58,7 @@ class StateFactory:
         )
 
     @staticmethod
-    def _create_state(cfg: StateConfig) -> State:
+    def create_state(cfg: StateConfig) -> State:
         """ Создаёт объект State из StateConfig. """
         return State(
             cls_id=cfg.cls_id,
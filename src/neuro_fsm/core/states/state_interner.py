@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+__all__ = ['StateInterner']
+
+from ...configs.state_config import StateConfig
+from .state import State
+from .state_factory import StateFactory
+from .state_table import StateTable
+from .types import StateDict
+
+
+class StateInterner:
+    """
+        Таблица интернирования состояний.
+        Одинаковые итоговые (смерженные) конфигурации состояний отображаются в один общий неизменяемый State,
+        одинаковые наборы State — в один общий словарь StateDict и одну скомпилированную StateTable,
+        одинаковые кортежи State (init/default состояния, ожидаемые последовательности) — в один кортеж.
+        Один экземпляр разделяется всеми профилями одной FSM и всеми FSM одного FsmManager,
+        поэтому память и стоимость хэширования не растут с числом профилей без переопределений и числом FSM.
+        Интернированные объекты неизменяемы и не должны модифицироваться профилями.
+    """
+
+    __slots__ = ('_states', '_state_dicts', '_tables', '_tuples')
+
+    def __init__(self) -> None:
+        self._states: dict[StateConfig, State] = {}
+        # Ключ наборов — кортеж id() интернированных State: сами State удерживаются таблицей _states
+        self._state_dicts: dict[tuple[int, ...], StateDict] = {}
+        self._tables: dict[tuple[int, ...], StateTable] = {}
+        self._tuples: dict[tuple[int, ...], tuple] = {}
+
+    def intern_state(self, config: StateConfig) -> State:
+        """ Возвращает общий State для итоговой конфигурации состояния, создавая его при первом обращении. """
+        state = self._states.get(config)
+        if state is None:
+            state = self._states[config] = StateFactory.create_state(config)
+        return state
+
+    def intern_states(self, states: StateDict) -> StateDict:
+        """ Возвращает общий словарь cls_id → State с тем же набором объектов State. """
+        return self._state_dicts.setdefault(self._key(states), states)
+
+    def intern_table(self, states: StateDict) -> StateTable:
+        """ Возвращает общую скомпилированную StateTable для набора State. """
+        key = self._key(states)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = StateTable(states)
+        return table
+
+    def intern_tuple(self, items: tuple) -> tuple:
+        """ Возвращает общий кортеж с теми же (интернированными) элементами: State или кортежами State. """
+        return self._tuples.setdefault(tuple(map(id, items)), items)
+
+    def clear(self) -> None:
+        """ Очищает таблицы (уже созданные профили продолжают ссылаться на свои объекты). """
+        self._states.clear()
+        self._state_dicts.clear()
+        self._tables.clear()
+        self._tuples.clear()
+
+    @staticmethod
+    def _key(states: StateDict) -> tuple[int, ...]:
+        return tuple(map(id, states.values()))
+
+    def __len__(self) -> int:
+        """ Количество уникальных State. """
+        return len(self._states)
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} states={len(self._states)} "
+                f"state_sets={len(self._state_dicts)} tables={len(self._tables)}>")
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+__all__ = ['StateTable']
+
+from typing import Any, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .state import State
+from .types import StateDict
+
+
+class StateTable:
+    """
+        Скомпилированное представление состояний профиля для горячего пути.
+        Все атрибуты состояний разложены в плоские массивы, индексируемые по cls_id
+        (со смещением на минимальный cls_id, т.к. cls_id может быть отрицательным):
+            - states: State по индексу (None — «дыра» в нумерации cls_id);
+            - stable_lims: порог стабильности (0 — состояние не может быть стабильным);
+            - flags: битовая маска RESETTABLE | RESETTER | BREAKER;
+            - base_ids: базовый cls_id (для алиасов — cls_id оригинала);
+            - thresholds: порог уверенности (threshold) для входа по вероятностям (Fsm.process_scores).
+        Плюс заранее посчитанные списки cls_id для сбросов счётчиков.
+        Таблица неизменяема и строится один раз при создании профиля.
+    """
+
+    RESETTABLE = 1
+    RESETTER = 2
+    BREAKER = 4
+
+    __slots__ = (
+        '_offset', '_states', '_stable_lims', '_flags', '_base_ids', '_thresholds', '_all_ids', '_resettable_ids',
+        '_score_thresholds',
+    )
+
+    def __init__(self, states: StateDict) -> None:
+        if not states:
+            raise ValueError(f"[{self.__class__.__name__}] states must not be empty")
+        self._offset: int = min(states)
+        size = max(states) - self._offset + 1
+
+        table: list[Optional[State]] = [None] * size
+        stable_lims: list[int] = [0] * size
+        flags = bytearray(size)
+        base_ids: list[Optional[int]] = [None] * size
+        thresholds: list[float] = [0.0] * size
+        for cls_id, state in states.items():
+            idx = cls_id - self._offset
+            table[idx] = state
+            stable_lims[idx] = state.stable_min_lim if state.stable_min_lim and state.stable_min_lim > 0 else 0
+            flags[idx] = ((self.RESETTABLE if state.is_resettable else 0)
+                          | (self.RESETTER if state.is_resetter else 0)
+                          | (self.BREAKER if state.is_breaker else 0))
+            base_ids[idx] = state.get_base_cls_id()
+            thresholds[idx] = state.threshold or 0.0
+
+        self._states: tuple[Optional[State], ...] = tuple(table)
+        self._stable_lims: tuple[int, ...] = tuple(stable_lims)
+        self._flags: bytes = bytes(flags)
+        self._base_ids: tuple[Optional[int], ...] = tuple(base_ids)
+        self._thresholds: tuple[float, ...] = tuple(thresholds)
+        self._all_ids: tuple[int, ...] = tuple(states)
+        self._resettable_ids: tuple[int, ...] = tuple(cls_id for cls_id, s in states.items() if s.is_resettable)
+        # Векторы порогов по столбцам матрицы вероятностей, строятся лениво под число классов
+        self._score_thresholds: dict[int, Any] = {}
+
+    @property
+    def offset(self) -> int:
+        """ Минимальный cls_id — смещение индексов таблицы. """
+        return self._offset
+
+    @property
+    def states(self) -> tuple[Optional[State], ...]:
+        """ State по индексу таблицы (cls_id - offset). """
+        return self._states
+
+    @property
+    def stable_lims(self) -> tuple[int, ...]:
+        """ Пороги стабильности по индексу таблицы. """
+        return self._stable_lims
+
+    @property
+    def flags(self) -> bytes:
+        """ Битовые маски RESETTABLE | RESETTER | BREAKER по индексу таблицы. """
+        return self._flags
+
+    @property
+    def thresholds(self) -> tuple[float, ...]:
+        """ Пороги уверенности по индексу таблицы. """
+        return self._thresholds
+
+    @property
+    def all_ids(self) -> tuple[int, ...]:
+        """ cls_id всех состояний профиля в порядке конфигурации. """
+        return self._all_ids
+
+    @property
+    def resettable_ids(self) -> tuple[int, ...]:
+        """ cls_id состояний с флагом is_resettable. """
+        return self._resettable_ids
+
+    def index(self, cls_id: int) -> int:
+        """
+            Возвращает индекс состояния в таблице.
+            Raises:
+                KeyError: если состояние с таким cls_id не сконфигурировано.
+        """
+        idx = cls_id - self._offset
+        if idx < 0 or idx >= len(self._states) or self._states[idx] is None:
+            raise KeyError(cls_id)
+        return idx
+
+    def state(self, cls_id: int) -> State:
+        """ Возвращает State по cls_id. """
+        return self._states[self.index(cls_id)]
+
+    def stable_lim(self, cls_id: int) -> int:
+        """ Порог стабильности состояния; 0 — состояние не может быть стабильным. """
+        return self._stable_lims[self.index(cls_id)]
+
+    def base_id(self, cls_id: int) -> int:
+        """ Базовый cls_id состояния (для алиасов — cls_id оригинала). """
+        return self._base_ids[self.index(cls_id)]
+
+    def threshold(self, cls_id: int) -> float:
+        """ Порог уверенности состояния. """
+        return self._thresholds[self.index(cls_id)]
+
+    def score_thresholds(self, n_classes: int) -> Any:
+        """
+            Вектор порогов для матрицы вероятностей из n_classes столбцов (столбец j — cls_id j).
+            Для столбцов без сконфигурированного состояния порог +inf: такой класс никогда не проходит.
+            Вектор строится один раз на число столбцов; numpy — опциональная зависимость.
+        """
+        vector = self._score_thresholds.get(n_classes)
+        if vector is None:
+            if np is None:  # pragma: no cover
+                raise RuntimeError("StateTable.score_thresholds requires 'numpy' to be installed.")
+            vector = np.full(n_classes, np.inf)
+            for cls_id in self._all_ids:
+                if 0 <= cls_id < n_classes:
+                    vector[cls_id] = self._thresholds[cls_id - self._offset]
+            vector.flags.writeable = False
+            self._score_thresholds[n_classes] = vector
+        return vector
+
+    def is_resettable(self, cls_id: int) -> bool:
+        return bool(self._flags[self.index(cls_id)] & self.RESETTABLE)
+
+    def is_resetter(self, cls_id: int) -> bool:
+        return bool(self._flags[self.index(cls_id)] & self.RESETTER)
+
+    def is_breaker(self, cls_id: int) -> bool:
+        return bool(self._flags[self.index(cls_id)] & self.BREAKER)
+
+    def __len__(self) -> int:
+        return len(self._all_ids)
+
+    def __contains__(self, cls_id: int) -> bool:
+        idx = cls_id - self._offset
+        return 0 <= idx < len(self._states) and self._states[idx] is not None
+
+    def __repr__(self) -> str:
+        return f"<StateTable offset={self._offset} size={len(self._states)} states={len(self._all_ids)}>"
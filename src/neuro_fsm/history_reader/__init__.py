@@ -0,0 +1,5 @@
+from .binary_raw_history_reader import BinaryRawHistoryReader
+from .jsonl_event_reader import JsonlEventReader
+from .stable_runtime_reader import StableRuntimeReader
+from .sqlite_event_reader import SqliteEventReader
+from ..history_writer.history_compression import open_history_log
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+__all__ = ['BinaryRawHistoryReader']
+
+import os
+from typing import Any
+
+from ..history_writer.binary_raw_format import decode_binary_raw_header
+
+
+class BinaryRawHistoryReader:
+    """
+        Читатель двоичной сырой истории (BinaryRawHistoryWriter).
+        Файл отображается в память (np.memmap) и отдаётся как структурированный массив NumPy без копирования
+        и без разбора: открытие лога любого размера — O(1), страницы подгружаются ОС по мере обращения.
+        Колонки: step, cls_id и необязательные run_length, confidence, timestamp (см. fields).
+        Неполная последняя запись (файл дописывается или запись оборвалась) не отображается.
+        Зависимость numpy опциональна, проверяется лениво.
+    """
+
+    __slots__ = ('_path', '_columns', '_offset', '_records')
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """
+            Args:
+                path: Путь к файлу .bin.
+            Raises:
+                ValueError: Файл не является двоичной сырой историей.
+        """
+        self._path: str = os.fspath(path)
+        with open(self._path, 'rb') as file:
+            self._columns, self._offset = decode_binary_raw_header(file.read(64 * 1024))
+        self._records: Any = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """ Имена колонок в порядке хранения. """
+        return tuple(name for name, _ in self._columns)
+
+    @property
+    def dtype(self) -> Any:
+        """ np.dtype записи. """
+        return self._np().dtype(list(self._columns))
+
+    @property
+    def has_runs(self) -> bool:
+        """ Хранит ли файл серии (колонка run_length). """
+        return "run_length" in self.fields
+
+    @property
+    def records(self) -> Any:
+        """ Все записи как read-only структурированный массив поверх np.memmap (без копирования). """
+        if self._records is None:
+            self._records = self.reload()
+        return self._records
+
+    def reload(self) -> Any:
+        """ Заново отображает файл (чтобы увидеть записи, дописанные после открытия). """
+        np = self._np()
+        dtype = self.dtype
+        count = max(os.path.getsize(self._path) - self._offset, 0) // dtype.itemsize
+        if count == 0:
+            self._records = np.empty(0, dtype=dtype)
+        else:
+            self._records = np.memmap(self._path, dtype=dtype, mode='r', offset=self._offset, shape=(count, ))
+        return self._records
+
+    def column(self, name: str) -> Any:
+        """ Колонка записей (представление без копирования). """
+        return self.records[name]
+
+    def frames(self) -> Any:
+        """
+            Возвращает cls_id по кадрам. Для файла с сериями серии разворачиваются (np.repeat — это копия),
+            иначе — представление колонки cls_id без копирования.
+        """
+        records = self.records
+        if self.has_runs:
+            return self._np().repeat(records["cls_id"], records["run_length"])
+        return records["cls_id"]
+
+    @staticmethod
+    def _np() -> Any:
+        try:
+            import numpy as np  # noqa: WPS433
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError("BinaryRawHistoryReader requires 'numpy' to be installed.") from exc
+        return np
+
+    def __len__(self) -> int:
+        """ Количество записей. """
+        return len(self.records)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={self._path!r} fields={self.fields}>"
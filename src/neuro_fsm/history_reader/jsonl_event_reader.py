@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+__all__ = ['JsonlEventReader']
+
+import json
+import os
+from typing import Any, Iterable, Iterator, Optional
+
+from ..history_writer.history_compression import open_history_log
+from ..history_writer.runtime_delta import apply_runtime_delta
+
+
+class JsonlEventReader:
+    """
+        Потоковый читатель стабильной истории в формате JSON Lines (JsonlStableHistoryWriter).
+        Файлы читаются построчно, целиком в память не загружаются. Фильтры по типу события, действию,
+        профилю и интервалу времени сначала проверяются по байтам строки (поиск закодированного фрагмента,
+        разбор только поля ts), и json.loads вызывается лишь для прошедших строк.
+        Повреждённые строки (например, оборванная последняя строка дописываемого файла) пропускаются.
+        Сжатые файлы (.gz / .xz) распаковываются потоково; оборванный последний блок сжатого файла
+        (авария писателя) завершает чтение этого файла без ошибки.
+    """
+
+    __slots__ = ('_paths', )
+
+    def __init__(self, paths: str | os.PathLike | Iterable[str | os.PathLike]) -> None:
+        """
+            Args:
+                paths: Путь к файлу .jsonl или несколько путей (читаются по порядку).
+        """
+        if isinstance(paths, (str, os.PathLike)):
+            paths = (paths, )
+        self._paths: tuple[str, ...] = tuple(os.fspath(path) for path in paths)
+
+    @property
+    def paths(self) -> tuple[str, ...]:
+        return self._paths
+
+    def events(
+            self,
+            event: Optional[str] = None,
+            action: Optional[str] = None,
+            profile: Optional[str] = None,
+            since: Optional[float] = None,
+            until: Optional[float] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+            Итерирует по событиям, удовлетворяющим всем заданным фильтрам.
+            Args:
+                event: Тип события (state, action, runtime, config, profiles).
+                action: Действие (для событий action).
+                profile: Имя профиля (для событий action; для runtime — активный профиль).
+                since: Нижняя граница времени ts (включительно, unix time).
+                until: Верхняя граница времени ts (не включительно, unix time).
+            Yields:
+                dict: Событие.
+        """
+        needles = []
+        if event is not None:
+            needles.append(b'"event":' + self._encode(event))
+        if action is not None:
+            needles.append(b'"action":' + self._encode(action))
+        profile_needles = None
+        if profile is not None:
+            encoded = self._encode(str(profile))
+            profile_needles = (b'"profile":' + encoded, b'"active_profile":' + encoded)
+        check_time = since is not None or until is not None
+
+        for path in self._paths:
+            for line in self._lines(path):
+                if any(needle not in line for needle in needles):
+                    continue
+                if profile_needles is not None and not any(needle in line for needle in profile_needles):
+                    continue
+                if check_time:
+                    ts = self._line_ts(line)
+                    if ts is None or (since is not None and ts < since) or (until is not None and ts >= until):
+                        continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                # Побайтовый поиск мог совпасть внутри другого поля: проверяем по разобранному событию
+                if self._matches(record, event, action, profile):
+                    yield record
+
+    def runtime_snapshots(self) -> Iterator[dict[str, Any]]:
+        """
+            Итерирует по полным снимкам runtime, восстанавливая разностные снимки от ближайшего ключевого.
+            Каждый файл восстанавливается отдельно; разностные снимки до первого ключевого в файле пропускаются.
+            Yields:
+                dict: {"ts", "step", "active_profile", "profiles": {имя: {"counters", "history"}}}.
+        """
+        for path in self._paths:
+            snapshot = None
+            for record in JsonlEventReader(path).events(event="runtime"):
+                # Снимки без поля keyframe (старый формат) всегда полные
+                keyframe = record.get("keyframe", True)
+                if not keyframe and snapshot is None:
+                    continue
+                snapshot = apply_runtime_delta(snapshot, record["active_profile"], record["profiles"], keyframe)
+                yield {"ts": record.get("ts"), "step": record.get("step"), **snapshot}
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.events()
+
+    @staticmethod
+    def _lines(path: str) -> Iterator[bytes]:
+        """ Строки файла; у сжатого файла чтение останавливается на оборванном блоке. """
+        with open_history_log(path, 'rb') as file:
+            try:
+                yield from file
+            except EOFError:
+                return
+
+    @staticmethod
+    def _matches(record: dict[str, Any], event: Optional[str], action: Optional[str], profile: Optional[str]) -> bool:
+        if event is not None and record.get("event") != event:
+            return False
+        if action is not None and record.get("action") != action:
+            return False
+        if profile is not None and str(profile) not in (record.get("profile"), record.get("active_profile")):
+            return False
+        return True
+
+    @staticmethod
+    def _line_ts(line: bytes) -> Optional[float]:
+        """ Разбирает ts из начала строки ({"ts":<число>,...}) без разбора всего JSON. """
+        if not line.startswith(b'{"ts":'):
+            return None
+        end = line.find(b',', 6)
+        try:
+            return float(line[6:end])
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _encode(value: str) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} paths={self._paths}>"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+__all__ = ['SqliteEventReader']
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from ..history_writer.sqlite_event_store import SQLITE_EVENT_COLUMNS
+
+
+class SqliteEventReader:
+    """
+        Читатель событий стабильной истории из базы SQLite (приёмник HistorySinks.SQLITE).
+        База открывается только на чтение; в режиме WAL чтение не мешает писателям процесса.
+        Фильтры по потоку, действию и времени выполняются запросом по индексам (stream, ts, action) и (action, ts);
+        строки отдаются потоково, в порядке времени.
+    """
+
+    __slots__ = ('_path', )
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """
+            Args:
+                path: Путь к файлу базы.
+        """
+        self._path: str = os.fspath(path)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def events(
+            self,
+            stream: Optional[str] = None,
+            event: Optional[str] = None,
+            action: Optional[str] = None,
+            profile: Optional[str] = None,
+            since: Optional[float] = None,
+            until: Optional[float] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+            Итерирует по событиям, удовлетворяющим всем заданным фильтрам.
+            Args:
+                stream: Id потока (FSM).
+                event: Тип события (state, action).
+                action: Действие (для событий action).
+                profile: Имя профиля (для событий action).
+                since: Нижняя граница времени ts (включительно, unix time).
+                until: Верхняя граница времени ts (не включительно, unix time).
+            Yields:
+                dict: Событие — {колонка: значение} по SQLITE_EVENT_COLUMNS.
+        """
+        conditions, params = [], []
+        for column, operator, value in (
+                ("stream", "=", stream), ("event", "=", event), ("action", "=", action),
+                ("profile", "=", None if profile is None else str(profile)), ("ts", ">=", since), ("ts", "<", until),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {', '.join(SQLITE_EVENT_COLUMNS)} FROM events{where} ORDER BY ts, id"
+        connection = sqlite3.connect(Path(self._path).absolute().as_uri() + "?mode=ro", uri=True)
+        try:
+            for row in connection.execute(query, params):
+                yield dict(zip(SQLITE_EVENT_COLUMNS, row))
+        finally:
+            connection.close()
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.events()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={self._path!r}>"
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+__all__ = ['StableRuntimeReader']
+
+import ast
+import os
+from typing import Any, Iterator, Optional
+
+from ..history_writer.history_compression import open_history_log
+from ..history_writer.runtime_delta import apply_runtime_delta
+
+
+class StableRuntimeReader:
+    """
+        Потоковый читатель снимков RUNTIME стабильной истории в YAML-подобном формате (StableHistoryWriter).
+        Разностные снимки (keyframe: false) восстанавливаются до полных от ближайшего ключевого;
+        разностные снимки до первого ключевого пропускаются. Снимки без поля keyframe (старый формат) — полные.
+        Сжатые файлы (.gz / .xz) распаковываются потоково; оборванный последний блок завершает чтение без ошибки.
+    """
+
+    __slots__ = ('_path', )
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """
+            Args:
+                path: Путь к файлу стабильной истории (.yaml, .yaml.gz, .yaml.xz).
+        """
+        self._path: str = os.fspath(path)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def snapshots(self) -> Iterator[dict[str, Any]]:
+        """
+            Итерирует по полным снимкам в порядке записи.
+            Yields:
+                dict: {"active_profile": str, "profiles": {имя: {"counters": dict, "history": list}}}.
+        """
+        snapshot = None
+        for keyframe, active_profile, profiles in self._blocks():
+            if not keyframe and snapshot is None:
+                continue
+            snapshot = apply_runtime_delta(snapshot, active_profile, profiles, keyframe)
+            yield snapshot
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.snapshots()
+
+    def _blocks(self) -> Iterator[tuple[bool, str, dict[str, dict[str, Any]]]]:
+        """ Блоки RUNTIME файла: (ключевой ли, активный профиль, {имя: {"counters", "history"}}). """
+        block: Optional[dict[str, Any]] = None
+        profile: Optional[dict[str, Any]] = None
+        for line in self._lines():
+            stripped = line.strip()
+            if block is None:
+                if stripped == "RUNTIME:":
+                    block = {"keyframe": True, "active_profile": None, "profiles": {}}
+                continue
+            if stripped.startswith("#---"):
+                if block["active_profile"] is not None:
+                    yield block["keyframe"], block["active_profile"], block["profiles"]
+                block = profile = None
+            elif stripped.startswith("keyframe:"):
+                block["keyframe"] = stripped.partition(":")[2].strip() == "true"
+            elif stripped.startswith("- profile_name:"):
+                name = stripped.partition(":")[2].strip()
+                profile = block["profiles"][name] = {"counters": {}, "history": None}
+                if block["active_profile"] is None:
+                    # Первый профиль блока — активный (секция active_profile идёт первой)
+                    block["active_profile"] = name
+            elif profile is not None and stripped.startswith(("counters:", "history:")):
+                key, _, value = stripped.partition(":")
+                profile[key] = ast.literal_eval(value.strip())
+
+    def _lines(self) -> Iterator[str]:
+        """ Строки файла; у сжатого файла чтение останавливается на оборванном блоке. """
+        with open_history_log(self._path, 'rt') as file:
+            try:
+                yield from file
+            except EOFError:
+                return
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={self._path!r}>"
@@ -1,2 +1,19 @@
+from .background_write_queue import BackgroundWriteQueue
+from .config_catalog import ConfigCatalog
+from .history_file_pool import HistoryFilePool
+from .log_retention_manager import LogRetentionManager
+from .runtime_delta import RuntimeDeltaTracker, apply_runtime_delta
+from .sqlite_event_store import SqliteEventStore
+from .sinks import BaseHistorySink, MemoryRingSink, SqliteEventSink
+from .file_sink import FileSink
+from .async_file_sink import AsyncFileSink
+from .flight_recorder import FlightRecorder
+from .null_history_writer import NullHistoryWriter
 from .raw_history_writer import RawHistoryWriter
+from .binary_raw_history_writer import BinaryRawHistoryWriter
 from .stable_history_writer import StableHistoryWriter
+from .jsonl_stable_history_writer import JsonlStableHistoryWriter
+from .async_raw_history_writer import AsyncRawHistoryWriter
+from .async_binary_raw_history_writer import AsyncBinaryRawHistoryWriter
+from .async_stable_history_writer import AsyncStableHistoryWriter
+from .async_jsonl_stable_history_writer import AsyncJsonlStableHistoryWriter
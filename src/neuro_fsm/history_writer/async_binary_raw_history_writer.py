@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+__all__ = ["AsyncBinaryRawHistoryWriter"]
+
+from typing import Optional
+
+from ..configs.history_writer_config import HistoryWriterConfig
+from .async_writer_mixin import AsyncWriterMixin
+from .binary_raw_history_writer import BinaryRawHistoryWriter
+
+
+class AsyncBinaryRawHistoryWriter(AsyncWriterMixin, BinaryRawHistoryWriter):
+    """
+        Асинхронный писатель сырой истории в двоичном формате для AsyncFsm.
+        Формат совпадает с BinaryRawHistoryWriter; записи копятся в памяти и переносятся на диск корутиной drain()
+        одной операцией (см. AsyncWriterMixin). Незаписанная серия (колонка run_length)
+        отдаётся при flush(), aclose() и close().
+    """
+
+    def __init__(self, config: HistoryWriterConfig, stream: Optional[str] = None) -> None:
+        super().__init__(config, stream=stream)
+
+    async def aclose(self) -> None:
+        self._emit_run()
+        await super().aclose()
+
+    def _close(self) -> None:
+        self._emit_run()
+        super()._close()
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+__all__ = ['AsyncFileSink']
+
+import asyncio
+import time
+from typing import Any, Optional
+
+from ..configs.history_writer_config import HistoryWriterConfig
+from .file_sink import FileSink
+
+
+class AsyncFileSink(FileSink):
+    """
+        Файловый приёмник асинхронных писателей истории (AsyncRawHistoryWriter, AsyncBinaryRawHistoryWriter,
+        AsyncStableHistoryWriter, AsyncJsonlStableHistoryWriter).
+        Синхронные write()/flush()/close(), которые вызываются на шаге FSM, только копят готовые строки в памяти;
+        на диск их переносит корутина drain() — одной операцией через постоянно открытый
+        дескриптор aiofiles (или через пул, см. ниже), когда срабатывает политика сброса из HistoryWriterConfig
+        (по объёму, числу записей, времени или flush() писателя). Цикл событий не блокируется.
+        close() дескриптор не закрывает — только требует сброса; закрывает его aclose().
+        Со сжатием перенос пишет сжатые байты текущего блока (см. FileSink); aclose() завершает блок.
+        Перед открытием дескриптора on_open (заголовок нового двоичного файла) вызывается в потоке исполнителя.
+        Приёмник потока (передан pool, так у всех FSM из FsmManager.create_async_fsm()) своего дескриптора не держит:
+        перенос отдаётся общему HistoryFilePool в потоке исполнителя, поэтому лимит открытых файлов процесса
+        действует и на асинхронные потоки. Фоновая очередь не используется.
+        Зависимость aiofiles опциональна, проверяется лениво.
+    """
+
+    __slots__ = ('_pending', '_flush_due', '_handle')
+
+    def __init__(self, config: HistoryWriterConfig, path: str, **kwargs: Any) -> None:
+        super().__init__(config, path, **{**kwargs, "queue": None})
+        self._pending: list[str | bytes] = []
+        self._flush_due: bool = False
+        self._handle: Optional[Any] = None
+
+    @property
+    def pending_records(self) -> int:
+        """ Число записей, ожидающих переноса на диск. """
+        return self._pending_records
+
+    def open(self) -> None:
+        """ Дескриптор открывается лениво в drain(). """
+
+    def write(self, data: str | bytes, records: int = 1) -> None:
+        """ Копит готовую запись в памяти до следующего drain(). """
+        self._write(data, records)
+
+    def _write(self, data: str | bytes, records: int) -> None:
+        """ Запись в обход writer() (например, при завершении интерпретатора) тоже только копится в памяти. """
+        if not self._pending:
+            # Несброшенные записи допишутся при завершении интерпретатора, даже если drain() больше не вызовут
+            self._keep_for_exit()
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        self._pending_records += records
+
+    def flush(self) -> None:
+        """ Требует перенести накопленные записи на диск при следующем drain(). """
+        if self._pending:
+            self._flush_due = True
+
+    def close(self) -> None:
+        """ Дескриптор остаётся открытым (см. aclose()); накопленные записи будут сброшены при следующем drain(). """
+        self.flush()
+
+    async def drain(self, force: bool = False) -> None:
+        """
+            Переносит накопленные записи на диск одной операцией, если сработала политика сброса.
+            Args:
+                force (bool): Сбросить независимо от политики.
+        """
+        if not self._pending or not (force or self._flush_due or self._policy_due()):
+            return
+        sync = force or self._flush_due or self._interval_due()
+        text = self._join_pending()
+        self._pending.clear()
+        self._flush_due = False
+        self._pending_bytes = 0
+        self._pending_records = 0
+        await self._write_out(self._encode_pending(text, finish=False, sync=sync))
+        self._last_flush = time.monotonic()
+
+    async def aclose(self) -> None:
+        """ Сбрасывает всё накопленное и закрывает дескриптор. """
+        await self.drain(force=True)
+        if self._compressor is not None:
+            await self._write_out(self._finish_block())
+        if self._pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._pool.release, self._path)
+        if self._handle is not None:
+            await self._handle.close()
+            self._handle = None
+        self._discard_for_exit()
+
+    def _close(self) -> None:
+        """
+            Синхронный аварийный сброс (завершение интерпретатора, AsyncFsm.close() вне цикла событий):
+            дописывает накопленное обычной записью в файл (приёмник потока — через пул).
+            Открытый дескриптор aiofiles при этом не используется.
+        """
+        if self._pending or self._compressor is not None:
+            data = self._encode_pending(self._join_pending(), finish=True, sync=True)
+            if self._pool is not None:
+                self._pool.write(self, data)
+            else:
+                with open(self._path, self._mode, encoding=self._encoding) as file:
+                    if self._on_open is not None:
+                        self._on_open(file)
+                    file.write(data)
+            self._pending.clear()
+        if self._pool is not None:
+            self._pool.release(self._path)
+        self._pending_bytes = 0
+        self._pending_records = 0
+        self._flush_due = False
+        self._discard_for_exit()
+
+    async def _write_out(self, data: str | bytes) -> None:
+        """ Дописывает перенос в файл: через пул в потоке исполнителя или через дескриптор aiofiles. """
+        if not data:
+            return
+        if self._pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._pool.write, self, data)
+            return
+        handle = await self._ensure_handle()
+        await handle.write(data)
+        await handle.flush()
+
+    async def _ensure_handle(self) -> Any:
+        if self._handle is None:
+            try:
+                import aiofiles  # noqa: WPS433
+            except Exception as exc:  # pragma: no cover
+                raise RuntimeError(f"{self.__class__.__name__} requires 'aiofiles' to be installed.") from exc
+            if self._on_open is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self._prepare_file)
+            self._handle = await aiofiles.open(self._path, self._mode, encoding=self._encoding)
+        return self._handle
+
+    def _prepare_file(self) -> None:
+        """ Вызывает on_open для файла, открытого обычной записью (заголовок нового файла, проверка старого). """
+        with open(self._path, self._mode, encoding=self._encoding) as file:
+            self._on_open(file)
+
+    @property
+    def _mode(self) -> str:
+        return 'ab' if self._binary or self._compressed else 'a'
+
+    @property
+    def _encoding(self) -> Optional[str]:
+        return None if self._binary or self._compressed else 'utf-8'
+
+    def _join_pending(self) -> str | bytes:
+        return b"".join(self._pending) if self._binary else "".join(self._pending)
+
+    def _encode_pending(self, text: str | bytes, finish: bool, sync: bool) -> str | bytes:
+        """
+            Готовит перенос к записи: со сжатием — сжатые байты, вытолкнутые как при сбросе FileSink
+            (sync — перенос по flush(), force или flush_interval), или завершённый блок при finish.
+        """
+        if not self._compressed:
+            return text
+        out = self._compress(text) if text else b''
+        if finish:
+            return out + self._finish_block()
+        return out + self._flush_compressed(sync)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+__all__ = ["AsyncJsonlStableHistoryWriter"]
+
+from typing import Optional
+
+from ..configs.history_writer_config import HistoryWriterConfig
+from .async_writer_mixin import AsyncWriterMixin
+from .jsonl_stable_history_writer import JsonlStableHistoryWriter
+
+
+class AsyncJsonlStableHistoryWriter(AsyncWriterMixin, JsonlStableHistoryWriter):
+    """
+        Асинхронный писатель стабильной истории в формате JSON Lines для AsyncFsm.
+        Формат совпадает с JsonlStableHistoryWriter; записи копятся в памяти и переносятся на диск корутиной drain()
+        одной операцией (см. AsyncWriterMixin).
+    """
+
+    def __init__(self, config: HistoryWriterConfig, stream: Optional[str] = None) -> None:
+        super().__init__(config, stream=stream)
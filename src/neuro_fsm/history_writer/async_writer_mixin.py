@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+__all__ = ['AsyncWriterMixin']
+
+from .async_file_sink import AsyncFileSink
+
+
+class AsyncWriterMixin:
+    """
+        Асинхронный режим для файловых писателей истории (подмешивается перед писателем сырой или стабильной истории).
+        Приёмник FILE писателя — AsyncFileSink: синхронные методы записи, которые вызывает FSM на шаге,
+        только копят готовые строки в памяти, а на диск их переносит корутина drain()
+        через постоянно открытый дескриптор aiofiles (у писателя потока — через общий HistoryFilePool).
+        close() дескриптор не закрывает — только требует сброса; закрывает его aclose().
+    """
+
+    FILE_SINK = AsyncFileSink
+
+    @property
+    def pending_records(self) -> int:
+        """ Число записей, ожидающих переноса на диск. """
+        return self._file_sink.pending_records if self._file_sink is not None else 0
+
+    async def drain(self, force: bool = False) -> None:
+        """
+            Переносит накопленные записи на диск одной операцией, если сработала политика сброса.
+            Args:
+                force (bool): Сбросить независимо от политики.
+        """
+        if self._file_sink is not None:
+            await self._file_sink.drain(force)
+
+    async def aclose(self) -> None:
+        """ Сбрасывает всё накопленное, закрывает приёмники и дескриптор файла. """
+        for sink in self._sinks:
+            if sink is not self._file_sink:
+                sink.close()
+        if self._file_sink is not None:
+            await self._file_sink.aclose()
+
+    def _close(self) -> None:
+        """
+            Синхронный аварийный сброс (AsyncFsm.close() вне цикла событий): приёмники закрываются,
+            накопленное файла дописывается обычной записью (см. AsyncFileSink._close()).
+        """
+        for sink in self._sinks:
+            if sink is not self._file_sink:
+                sink.close()
+        if self._file_sink is not None:
+            self._file_sink._close()
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+__all__ = ['BackgroundWriteQueue', 'stop_all_queues']
+
+import threading
+import warnings
+import weakref
+from collections import deque
+from typing import Optional, TYPE_CHECKING
+
+from ..configs.history_writer_config import HistoryWriterConfig
+from ..models.enums import WriterOverflowPolicies
+
+if TYPE_CHECKING:
+    from .file_sink import FileSink
+
+# Операции очереди: запись строки и управляющие операции над файлом писателя
+_WRITE, _FLUSH, _CLOSE = 0, 1, 2
+
+# Живые очереди: при завершении интерпретатора они дописываются до конца
+_QUEUES: 'weakref.WeakSet[BackgroundWriteQueue]' = weakref.WeakSet()
+
+
+class BackgroundWriteQueue:
+    """
+        Ограниченная очередь готовых строк истории, которую разбирает отдельный поток-демон.
+        Поток инференса только кладёт строку в очередь (O(1)), поэтому задержка шага не зависит от диска.
+        Очередь делят сырой и стабильный писатели одной FSM. Управляющие операции (flush/close)
+        не теряются и не занимают ёмкость. При переполнении записи обрабатываются по WriterOverflowPolicies;
+        потерянные записи учитываются в dropped (и в dropped писателя), о первой потере писателя выдаётся
+        RuntimeWarning. Запись, на которой поток получил ошибку ввода-вывода, тоже считается потерянной,
+        а первая такая ошибка пробрасывается из stop().
+        Поток запускается лениво при первой операции и заново — после stop().
+    """
+
+    __slots__ = ('_items', '_capacity', '_size', '_policy', '_sample_every', '_sample_pos', '_dropped',
+                 '_error', '_cond', '_thread', '_busy', '__weakref__')
+
+    def __init__(
+            self,
+            capacity: int = 10000,
+            policy: WriterOverflowPolicies = WriterOverflowPolicies.BLOCK,
+            sample_every: int = 10
+    ) -> None:
+        """
+            Args:
+                capacity (int): Ёмкость очереди (записей).
+                policy (WriterOverflowPolicies): Поведение при переполнении.
+                sample_every (int): Для SAMPLE — при переполнении сохраняется каждая sample_every-я запись.
+        """
+        self._items: deque = deque()
+        self._capacity: int = capacity
+        # Число записей (_WRITE) в очереди: управляющие операции ёмкость не занимают
+        self._size: int = 0
+        self._policy: WriterOverflowPolicies = policy
+        self._sample_every: int = sample_every
+        self._sample_pos: int = 0
+        self._dropped: int = 0
+        # Первая ошибка потока (пробрасывается из stop())
+        self._error: Optional[Exception] = None
+        self._cond: threading.Condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._busy: bool = False
+        _QUEUES.add(self)
+
+    @classmethod
+    def from_configs(cls, *configs: HistoryWriterConfig) -> Optional[BackgroundWriteQueue]:
+        """
+            Создаёт общую очередь для пишущих в файл конфигураций с background=True; None, если таких нет.
+            Raises:
+                ValueError: Фоновые конфигурации задают разные queue_size / overflow_policy / sample_every.
+        """
+        settings = {
+            (config.queue_size, config.overflow_policy, config.sample_every)
+            for config in configs if config.background and config.writes_file
+        }
+        if not settings:
+            return None
+        if len(settings) > 1:
+            raise ValueError(f"[{cls.__name__}] Background history writers of one FSM share a queue: "
+                             f"queue_size, overflow_policy and sample_every must match, got {sorted(settings, key=str)}")
+        return cls(*settings.pop())
+
+    @property
+    def dropped(self) -> int:
+        """ Число потерянных при переполнении записей. """
+        return self._dropped
+
+    @property
+    def policy(self) -> WriterOverflowPolicies:
+        return self._policy
+
+    def put(self, sink: FileSink, text: str, records: int = 1) -> None:
+        """ Ставит строку писателя в очередь с учётом политики переполнения. """
+        with self._cond:
+            if self._size >= self._capacity and not self._make_room(sink, records):
+                return
+            self._items.append((_WRITE, sink, text, records))
+            self._size += 1
+            self._wake()
+
+    def put_control(self, sink: FileSink, op: int) -> None:
+        """ Ставит в очередь управляющую операцию (сброс или закрытие файла писателя). """
+        with self._cond:
+            self._items.append((op, sink, None, 0))
+            self._wake()
+
+    def join(self) -> None:
+        """ Ждёт, пока поток обработает все поставленные операции. """
+        with self._cond:
+            while (self._items or self._busy) and self._thread is not None and self._thread.is_alive():
+                self._cond.wait()
+
+    def stop(self) -> None:
+        """
+            Дописывает очередь и останавливает поток (следующая операция запустит его снова).
+            Raises:
+                Exception: Первая ошибка, полученная потоком при записи с прошлого stop().
+        """
+        with self._cond:
+            thread = self._thread
+            self._thread = None
+            self._items.append(None)
+            self._cond.notify_all()
+        if thread is not None and thread.is_alive():
+            thread.join()
+        else:
+            with self._cond:
+                self._items.remove(None)
+        with self._cond:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _make_room(self, sink: FileSink, records: int) -> bool:
+        """ Освобождает место по политике переполнения (вызывается под блокировкой). False — запись теряется. """
+        policy = self._policy
+        if policy is WriterOverflowPolicies.DROP_RAW:
+            if sink.droppable:
+                return self._drop(sink, records)
+            # Событию стабильной истории место освобождает самая старая сырая запись, если она есть
+            if self._evict(raw_only=True):
+                return True
+        elif policy is WriterOverflowPolicies.DROP_OLDEST:
+            return self._evict(raw_only=False)
+        elif policy is WriterOverflowPolicies.SAMPLE:
+            self._sample_pos += 1
+            if self._sample_pos % self._sample_every:
+                return self._drop(sink, records)
+            return self._evict(raw_only=False)
+        # BLOCK (и DROP_RAW без сырых записей в очереди): ждём, пока поток освободит место
+        while self._size >= self._capacity:
+            self._ensure_thread()
+            self._cond.wait()
+        return True
+
+    def _evict(self, raw_only: bool) -> bool:
+        """ Удаляет самую старую запись (только сырую при raw_only). """
+        for i, item in enumerate(self._items):
+            if item is not None and item[0] == _WRITE and (not raw_only or item[1].droppable):
+                del self._items[i]
+                self._size -= 1
+                self._drop(item[1], item[3])
+                return True
+        return False
+
+    def _drop(self, sink: FileSink, records: int) -> bool:
+        """ Учитывает потерянные записи писателя (вызывается под блокировкой). """
+        if not sink._dropped:
+            warnings.warn(f"[{self.__class__.__name__}] History writer {sink.path!r} started losing records "
+                          f"(policy {self._policy.name}); see Fsm.dropped_records", RuntimeWarning, stacklevel=2)
+        self._dropped += records
+        sink._dropped += records
+        return False
+
+    def _wake(self) -> None:
+        self._ensure_thread()
+        self._cond.notify_all()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='neuro_fsm-history-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """ Цикл потока: забирает все накопленные операции одной пачкой и выполняет их вне блокировки. """
+        while True:
+            with self._cond:
+                while not self._items:
+                    self._cond.wait()
+                batch = list(self._items)
+                self._items.clear()
+                self._size = 0
+                self._busy = True
+                self._cond.notify_all()
+            stop = False
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                op, sink, text, records = item
+                try:
+                    if op == _WRITE:
+                        sink._write(text, records)
+                    elif op == _FLUSH:
+                        sink._flush()
+                    else:
+                        sink._close()
+                except Exception as exc:
+                    # Ошибка диска не останавливает разбор очереди остальных писателей: запись считается потерянной
+                    with self._cond:
+                        if op == _WRITE:
+                            self._drop(sink, records)
+                        if self._error is None:
+                            self._error = exc
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+            if stop:
+                return
+
+    def __len__(self) -> int:
+        """ Число записей в очереди. """
+        return self._size
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} size={self._size}/{self._capacity} "
+                f"policy={self._policy.name} dropped={self._dropped}>")
+
+
+def stop_all_queues() -> None:
+    """
+        Дописывает и останавливает все живые очереди (используется при завершении интерпретатора).
+        Останавливаются все очереди; затем пробрасывается первая из их ошибок.
+    """
+    errors = []
+    for queue in list(_QUEUES):
+        try:
+            queue.stop()
+        except Exception as exc:
+            errors.append(exc)
+    if errors:
+        raise errors[0]
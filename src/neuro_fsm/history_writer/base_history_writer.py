@@ -1,60 +1,208 @@
 __all__ = ['BaseHistoryWriter']
 
 import os
-from datetime import datetime, timedelta
-from io import TextIOWrapper
-from typing import Any, Dict, Optional
+import re
+import time
+from datetime import datetime
+from io import BufferedWriter, TextIOWrapper
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
 
 from ..configs.history_writer_config import HistoryWriterConfig
+from ..models.enums import FsmStepFlags, HistorySinks
+from .background_write_queue import BackgroundWriteQueue
+from .history_compression import COMPRESSION_SUFFIXES
+from .config_catalog import ConfigCatalog
+from .file_sink import FileSink
+from .history_file_pool import HistoryFilePool
+from .log_retention_manager import LogRetentionManager
+from .sinks import BaseHistorySink, MemoryRingSink, SqliteEventSink
+from .sqlite_event_store import SqliteEventStore
+
+if TYPE_CHECKING:
+    from ..configs import FsmConfig
+
+# Каталог конфигураций рядом с файлами логов
+CONFIG_CATALOG_DIR = 'config_catalog'
 
 
 class BaseHistoryWriter:
-    def __init__(self, config: HistoryWriterConfig, frmt: str) -> None:
-        """ Создаёт файловый писатель и очищает устаревшие логи. """
-        self._file: Optional[TextIOWrapper] = None
+    """
+        Базовый писатель истории.
+        Наследники форматируют записи и отдают их в _emit(), который рассылает их по приёмникам BaseHistorySink:
+        в файл (HistorySinks.FILE — FileSink), в кольцевой буфер (HistorySinks.MEMORY) и в подключённые add_sink().
+        События стабильной истории дополнительно отдаются по полям (_emit_event()) приёмникам с structured = True
+        (HistorySinks.SQLITE — SqliteEventSink); без таких приёмников поля не собираются.
+        flush() и close() писателя тоже только рассылаются по приёмникам; flush() вызывается и по событиям шага FSM
+        (on_event, flush_on_events). Политику сброса, сжатие, фоновую очередь и пул дескрипторов файла
+        держит FileSink; без приёмника FILE каталог логов не создаётся и файл не открывается.
+        Писатель потока (передан stream — id FSM) пишет в свой файл (имя с {stream} или с суффиксом _<stream>)
+        через общий HistoryFilePool.
+    """
+
+    # Можно ли терять записи писателя при переполнении очереди по политике DROP_RAW
+    droppable: bool = False
+    # Двоичный файл: _emit() принимает bytes, файл открывается в режиме 'ab'
+    binary: bool = False
+    # Класс файлового приёмника (асинхронные писатели подменяют его на AsyncFileSink)
+    FILE_SINK: type[FileSink] = FileSink
+
+    def __init__(
+            self,
+            config: HistoryWriterConfig,
+            frmt: str,
+            queue: Optional[BackgroundWriteQueue] = None,
+            stream: Optional[str] = None
+    ) -> None:
+        """ Создаёт писатель и его приёмники; файл приёмника FILE регистрирует в LogRetentionManager и открывает. """
         self._fields = config.fields
         self._async_mode = config.async_mode
-        self._path = self._resolve_log_path(config.name)
-        self._cleanup_old_files(self._path, frmt, config.max_age_days)
+        self._flush_on_events: FsmStepFlags = config.flush_on_events
+        self._stream: Optional[str] = stream
+        self._sinks: list[BaseHistorySink] = []
+        if HistorySinks.MEMORY in config.sinks:
+            self._sinks.append(MemoryRingSink(config.memory_capacity))
+        if HistorySinks.SQLITE in config.sinks:
+            store = SqliteEventStore.for_path(
+                self._resolve_log_path(config.sqlite_path), config.sqlite_batch_size, config.flush_interval
+            )
+            self._sinks.append(SqliteEventSink(store, stream))
+        self._file_sink: Optional[FileSink] = None
+        self._path: Optional[str] = None
+        if HistorySinks.FILE in config.sinks:
+            suffix = COMPRESSION_SUFFIXES[config.compression]
+            name = config.name if config.name.endswith(suffix) else config.name + suffix
+            self._path = self._resolve_log_path(name, stream)
+            # Очистку старых логов делает общий менеджер каталога в фоне: писатель каталог не сканирует
+            LogRetentionManager.for_dir(os.path.dirname(self._path), config.retention_interval).register(
+                self._path, frmt + suffix, config.max_age_days, config.max_total_bytes
+            )
+            # Очередь используется, только если этот писатель фоновый (очередь может быть общей с другим писателем FSM)
+            self._file_sink = self.FILE_SINK(
+                config, self._path, binary=self.binary, droppable=self.droppable,
+                queue=queue if config.background else None,
+                pool=HistoryFilePool.shared() if stream is not None else None,
+                on_open=self._on_open, before_exit=self._write_unbuffered_records
+            )
+            self._sinks.append(self._file_sink)
+        # Приёмники событий по полям и источник номера текущего кадра для них (bind_step_source)
+        self._event_sinks: list[BaseHistorySink] = [sink for sink in self._sinks if sink.structured]
+        self._step_source: Optional[Callable[[], int]] = None
         self.open()
 
-    def open(self):
-        """Открывает файл, если он закрыт."""
-        if self._file is None or self._file.closed:
-            self._file = open(self._path, 'a', encoding='utf-8')
+    @property
+    def dropped(self) -> int:
+        """ Число записей, потерянных при переполнении фоновой очереди. """
+        return self._file_sink.dropped if self._file_sink is not None else 0
+
+    @property
+    def background(self) -> bool:
+        """ Пишет ли писатель через фоновую очередь. """
+        return self._file_sink is not None and self._file_sink.background
+
+    @property
+    def path(self) -> Optional[str]:
+        """ Путь к файлу лога (None без приёмника FILE). """
+        return self._path
+
+    @property
+    def stream(self) -> Optional[str]:
+        """ Id потока, в файл которого пишет писатель (None — общий файл по имени из конфигурации). """
+        return self._stream
+
+    @property
+    def sinks(self) -> tuple[BaseHistorySink, ...]:
+        """ Приёмники писателя (FileSink — приёмник FILE, если он включён). """
+        return tuple(self._sinks)
+
+    def add_sink(self, sink: BaseHistorySink) -> None:
+        """ Подключает дополнительный приёмник записей. """
+        self._sinks.append(sink)
+        if sink.structured:
+            self._event_sinks.append(sink)
+
+    def bind_step_source(self, step_source: Callable[[], int]) -> None:
+        """ Задаёт источник номера текущего кадра (вызывается только при записи события). """
+        self._step_source = step_source
+
+    def open(self) -> None:
+        """ Открывает файл приёмника FILE, если он закрыт (фоновый приёмник откроет его при первой записи). """
+        for sink in self._sinks:
+            sink.open()
+
+    def flush(self) -> None:
+        """ Сбрасывает накопленные записи приёмников (файл — на диск). """
+        for sink in self._sinks:
+            sink.flush()
 
     def close(self) -> None:
-        """ Закрывает файл если он открыт. """
-        if self._file is not None and not self._file.closed:
-            self._file.close()
+        """ Приёмники дописывают накопленное и закрываются (close()); файл закрывается. """
+        for sink in self._sinks:
+            sink.close()
+
+    def on_event(self, flags: FsmStepFlags) -> None:
+        """ Сообщает писателю о событиях шага FSM; сбрасывает буфер, если событие входит в flush_on_events. """
+        if flags & self._flush_on_events:
+            self.flush()
+
+    def _emit(self, text: str | bytes, records: int = 1) -> None:
+        """ Рассылает готовую запись по приёмникам. """
+        for sink in self._sinks:
+            sink.write(text, records)
+
+    def _emit_event(
+            self,
+            event: str,
+            state: Any,
+            action: Optional[str] = None,
+            profile: Optional[str] = None,
+            count: Optional[int] = None
+    ) -> None:
+        """ Отдаёт событие стабильной истории по полям приёмникам с structured = True. """
+        ts = time.time()
+        step = self._step_source() if self._step_source is not None else 0
+        for sink in self._event_sinks:
+            sink.write_event(ts, step, event, state.name, state.cls_id, action, profile, count)
+
+    def _write_unbuffered_records(self) -> None:
+        """ Дописывает записи, которые писатель держит вне приёмников (вызывается при завершении интерпретатора). """
+
+    def _on_open(self, file: TextIOWrapper | BufferedWriter) -> None:
+        """ Вызывается FileSink после открытия файла (например, чтобы записать заголовок в новый файл). """
+
+    def _catalog_config(self, config: 'FsmConfig') -> tuple[str, Optional[str]]:
+        """
+            Кладёт конфигурацию в ConfigCatalog рядом с файлом лога (без файла — только считает хэш).
+            Returns:
+                tuple[str, Optional[str]]: Хэш конфигурации и путь её файла относительно каталога лога.
+        """
+        if self._path is None:
+            return config.config_hash, None
+        log_dir = os.path.dirname(self._path)
+        catalog = ConfigCatalog.for_dir(os.path.join(log_dir, CONFIG_CATALOG_DIR))
+        config_hash = catalog.add(config)
+        return config_hash, os.path.relpath(catalog.path_of(config_hash), log_dir)
 
     def write(self, record: Dict[str, Any]) -> None:
         raise NotImplementedError
 
     @staticmethod
-    def _cleanup_old_files(path: str, fmt: str, max_age_days: int):
-        """ Удаляет файлы старше max_age_days в директории path """
-        dir_path = os.path.dirname(path) or '.'
-        cutoff = datetime.now() - timedelta(days=max_age_days)
-        for file_name in os.listdir(dir_path):
-            if file_name.endswith(fmt):
-                fpath = os.path.join(dir_path, file_name)
-                try:
-                    ctime = datetime.fromtimestamp(os.path.getctime(fpath))
-                    if ctime < cutoff:
-                        os.remove(fpath)
-                except Exception:
-                    pass
-
-    @staticmethod
-    def _resolve_log_path(file_name: str) -> str:
+    def _resolve_log_path(file_name: str, stream: Optional[str] = None) -> str:
         # Получаем рабочую директорию (корень проекта)
         root_dir = os.getcwd()
         logs_dir = os.path.join(root_dir, 'fsm_logs')
         # Формируем подстановку даты/времени
         timestamp = datetime.now().strftime('%d%m%Y_%H%M')
-        # Подставляем {timestamp}
-        name = file_name.format(timestamp=timestamp)
+        # Файл потока: {stream} в имени или суффикс _<stream> перед расширением
+        if stream is not None:
+            stream = re.sub(r'[^\w.-]', '_', stream)
+        if stream is not None and '{stream}' not in file_name:
+            base, ext = os.path.splitext(file_name)
+            if ext in COMPRESSION_SUFFIXES.values():
+                base, inner = os.path.splitext(base)
+                ext = inner + ext
+            file_name = f"{base}_{{stream}}{ext}"
+        # Подставляем {timestamp} и {stream}
+        name = file_name.format(timestamp=timestamp, stream=stream if stream is not None else "")
         # Полный путь
         abs_path = os.path.join(logs_dir, name)
         # Создаём каталог, если его нет
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+__all__ = ['BINARY_RAW_MAGIC', 'BINARY_RAW_OPTIONAL_COLUMNS', 'binary_raw_columns', 'encode_binary_raw_header',
+           'decode_binary_raw_header', 'binary_raw_struct']
+
+import json
+import struct
+
+# Сигнатура файла двоичной сырой истории (последний байт — версия формата)
+BINARY_RAW_MAGIC = b'NFSMRAW\x01'
+# Заголовок выравнивается до кратного этому числу байт, чтобы записи начинались с выровненного смещения
+_HEADER_ALIGN = 64
+_HEADER_LEN = struct.Struct('<I')
+
+# Колонки записи: имя → тип NumPy (little-endian) и код struct. step и cls_id есть всегда
+_COLUMN_TYPES: dict[str, tuple[str, str]] = {
+    "step": ('<i8', 'q'),
+    "cls_id": ('<i4', 'i'),
+    "run_length": ('<i8', 'q'),
+    "confidence": ('<f4', 'f'),
+    "timestamp": ('<f8', 'd'),
+    # Флаги шага FsmStepFlags (пишет только FlightRecorder)
+    "flags": ('<u1', 'B'),
+}
+BINARY_RAW_OPTIONAL_COLUMNS = ("run_length", "confidence", "timestamp")
+
+
+def binary_raw_columns(fields: tuple) -> tuple[tuple[str, str], ...]:
+    """
+        Возвращает колонки записи (имя, тип NumPy) в порядке хранения для выбранных необязательных колонок.
+        Raises:
+            ValueError: Неизвестная колонка.
+    """
+    unknown = set(fields) - set(BINARY_RAW_OPTIONAL_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown binary raw history columns: {sorted(unknown)}; "
+                         f"allowed: {BINARY_RAW_OPTIONAL_COLUMNS}")
+    names = ("step", "cls_id") + tuple(name for name in BINARY_RAW_OPTIONAL_COLUMNS if name in fields)
+    return tuple((name, _COLUMN_TYPES[name][0]) for name in names)
+
+
+def binary_raw_struct(columns: tuple[tuple[str, str], ...]) -> struct.Struct:
+    """ Возвращает struct.Struct одной записи (без выравнивания, как np.dtype по тем же колонкам). """
+    return struct.Struct('<' + ''.join(_COLUMN_TYPES[name][1] for name, _ in columns))
+
+
+def encode_binary_raw_header(columns: tuple[tuple[str, str], ...]) -> bytes:
+    """ Кодирует заголовок: сигнатура, длина JSON-описания, JSON-описание колонок, выравнивание пробелами. """
+    meta = json.dumps({"columns": [list(column) for column in columns]}, separators=(',', ':')).encode()
+    size = len(BINARY_RAW_MAGIC) + _HEADER_LEN.size + len(meta)
+    meta += b' ' * (-size % _HEADER_ALIGN)
+    return BINARY_RAW_MAGIC + _HEADER_LEN.pack(len(meta)) + meta
+
+
+def decode_binary_raw_header(data: bytes) -> tuple[tuple[tuple[str, str], ...], int]:
+    """
+        Разбирает заголовок из начала файла.
+        Returns:
+            tuple: Колонки (имя, тип NumPy) и смещение первой записи.
+        Raises:
+            ValueError: Не файл двоичной сырой истории.
+    """
+    prefix = len(BINARY_RAW_MAGIC) + _HEADER_LEN.size
+    if len(data) < prefix or data[:len(BINARY_RAW_MAGIC)] != BINARY_RAW_MAGIC:
+        raise ValueError("Not a binary raw history file (bad signature)")
+    (meta_len, ) = _HEADER_LEN.unpack_from(data, len(BINARY_RAW_MAGIC))
+    if len(data) < prefix + meta_len:
+        raise ValueError("Truncated binary raw history header")
+    meta = json.loads(data[prefix:prefix + meta_len])
+    return tuple((name, dtype) for name, dtype in meta["columns"]), prefix + meta_len
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+__all__ = ['BinaryRawHistoryWriter']
+
+import math
+import time
+from io import BufferedWriter, TextIOWrapper
+from typing import Optional
+
+from ..configs.history_writer_config import HistoryWriterConfig
+from .background_write_queue import BackgroundWriteQueue
+from .base_history_writer import BaseHistoryWriter
+from .binary_raw_format import (binary_raw_columns, binary_raw_struct, decode_binary_raw_header,
+                                encode_binary_raw_header)
+
+
+class BinaryRawHistoryWriter(BaseHistoryWriter):
+    """
+        Писатель сырой истории в двоичном формате: заголовок с описанием колонок и записи фиксированной ширины
+        (step, cls_id и необязательные run_length, confidence, timestamp — по config.fields).
+        Файл читается без копирования через BinaryRawHistoryReader (np.memmap → структурированный массив).
+        С колонкой run_length подряд идущие кадры одного cls_id пишутся одной записью: серия копится
+        в писателе и уходит в буфер, когда меняется cls_id, а также при flush()/close().
+        confidence и timestamp серии — значения её первого кадра; timestamp — time.monotonic().
+    """
+
+    droppable = True
+    binary = True
+
+    def __init__(self, config: HistoryWriterConfig, queue: Optional[BackgroundWriteQueue] = None,
+                 stream: Optional[str] = None) -> None:
+        self._columns = binary_raw_columns(config.fields)
+        self._struct = binary_raw_struct(self._columns)
+        self._with_run_length: bool = "run_length" in config.fields
+        self._with_confidence: bool = "confidence" in config.fields
+        self._with_timestamp: bool = "timestamp" in config.fields
+        # Незаписанная серия: [first_step, cls_id, count, confidence, timestamp]
+        self._run: Optional[list] = None
+        super().__init__(config, '.bin', queue, stream)
+
+    @property
+    def columns(self) -> tuple[tuple[str, str], ...]:
+        """ Колонки записи (имя, тип NumPy) в порядке хранения. """
+        return self._columns
+
+    def write_frame(self, step_index: int, cls_id: int, confidence: float = math.nan) -> None:
+        """ Записывает кадр step_index с классом cls_id (и уверенностью, если колонка включена). """
+        self.write_frames(step_index, cls_id, 1, confidence)
+
+    def write_frames(self, step_index: int, cls_id: int, count: int, confidence: float = math.nan) -> None:
+        """ Записывает count подряд идущих кадров cls_id, начиная с кадра step_index. """
+        timestamp = time.monotonic() if self._with_timestamp else 0.0
+        if self._with_run_length:
+            run = self._run
+            if run is not None and run[1] == cls_id and run[0] + run[2] == step_index:
+                run[2] += count
+                return
+            self._emit_run()
+            self._run = [step_index, cls_id, count, confidence, timestamp]
+            return
+        pack = self._pack
+        if count == 1:
+            self._emit(pack(step_index, cls_id, 1, confidence, timestamp))
+        else:
+            self._emit(b''.join(pack(step_index + i, cls_id, 1, confidence, timestamp) for i in range(count)), count)
+
+    def flush(self) -> None:
+        """ Отдаёт незаписанную серию и сбрасывает буфер на диск. """
+        self._emit_run()
+        super().flush()
+
+    def close(self) -> None:
+        """ Отдаёт незаписанную серию, сбрасывает буфер и закрывает файл. """
+        self._emit_run()
+        super().close()
+
+    def _emit_run(self) -> None:
+        run = self._run
+        if run is not None:
+            self._run = None
+            self._emit(self._pack(*run), run[2])
+
+    def _pack(self, step_index: int, cls_id: int, count: int, confidence: float, timestamp: float) -> bytes:
+        values = [step_index, cls_id]
+        if self._with_run_length:
+            values.append(count)
+        if self._with_confidence:
+            values.append(confidence)
+        if self._with_timestamp:
+            values.append(timestamp)
+        return self._struct.pack(*values)
+
+    def _on_open(self, file: TextIOWrapper | BufferedWriter) -> None:
+        """
+            Пишет заголовок в новый файл; при дописывании проверяет, что колонки совпадают
+            (иначе закрывает переданный дескриптор и бросает ValueError).
+        """
+        if file.tell() == 0:
+            file.write(encode_binary_raw_header(self._columns))
+            return
+        with open(self._path, 'rb') as reader:
+            columns, _ = decode_binary_raw_header(reader.read(64 * 1024))
+        if columns != self._columns:
+            file.close()
+            raise ValueError(f"[{self.__class__.__name__}] Cannot append to '{self._path}': "
+                             f"columns {columns} differ from {self._columns}")
+
+    def _write_unbuffered_records(self) -> None:
+        """ Завершение интерпретатора: серия, не успевшая попасть в буфер, дописывается в файл напрямую. """
+        run = self._run
+        if run is not None:
+            self._run = None
+            self._file_sink._write(self._pack(*run), run[2])
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+__all__ = ['ConfigCatalog']
+
+import json
+import os
+import threading
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..configs import FsmConfig
+
+
+class ConfigCatalog:
+    """
+        Каталог конфигураций FSM с адресацией по содержимому: <dir>/<config_hash>.json.
+        Конфигурация записывается один раз на каталог; логи истории ссылаются на неё по хэшу (FsmConfig.config_hash).
+        Каталог помнит записанные и найденные на диске хэши, поэтому повторная регистрация той же конфигурации
+        (сотни FSM одного менеджера) не сериализует её и не обращается к диску.
+    """
+
+    __slots__ = ('_dir', '_known', '_lock')
+
+    # Каталоги по абсолютному пути
+    _catalogs: dict[str, ConfigCatalog] = {}
+    _catalogs_lock = threading.Lock()
+
+    def __init__(self, dir_path: str) -> None:
+        """
+            Args:
+                dir_path (str): Каталог файлов конфигураций.
+        """
+        self._dir: str = os.path.abspath(dir_path)
+        self._known: set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def for_dir(cls, dir_path: str) -> ConfigCatalog:
+        """ Возвращает каталог для dir_path (создаёт при первом обращении). """
+        key = os.path.abspath(dir_path)
+        with cls._catalogs_lock:
+            catalog = cls._catalogs.get(key)
+            if catalog is None:
+                catalog = cls._catalogs[key] = cls(key)
+            return catalog
+
+    @property
+    def dir_path(self) -> str:
+        return self._dir
+
+    def path_of(self, config_hash: str) -> str:
+        """ Путь файла конфигурации с указанным хэшем. """
+        return os.path.join(self._dir, f"{config_hash}.json")
+
+    def add(self, config: FsmConfig) -> str:
+        """
+            Записывает конфигурацию, если её ещё нет в каталоге.
+            Returns:
+                str: Хэш конфигурации.
+        """
+        config_hash = config.config_hash
+        if config_hash in self._known:
+            return config_hash
+        with self._lock:
+            if config_hash not in self._known:
+                path = self.path_of(config_hash)
+                if not os.path.exists(path):
+                    os.makedirs(self._dir, exist_ok=True)
+                    # Запись через временный файл: читатель не увидит недописанную конфигурацию
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as file:
+                        file.write(config.to_json())
+                    os.replace(tmp_path, path)
+                self._known.add(config_hash)
+        return config_hash
+
+    def load(self, config_hash: str) -> dict[str, Any]:
+        """ Читает конфигурацию по хэшу (словарь FsmConfig.to_dict()). """
+        with open(self.path_of(config_hash), encoding='utf-8') as file:
+            return json.load(file)
+
+    def __contains__(self, config_hash: str) -> bool:
+        return config_hash in self._known or os.path.exists(self.path_of(config_hash))
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} dir={self._dir!r} known={len(self._known)}>"
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+__all__ = ['FileSink']
+
+import atexit
+import io
+import time
+import weakref
+from io import BufferedWriter, TextIOWrapper
+from typing import Any, Callable, Optional
+
+from ..configs.history_writer_config import HistoryWriterConfig
+from ..models.enums import HistoryCompressions
+from .background_write_queue import BackgroundWriteQueue, stop_all_queues
+from .history_compression import new_compressor, sync_flush
+from .history_file_pool import HistoryFilePool
+from .sinks import BaseHistorySink
+
+# Операции фоновой очереди над файлом приёмника
+_FLUSH, _CLOSE = 1, 2
+
+# Приёмники с открытыми файлами или несброшенными записями: при завершении интерпретатора они дописываются
+_OPEN_SINKS: 'weakref.WeakSet[FileSink]' = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_sinks() -> None:
+    # Сначала дописываем фоновые очереди до конца, затем закрываем все файлы напрямую
+    try:
+        stop_all_queues()
+    finally:
+        for sink in list(_OPEN_SINKS):
+            try:
+                sink._close_at_exit()
+            except Exception:
+                pass
+
+
+class FileSink(BaseHistorySink):
+    """
+        Приёмник записей писателя истории в файл (HistorySinks.FILE).
+        Записи копятся в буфере файла и сбрасываются на диск по политике из HistoryWriterConfig:
+        по объёму, по числу записей и по времени; flush() писателя (в том числе по событиям шага FSM)
+        сбрасывает буфер сразу.
+        В фоновом режиме (передана очередь) файловые операции только ставятся в BackgroundWriteQueue,
+        а файл открывается, пишется и закрывается потоком очереди.
+        Со сжатием (HistoryCompressions) записи проходят через потоковый компрессор. Файл — последовательность
+        независимо сжатых блоков по compression_block_bytes несжатых байт: при аварии теряется не больше
+        незавершённого блока. Явный flush() (в том числе по flush_on_events) и сброс по flush_interval
+        выталкивают сжатое: gzip — Z_SYNC_FLUSH, xz так не умеет и завершает блок. Сброс по числу записей
+        или объёму сжатое не выталкивает — иначе маркер синхронизации на каждую запись раздувал бы файл.
+        Приёмник потока (передан pool) не держит собственный дескриптор: записи копятся в памяти,
+        а при сбросе дописываются через общий HistoryFilePool, который ограничивает число открытых файлов процесса.
+    """
+
+    __slots__ = ('_path', '_binary', 'droppable', '_dropped', '_queue', '_pool', '_on_open', '_before_exit',
+                 '_file', '_chunks', '_flush_bytes', '_flush_records', '_flush_interval', '_pending_bytes',
+                 '_pending_records', '_last_flush', '_dirty', '_compression', '_compression_level', '_compressed',
+                 '_block_size', '_compressor', '_block_bytes', '__weakref__')
+
+    def __init__(
+            self,
+            config: HistoryWriterConfig,
+            path: str,
+            binary: bool = False,
+            droppable: bool = False,
+            queue: Optional[BackgroundWriteQueue] = None,
+            pool: Optional[HistoryFilePool] = None,
+            on_open: Optional[Callable[[TextIOWrapper | BufferedWriter], None]] = None,
+            before_exit: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+            Args:
+                config (HistoryWriterConfig): Политика сброса и сжатие.
+                path (str): Путь к файлу лога.
+                binary (bool): Записи — bytes, файл открывается в режиме 'ab'.
+                droppable (bool): Можно ли терять записи при переполнении очереди по политике DROP_RAW.
+                queue (Optional[BackgroundWriteQueue]): Фоновая очередь (None — запись в потоке шага FSM).
+                pool (Optional[HistoryFilePool]): Пул дескрипторов для файла потока.
+                on_open: Вызывается с дескриптором после открытия файла (например, чтобы записать заголовок).
+                before_exit: Вызывается при завершении интерпретатора перед закрытием файла
+                             (писатель дописывает записи, которые держит вне приёмника).
+        """
+        self._path: str = path
+        self._binary: bool = binary
+        self.droppable: bool = droppable
+        self._dropped: int = 0
+        self._queue: Optional[BackgroundWriteQueue] = queue
+        self._pool: Optional[HistoryFilePool] = pool
+        self._on_open: Optional[Callable[[TextIOWrapper | BufferedWriter], None]] = on_open
+        self._before_exit: Optional[Callable[[], None]] = before_exit
+        self._file: Optional[TextIOWrapper | BufferedWriter] = None
+        # Записи, ожидающие сброса через пул (только у приёмника потока)
+        self._chunks: list[str | bytes] = []
+        self._flush_bytes: int = config.flush_bytes
+        self._flush_records: int = config.flush_records
+        self._flush_interval: float = config.flush_interval
+        self._pending_bytes: int = 0
+        self._pending_records: int = 0
+        self._last_flush: float = time.monotonic()
+        # Записано ли в буфер открытого файла что-то после последнего сброса на диск
+        self._dirty: bool = False
+        self._compression: HistoryCompressions = config.compression
+        self._compression_level: int = config.compression_level
+        self._compressed: bool = config.compression is not HistoryCompressions.NONE
+        self._block_size: int = config.compression_block_bytes
+        # Компрессор текущего блока (создаётся при первой записи блока) и его несжатый объём
+        self._compressor: Optional[Any] = None
+        self._block_bytes: int = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def dropped(self) -> int:
+        """ Число записей, потерянных при переполнении фоновой очереди или из-за ошибки записи. """
+        return self._dropped
+
+    @property
+    def background(self) -> bool:
+        """ Пишет ли приёмник через фоновую очередь. """
+        return self._queue is not None
+
+    def open(self) -> None:
+        """ Открывает файл, если он закрыт (в фоновом режиме файл откроет поток очереди при первой записи). """
+        if self._queue is None:
+            self._open()
+
+    def write(self, data: str | bytes, records: int = 1) -> None:
+        """ Пишет запись в файл (в фоновом режиме — ставит в очередь). """
+        if self._queue is not None:
+            self._queue.put(self, data, records)
+        else:
+            self._write(data, records)
+
+    def flush(self) -> None:
+        if self._queue is not None:
+            self._queue.put_control(self, _FLUSH)
+        else:
+            self._flush()
+
+    def close(self) -> None:
+        if self._queue is not None:
+            self._queue.put_control(self, _CLOSE)
+        else:
+            self._close()
+
+    def _open(self) -> None:
+        if self._pool is not None:
+            # Файл приёмника потока открывает пул при сбросе
+            return
+        if self._file is None or self._file.closed:
+            # Буфер файла не меньше порога по объёму, чтобы сбросы делала политика, а не переполнение буфера
+            buffering = max(self._flush_bytes, io.DEFAULT_BUFFER_SIZE)
+            if self._binary or self._compressed:
+                self._file = open(self._path, 'ab', buffering=buffering)
+            else:
+                self._file = open(self._path, 'a', encoding='utf-8', buffering=buffering)
+            self._last_flush = time.monotonic()
+            self._keep_for_exit()
+            if self._on_open is not None:
+                self._on_open(self._file)
+
+    def _open_pooled(self) -> TextIOWrapper | BufferedWriter:
+        """ Открывает файл приёмника потока для HistoryFilePool (вызывается под блокировкой пула). """
+        if self._binary or self._compressed:
+            handle = open(self._path, 'ab')
+        else:
+            handle = open(self._path, 'a', encoding='utf-8')
+        if self._on_open is not None:
+            self._on_open(handle)
+        return handle
+
+    def _write(self, data: str | bytes, records: int) -> None:
+        """ Пишет запись в буфер файла и сбрасывает его на диск, если сработало условие политики. """
+        out = self._compress(data) if self._compressed else data
+        if self._pool is not None:
+            if not self._chunks:
+                self._keep_for_exit()
+            if out:
+                self._chunks.append(out)
+        else:
+            self._open()
+            if out:
+                self._file.write(out)
+                self._dirty = True
+        self._pending_bytes += len(data)
+        self._pending_records += records
+        if self._policy_due():
+            self._flush(sync=self._interval_due())
+
+    def _policy_due(self) -> bool:
+        """ Сработало ли условие политики сброса по объёму, числу записей или времени. """
+        return bool(
+            (self._flush_records and self._pending_records >= self._flush_records)
+            or (self._flush_bytes and self._pending_bytes >= self._flush_bytes)
+            or self._interval_due()
+        )
+
+    def _interval_due(self) -> bool:
+        """ Прошло ли flush_interval секунд с последнего сброса. """
+        return bool(self._flush_interval and time.monotonic() - self._last_flush >= self._flush_interval)
+
+    def _keep_for_exit(self) -> None:
+        """ Регистрирует приёмник для сброса при завершении интерпретатора. """
+        _OPEN_SINKS.add(self)
+
+    def _discard_for_exit(self) -> None:
+        _OPEN_SINKS.discard(self)
+
+    def _flush(self, sync: bool = True) -> None:
+        """
+            Сбрасывает буфер на диск. sync — вытолкнуть и сжатое текущего блока
+            (flush(), события и flush_interval; сброс по числу записей или объёму — нет).
+        """
+        out = self._flush_compressed(sync)
+        if self._pool is not None:
+            if out:
+                self._chunks.append(out)
+            if self._chunks:
+                chunks = self._chunks
+                self._chunks = []
+                self._pool.write(self, b"".join(chunks) if self._binary or self._compressed else "".join(chunks))
+        elif self._file is not None and not self._file.closed:
+            if out:
+                self._file.write(out)
+                self._dirty = True
+            if self._dirty:
+                self._file.flush()
+                self._dirty = False
+        self._pending_bytes = 0
+        self._pending_records = 0
+        self._last_flush = time.monotonic()
+
+    def _close(self) -> None:
+        if self._pool is not None:
+            if self._compressor is not None:
+                self._chunks.append(self._finish_block())
+            self._flush()
+            self._pool.release(self._path)
+        elif self._file is not None and not self._file.closed:
+            if self._compressor is not None:
+                self._file.write(self._finish_block())
+                self._dirty = True
+            self._flush()
+            self._file.close()
+        self._discard_for_exit()
+
+    def _close_at_exit(self) -> None:
+        """ Завершение интерпретатора: писатель дописывает удерживаемые записи, файл закрывается напрямую. """
+        if self._before_exit is not None:
+            self._before_exit()
+        self._close()
+
+    def _compress(self, data: str | bytes) -> bytes:
+        """ Сжимает запись в текущий блок; завершает блок, когда он набрал compression_block_bytes. """
+        raw = data if isinstance(data, bytes) else data.encode('utf-8')
+        if self._compressor is None:
+            self._compressor = new_compressor(self._compression, self._compression_level)
+        out = self._compressor.compress(raw)
+        self._block_bytes += len(raw)
+        if self._block_bytes >= self._block_size:
+            out += self._finish_block()
+        return out
+
+    def _flush_compressed(self, sync: bool) -> bytes:
+        """
+            Выталкивает сжатое текущего блока при сбросе с sync. gzip выталкивается без завершения блока;
+            xz-поток до завершения не читается, поэтому блок завершается.
+        """
+        if self._compressor is None or not sync:
+            return b''
+        if self._compression is HistoryCompressions.LZMA:
+            return self._finish_block()
+        return sync_flush(self._compressor)
+
+    def _finish_block(self) -> bytes:
+        """ Завершает текущий блок (gzip-member / xz-поток). """
+        if self._compressor is None:
+            return b''
+        out = self._compressor.flush()
+        self._compressor = None
+        self._block_bytes = 0
+        return out
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={self._path!r} background={self._queue is not None}>"
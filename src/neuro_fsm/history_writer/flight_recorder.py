@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+__all__ = ['FlightRecorder', 'FLIGHT_RECORDER_COLUMNS']
+
+import math
+import os
+import threading
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import ClassVar, Optional
+
+from ..configs.flight_recorder_config import FlightRecorderConfig
+from ..models.enums import FsmStepFlags
+from .base_history_writer import BaseHistoryWriter
+from .binary_raw_format import binary_raw_struct, encode_binary_raw_header
+from .log_retention_manager import LogRetentionManager
+
+# Колонки файла самописца (формат двоичной сырой истории, читается BinaryRawHistoryReader)
+FLIGHT_RECORDER_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("step", '<i8'),
+    ("cls_id", '<i4'),
+    ("run_length", '<i8'),
+    ("confidence", '<f4'),
+    ("flags", '<u1'),
+)
+# Флаги-состояния (держатся, пока держится состояние): срабатывают по фронту, а не на каждом кадре
+_LEVEL_FLAGS = int(FsmStepFlags.RESETTER | FsmStepFlags.BREAKER | FsmStepFlags.STABLE)
+
+
+class FlightRecorder:
+    """
+        Бортовой самописец FSM: кольцевой буфер последних записей сырого входа в заранее выделенных массивах.
+        Запись на шаге — присваивание в пять массивов без выделения памяти и форматирования.
+        Полный такт — запись с run_length 1, серия тихих кадров (process_run / process_batch) — одна запись.
+        Когда у шага есть флаг из triggers или вызван dump(), записи, накопленные с прошлого сброса
+        (не больше capacity), копируются и дописываются в двоичный файл общим фоновым потоком — шаг FSM диска не ждёт.
+        События (STAGE_DONE, PROFILE_CHANGED) срабатывают на каждом шаге, состояния (RESETTER, BREAKER, STABLE) —
+        по фронту: серия кадров прерывателя даёт один сброс, а не сброс на кадр.
+        Сбросы, поставленные, пока предыдущая запись самописца ещё ждёт потока, дописываются ею же одной операцией,
+        поэтому частые триггеры не множат открытия файла.
+        Файл — двоичная сырая история с колонками FLIGHT_RECORDER_COLUMNS (заголовок пишется один раз),
+        читается BinaryRawHistoryReader; сбросы идут подряд, без повторов, с разрывами по step.
+    """
+
+    __slots__ = ('_capacity', '_triggers', '_path', '_steps', '_cls_ids', '_runs', '_confidence', '_flags',
+                 '_count', '_dumped', '_last_flags', '_pending', '_dumps', '_chunks', '_scheduled', '_lock')
+
+    # Общий поток сбросов всех самописцев процесса (один поток — сбросы в файл идут в порядке вызова)
+    _executor: ClassVar[Optional[ThreadPoolExecutor]] = None
+    _executor_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, config: FlightRecorderConfig, stream: Optional[str] = None) -> None:
+        """
+            Args:
+                config (FlightRecorderConfig): Настройки самописца.
+                stream (Optional[str]): Id потока (FSM) — добавляется к имени файла, как у писателей истории.
+        """
+        capacity = config.capacity
+        self._capacity: int = capacity
+        self._triggers: int = int(config.triggers)
+        self._steps: array = array('q', bytes(8 * capacity))
+        self._cls_ids: array = array('i', bytes(4 * capacity))
+        self._runs: array = array('q', bytes(8 * capacity))
+        self._confidence: array = array('f', bytes(4 * capacity))
+        self._flags: array = array('B', bytes(capacity))
+        # Всего записано и записано на момент последнего сброса (позиция в кольце — по модулю capacity)
+        self._count: int = 0
+        self._dumped: int = 0
+        self._last_flags: int = 0
+        self._pending: Optional[Future] = None
+        self._dumps: int = 0
+        # Скопированные сбросы, ещё не записанные потоком, и поставлена ли их запись
+        self._chunks: list[list[array]] = []
+        self._scheduled: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        self._path: str = BaseHistoryWriter._resolve_log_path(config.name, stream)
+        LogRetentionManager.for_dir(os.path.dirname(self._path)).register(
+            self._path, os.path.splitext(self._path)[1], config.max_age_days
+        )
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def dumps(self) -> int:
+        """ Сколько раз буфер сбрасывался в файл. """
+        return self._dumps
+
+    @property
+    def pending(self) -> Optional[Future]:
+        """ Последний поставленный сброс (None — сбросов не было). """
+        return self._pending
+
+    def __len__(self) -> int:
+        """ Число записей в буфере. """
+        return min(self._count, self._capacity)
+
+    def record(self, step: int, cls_id: int, confidence: float, flags: int) -> None:
+        """ Записывает полный такт; сбрасывает буфер, если появился флаг из triggers. """
+        pos = self._count % self._capacity
+        self._steps[pos] = step
+        self._cls_ids[pos] = cls_id
+        self._runs[pos] = 1
+        self._confidence[pos] = confidence
+        self._flags[pos] = flags
+        self._count += 1
+        if flags & self._triggers & ~(self._last_flags & _LEVEL_FLAGS):
+            self.dump()
+        self._last_flags = flags
+
+    def record_run(self, step: int, cls_id: int, frames: int, flags: int) -> None:
+        """ Записывает серию тихих кадров (первый кадр — step) одной записью; триггеры не проверяются. """
+        pos = self._count % self._capacity
+        self._steps[pos] = step
+        self._cls_ids[pos] = cls_id
+        self._runs[pos] = frames
+        self._confidence[pos] = math.nan
+        self._flags[pos] = flags
+        self._count += 1
+
+    def dump(self) -> Optional[Future]:
+        """
+            Ставит в фоновый поток запись накопленного с прошлого сброса.
+            Returns:
+                Optional[Future]: Сброс (или предыдущий, если новых записей нет; None — записей не было).
+        """
+        new = min(self._count - self._dumped, self._capacity)
+        if not new:
+            return self._pending
+        start = (self._count - new) % self._capacity
+        end = start + new
+        columns = []
+        for column in (self._steps, self._cls_ids, self._runs, self._confidence, self._flags):
+            if end <= self._capacity:
+                columns.append(column[start:end])
+            else:
+                columns.append(column[start:] + column[:end - self._capacity])
+        self._dumped = self._count
+        self._dumps += 1
+        with self._lock:
+            self._chunks.append(columns)
+            if not self._scheduled:
+                self._scheduled = True
+                self._pending = self._shared_executor().submit(self._write)
+        return self._pending
+
+    def clear(self) -> None:
+        """ Очищает буфер (уже поставленные сбросы дописываются). """
+        self._count = 0
+        self._dumped = 0
+        self._last_flags = 0
+
+    def close(self) -> None:
+        """ Дожидается записи поставленных сбросов. """
+        if self._pending is not None:
+            self._pending.result()
+
+    def _write(self) -> None:
+        """ Дописывает накопленные сбросы в файл (в фоновом потоке); в новый файл сначала пишется заголовок. """
+        with self._lock:
+            chunks, self._chunks = self._chunks, []
+            self._scheduled = False
+        pack = binary_raw_struct(FLIGHT_RECORDER_COLUMNS).pack
+        with open(self._path, 'ab') as file:
+            if file.tell() == 0:
+                file.write(encode_binary_raw_header(FLIGHT_RECORDER_COLUMNS))
+            file.write(b''.join(b''.join(map(pack, *columns)) for columns in chunks))
+
+    @classmethod
+    def _shared_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='neuro_fsm-flight-recorder')
+        return cls._executor
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} size={len(self)}/{self._capacity} dumps={self._dumps} path={self._path!r}>"
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+__all__ = ['COMPRESSION_SUFFIXES', 'new_compressor', 'sync_flush', 'open_history_log']
+
+import gzip
+import lzma
+import os
+import zlib
+from typing import IO, Any
+
+from ..models.enums import HistoryCompressions
+
+# Суффикс файла по типу сжатия
+COMPRESSION_SUFFIXES: dict[HistoryCompressions, str] = {
+    HistoryCompressions.NONE: '',
+    HistoryCompressions.GZIP: '.gz',
+    HistoryCompressions.LZMA: '.xz',
+}
+
+
+def new_compressor(compression: HistoryCompressions, level: int) -> Any:
+    """
+        Потоковый компрессор одного блока: gzip-member (zlib с gzip-обёрткой) или xz-поток.
+        Завершённые блоки, дописанные подряд в один файл, читаются gzip.open / lzma.open как единый поток.
+    """
+    if compression is HistoryCompressions.GZIP:
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression is HistoryCompressions.LZMA:
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=level)
+    raise ValueError(f"Compression {compression.name} has no compressor")
+
+
+def sync_flush(compressor: Any) -> bytes:
+    """
+        Выталкивает всё сжатое gzip-компрессором без завершения блока (Z_SYNC_FLUSH),
+        чтобы записанное можно было прочитать после аварии.
+        У xz такого сброса нет: поток читается только завершённым (см. FileSink._flush_compressed()).
+    """
+    return compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def open_history_log(path: str | os.PathLike, mode: str = 'rt') -> IO:
+    """
+        Открывает файл истории на потоковое чтение, распаковывая его по суффиксу (.gz / .xz).
+        Args:
+            path: Путь к файлу.
+            mode: 'rt' (текст, utf-8) или 'rb'.
+    """
+    path = os.fspath(path)
+    encoding = 'utf-8' if 't' in mode else None
+    if path.endswith(COMPRESSION_SUFFIXES[HistoryCompressions.GZIP]):
+        return gzip.open(path, mode, encoding=encoding)
+    if path.endswith(COMPRESSION_SUFFIXES[HistoryCompressions.LZMA]):
+        return lzma.open(path, mode, encoding=encoding)
+    return open(path, mode.replace('t', ''), encoding=encoding)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+__all__ = ['HistoryFilePool']
+
+import threading
+from collections import OrderedDict
+from typing import IO, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .file_sink import FileSink
+
+
+class HistoryFilePool:
+    """
+        Общий пул дескрипторов файлов истории для писателей потоков (FSM с stream_id).
+        Файловый приёмник (FileSink) писателя потока копит записи в памяти и отдаёт их пулу при сбросе;
+        пул дописывает их в файл приёмника через дескриптор из LRU и держит открытыми не больше capacity файлов:
+        при нехватке закрывается дескриптор, который дольше всех не использовался,
+        а файл открывается заново при следующем сбросе.
+        Все операции с дескрипторами идут под одной блокировкой, поэтому сбросы разных потоков
+        (в том числе из фоновых очередей) не перемешивают данные и не обращаются к закрытому дескриптору.
+    """
+
+    __slots__ = ('_capacity', '_handles', '_lock', '_evictions')
+
+    _shared: Optional[HistoryFilePool] = None
+
+    def __init__(self, capacity: int = 128) -> None:
+        """
+            Args:
+                capacity (int): Наибольшее число одновременно открытых файлов.
+        """
+        if capacity <= 0:
+            raise ValueError(f"[{self.__class__.__name__}] capacity must be > 0")
+        self._capacity: int = capacity
+        # Путь файла → открытый дескриптор, от давно использованных к недавним
+        self._handles: OrderedDict[str, IO] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._evictions: int = 0
+
+    @classmethod
+    def shared(cls) -> HistoryFilePool:
+        """ Пул процесса (создаётся при первом обращении). """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def open_files(self) -> int:
+        """ Число открытых сейчас файлов. """
+        return len(self._handles)
+
+    @property
+    def evictions(self) -> int:
+        """ Сколько дескрипторов закрыто из-за нехватки места (файл откроется заново при следующем сбросе). """
+        return self._evictions
+
+    def resize(self, capacity: int) -> None:
+        """ Меняет наибольшее число открытых файлов (лишние дескрипторы закрываются сразу). """
+        if capacity <= 0:
+            raise ValueError(f"[{self.__class__.__name__}] capacity must be > 0")
+        with self._lock:
+            self._capacity = capacity
+            self._evict(0)
+
+    def write(self, sink: FileSink, data: str | bytes) -> None:
+        """ Дописывает данные в файл приёмника и сбрасывает их на диск. """
+        path = sink.path
+        with self._lock:
+            handle = self._handles.get(path)
+            if handle is None:
+                self._evict(1)
+                handle = self._handles[path] = sink._open_pooled()
+            else:
+                self._handles.move_to_end(path)
+            handle.write(data)
+            handle.flush()
+
+    def release(self, path: str) -> None:
+        """ Закрывает дескриптор файла, если он открыт. """
+        with self._lock:
+            handle = self._handles.pop(path, None)
+            if handle is not None:
+                handle.close()
+
+    def close_all(self) -> None:
+        """ Закрывает все дескрипторы пула. """
+        with self._lock:
+            while self._handles:
+                self._handles.popitem(last=False)[1].close()
+
+    def _evict(self, reserve: int) -> None:
+        """ Закрывает давно не использованные дескрипторы, оставляя место для reserve новых (под блокировкой). """
+        while self._handles and len(self._handles) + reserve > self._capacity:
+            self._handles.popitem(last=False)[1].close()
+            self._evictions += 1
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} open={len(self._handles)}/{self._capacity}>"
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+__all__ = ['JsonlStableHistoryWriter']
+
+import json
+import time
+from typing import Any, Collection, Dict, Optional, TYPE_CHECKING
+
+from ..configs.history_writer_config import HistoryWriterConfig
+from ..core.profiles.profile import Profile
+from ..core.profiles.types import ProfileDict
+from ..core.states import State
+from .background_write_queue import BackgroundWriteQueue
+from .base_history_writer import BaseHistoryWriter
+from .runtime_delta import RuntimeDeltaTracker
+
+if TYPE_CHECKING:
+    from ..configs import FsmConfig
+
+
+class JsonlStableHistoryWriter(BaseHistoryWriter):
+    """
+        Писатель стабильной истории в формате JSON Lines: один компактный JSON-объект на событие.
+        Интерфейс совпадает со StableHistoryWriter, поэтому FSM выбирает формат только конфигурацией.
+        Каждая строка начинается с {"ts":<unix time>,"step":<step index>,"event":...}:
+            - state: смена текущего состояния — state, cls_id;
+            - action: действие — action, state, cls_id, profile, count;
+            - runtime: снимок профилей — keyframe, active_profile, profiles {имя: {counters, history}};
+              ключевой снимок (keyframe: true) полный, разностный содержит только изменения
+              (восстанавливается JsonlEventReader.runtime_snapshots());
+            - config: ссылка на конфигурацию FSM в ConfigCatalog — config_hash, catalog (один раз при создании);
+        Постоянные части строк событий (имена состояний, профилей и действий) кодируются в байты один раз
+        и кэшируются; на событие форматируются только время, номер кадра и счётчик.
+        Файл читается потоково через JsonlEventReader.
+    """
+
+    binary = True
+
+    def __init__(self, config: HistoryWriterConfig, queue: Optional[BackgroundWriteQueue] = None,
+                 stream: Optional[str] = None) -> None:
+        # Шаблоны: cls_id → хвост события state; (action, cls_id, profile) → хвост события action до count
+        self._state_templates: dict[int, bytes] = {}
+        self._action_templates: dict[tuple[str, int, str], bytes] = {}
+        self._runtime: RuntimeDeltaTracker = RuntimeDeltaTracker(config.runtime_keyframe_every)
+        super().__init__(config, '.jsonl', queue, stream)
+
+    def write_config_ref(self, config: FsmConfig) -> None:
+        """ Записывает ссылку на конфигурацию FSM в ConfigCatalog (сама конфигурация пишется в каталог один раз). """
+        config_hash, catalog_path = self._catalog_config(config)
+        self._emit_object({"event": "config", "config_hash": config_hash, "catalog": catalog_path})
+        self.flush()
+
+    def write_state(self, state: State) -> None:
+        """ Записывает событие смены состояния. """
+        template = self._state_templates.get(state.cls_id)
+        if template is None:
+            template = self._state_templates[state.cls_id] = (
+                b',"event":"state","state":' + self._encode(state.name)
+                + b',"cls_id":' + str(state.cls_id).encode() + b'}\n'
+            )
+        self._emit(self._prefix() + template)
+        if self._event_sinks:
+            self._emit_event("state", state)
+
+    def write_action(self, cur_state: State, count: int, action: str, profile: Profile) -> None:
+        """ Записывает событие действия. """
+        key = (action, cur_state.cls_id, profile.name)
+        template = self._action_templates.get(key)
+        if template is None:
+            template = self._action_templates[key] = (
+                b',"event":"action","action":' + self._encode(action)
+                + b',"state":' + self._encode(cur_state.name)
+                + b',"cls_id":' + str(cur_state.cls_id).encode()
+                + b',"profile":' + self._encode(str(profile.name))
+                + b',"count":'
+            )
+        self._emit(b'%s%s%d}\n' % (self._prefix(), template, count))
+        if self._event_sinks:
+            self._emit_event("action", cur_state, action, str(profile.name), count)
+
+    def write_runtime(
+            self,
+            profiles: ProfileDict,
+            active_profile: Profile,
+            touched: Optional[Collection[int]] = None
+    ) -> None:
+        """
+            Записывает снимок счётчиков и истории профилей (файл остаётся открытым): ключевой — всех профилей,
+            разностный — только изменившихся с предыдущего снимка (history отсутствует, если не изменилась).
+            touched — cls_id, зарегистрированные после предыдущего снимка (см. RuntimeDeltaTracker.next()).
+        """
+        keyframe, snapshot = self._runtime.next(profiles, touched)
+        self._emit_object({
+            "event": "runtime",
+            "keyframe": keyframe,
+            "active_profile": str(active_profile.name),
+            "profiles": {
+                name: {"counters": counters} if history is None else {"counters": counters, "history": history}
+                for name, (counters, history) in snapshot.items()
+            },
+        })
+
+    def _prefix(self) -> bytes:
+        """ Начало строки события: время и номер кадра. """
+        step = self._step_source() if self._step_source is not None else 0
+        return b'{"ts":%.3f,"step":%d' % (time.time(), step)
+
+    def _emit_object(self, obj: Dict[str, Any]) -> None:
+        body = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str).encode()
+        # Объект дописывается после общего префикса: {"ts":...,"step":... + ,"event":...}
+        self._emit(self._prefix() + b',' + body[1:] + b'\n')
+
+    @staticmethod
+    def _encode(value: str) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+__all__ = ['LogRetentionManager']
+
+import os
+import threading
+import time
+from typing import Optional
+
+
+class LogRetentionManager:
+    """
+        Общий на каталог логов менеджер хранения: удаляет файлы истории старше max_age_days
+        и самые старые файлы сверх max_total_bytes (лимиты задаются по суффиксу файла, например '.txt', '.yaml.gz').
+        Каталог сканируется только фоновым потоком: сразу после создания менеджера и затем раз в interval секунд.
+        Писатели лишь регистрируют свой файл и лимиты (O(1), без обращения к диску), поэтому создание FSM
+        не зависит от числа накопившихся логов. Между сканированиями менеджер держит индекс файлов в памяти.
+        Файлы, зарегистрированные писателями этого процесса, не удаляются.
+    """
+
+    __slots__ = ('_dir', '_interval', '_rules', '_index', '_active', '_lock', '_wake', '_thread', '__weakref__')
+
+    # Менеджеры по абсолютному пути каталога
+    _managers: dict[str, LogRetentionManager] = {}
+    _managers_lock = threading.Lock()
+
+    def __init__(self, dir_path: str, interval: float = 3600.0) -> None:
+        """
+            Args:
+                dir_path (str): Каталог логов.
+                interval (float): Период фоновой очистки, секунд.
+        """
+        self._dir: str = os.path.abspath(dir_path)
+        self._interval: float = interval
+        # Лимиты по суффиксу файла: (max_age_days, max_total_bytes; 0 — без лимита)
+        self._rules: dict[str, tuple[int, int]] = {}
+        # Индекс файлов каталога: путь → (ctime, размер)
+        self._index: dict[str, tuple[float, int]] = {}
+        self._active: set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+        self._wake: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def for_dir(cls, dir_path: str, interval: float = 3600.0) -> LogRetentionManager:
+        """ Возвращает менеджер каталога (создаёт при первом обращении; interval — наименьший из запрошенных). """
+        key = os.path.abspath(dir_path)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None:
+                manager = cls._managers[key] = cls(key, interval)
+            elif interval < manager._interval:
+                manager._interval = interval
+            return manager
+
+    @property
+    def dir_path(self) -> str:
+        return self._dir
+
+    @property
+    def files(self) -> dict[str, tuple[float, int]]:
+        """ Копия индекса файлов: путь → (ctime, размер). """
+        with self._lock:
+            return dict(self._index)
+
+    def register(self, path: str, suffix: str, max_age_days: int, max_total_bytes: int = 0) -> None:
+        """
+            Регистрирует файл писателя и лимиты для его суффикса (при повторной регистрации действует строгий лимит).
+            Новые или ужесточённые лимиты применяются фоновым потоком без ожидания периода.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self._active.add(path)
+            self._index.setdefault(path, (time.time(), 0))
+            rule = self._rules.get(suffix)
+            new_rule = (max_age_days, max_total_bytes)
+            if rule is not None:
+                limits = [limit for limit in (rule[1], max_total_bytes) if limit]
+                new_rule = (min(rule[0], max_age_days), min(limits) if limits else 0)
+            changed = new_rule != rule
+            self._rules[suffix] = new_rule
+        self._ensure_thread()
+        if changed:
+            self._wake.set()
+
+    def release(self, path: str) -> None:
+        """ Разрешает удалять файл по лимитам (писатель его больше не использует). """
+        with self._lock:
+            self._active.discard(os.path.abspath(path))
+
+    def run_cleanup(self, rescan: bool = True) -> list[str]:
+        """
+            Применяет лимиты к каталогу синхронно (обычно вызывается фоновым потоком).
+            Args:
+                rescan (bool): Обновить индекс сканированием каталога.
+            Returns:
+                list[str]: Удалённые файлы.
+        """
+        if rescan:
+            self._rescan()
+        with self._lock:
+            rules = dict(self._rules)
+            active = set(self._active)
+            candidates = {suffix: [] for suffix in rules}
+            for path, (ctime, size) in self._index.items():
+                # Для файла действует правило самого длинного совпавшего суффикса
+                suffix = max((s for s in rules if path.endswith(s)), key=len, default=None)
+                if suffix is not None:
+                    candidates[suffix].append((ctime, size, path))
+        removed = []
+        now = time.time()
+        for suffix, files in candidates.items():
+            max_age_days, max_total_bytes = rules[suffix]
+            files.sort()
+            cutoff = now - max_age_days * 86400
+            total = sum(size for _, size, _ in files)
+            for ctime, size, path in files:
+                if path in active:
+                    continue
+                if ctime < cutoff or (max_total_bytes and total > max_total_bytes):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        continue
+                    removed.append(path)
+                    total -= size
+        with self._lock:
+            for path in removed:
+                self._index.pop(path, None)
+        return removed
+
+    def stop(self) -> None:
+        """ Останавливает фоновый поток (следующая регистрация запустит его снова). """
+        thread = self._thread
+        self._thread = None
+        self._wake.set()
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join()
+
+    def _rescan(self) -> None:
+        """ Перестраивает индекс по каталогу (файлы, зарегистрированные после начала сканирования, сохраняются). """
+        index = {}
+        try:
+            with os.scandir(self._dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            index[entry.path] = (stat.st_ctime, stat.st_size)
+                    except OSError:
+                        pass
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            for path in self._active:
+                if path not in index and path in self._index and os.path.exists(path):
+                    index[path] = self._index[path]
+            self._index = index
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            # Поток присваивается до запуска: _run() работает, пока он остаётся текущим потоком менеджера
+            self._thread = threading.Thread(target=self._run, name='neuro_fsm-log-retention', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        thread = threading.current_thread()
+        while self._thread is thread:
+            self._wake.clear()
+            try:
+                self.run_cleanup()
+            except Exception:
+                # Ошибка очистки не должна останавливать поток
+                pass
+            self._wake.wait(self._interval)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} dir={self._dir!r} files={len(self._index)} rules={self._rules}>"
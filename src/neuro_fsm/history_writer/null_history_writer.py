@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+__all__ = ['NullHistoryWriter']
+
+from typing import Callable, Collection, Optional, TYPE_CHECKING
+
+from ..core.profiles.profile import Profile
+from ..core.profiles.types import ProfileDict
+from ..core.states import State
+from ..models.enums import FsmStepFlags
+from .sinks import BaseHistorySink
+
+if TYPE_CHECKING:
+    from ..configs import FsmConfig
+
+
+class NullHistoryWriter:
+    """
+        Писатель-заглушка для выключенной истории (enable=False или пустой sinks).
+        Реализует интерфейс сырого и стабильного писателей (в том числе асинхронных), но ничего не делает:
+        не создаёт каталог и файл, не держит буфер. FSM, получив его, пропускает и вызовы записи,
+        и подготовку их аргументов, так что выключенное логирование ничего не стоит на шаге.
+    """
+
+    __slots__ = ()
+
+    droppable: bool = True
+    binary: bool = False
+    background: bool = False
+    dropped: int = 0
+    path = None
+    sinks: tuple[BaseHistorySink, ...] = ()
+
+    def add_sink(self, sink: BaseHistorySink) -> None:
+        raise ValueError(f"[{self.__class__.__name__}] Cannot attach a sink to a disabled history writer")
+
+    def bind_step_source(self, step_source: Callable[[], int]) -> None:
+        pass
+
+    def write_frame(self, step_index: int, cls_id: int, confidence: float = float('nan')) -> None:
+        pass
+
+    def write_frames(self, step_index: int, cls_id: int, count: int, confidence: float = float('nan')) -> None:
+        pass
+
+    def write(self, record: str) -> None:
+        pass
+
+    def write_repeated(self, record: str, count: int) -> None:
+        pass
+
+    def write_config_ref(self, config: FsmConfig) -> None:
+        pass
+
+    def write_state(self, state: State) -> None:
+        pass
+
+    def write_action(self, cur_state: State, count: int, action: str, profile: Profile) -> None:
+        pass
+
+    def write_runtime(
+            self,
+            profiles: ProfileDict,
+            active_profile: Profile,
+            touched: Optional[Collection[int]] = None
+    ) -> None:
+        pass
+
+    def on_event(self, flags: FsmStepFlags) -> None:
+        pass
+
+    def open(self) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+    async def drain(self, force: bool = False) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}>"
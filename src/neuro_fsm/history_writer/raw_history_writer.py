@@ -1,13 +1,31 @@
 __all__ = ['RawHistoryWriter']
 
+from typing import Optional
+
 from ..configs.history_writer_config import HistoryWriterConfig
+from .background_write_queue import BackgroundWriteQueue
 from .base_history_writer import BaseHistoryWriter
 
 
 class RawHistoryWriter(BaseHistoryWriter):
-    def __init__(self, config: HistoryWriterConfig):
-        super().__init__(config, '.txt')
+    # Сырая история теряется первой при переполнении фоновой очереди (WriterOverflowPolicies.DROP_RAW)
+    droppable = True
+
+    def __init__(self, config: HistoryWriterConfig, queue: Optional[BackgroundWriteQueue] = None,
+                 stream: Optional[str] = None):
+        super().__init__(config, '.txt', queue, stream)
+
+    def write_frame(self, step_index: int, cls_id: int, confidence: float = float('nan')) -> None:
+        """ Записывает кадр step_index с классом cls_id (текстовый формат хранит только cls_id). """
+        self._emit(f"{cls_id} ")
+
+    def write_frames(self, step_index: int, cls_id: int, count: int) -> None:
+        """ Записывает count подряд идущих кадров cls_id, начиная с кадра step_index. """
+        self._emit(f"{cls_id} " * count, count)
 
     def write(self, record: str) -> None:
-        self._file.write(record + ' ')
-        self._file.flush()
+        self._emit(record + ' ')
+
+    def write_repeated(self, record: str, count: int) -> None:
+        """ Записывает одну и ту же запись count раз подряд одной операцией (как count вызовов write). """
+        self._emit((record + ' ') * count, count)
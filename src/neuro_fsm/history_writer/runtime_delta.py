@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+__all__ = ['RuntimeDeltaTracker', 'ProfileRuntime', 'apply_runtime_delta']
+
+from typing import Any, Collection, Optional, TypeAlias
+
+from ..core.profiles.types import ProfileDict
+
+# Снимок профиля в событии RUNTIME: (счётчики {имя состояния: count}, история или None — не изменилась)
+ProfileRuntime: TypeAlias = tuple[dict[str, int], Optional[list[str]]]
+
+
+class RuntimeDeltaTracker:
+    """
+        Разностное кодирование снимков RUNTIME писателя стабильной истории.
+        Каждый keyframe_every-й снимок (и первый) — ключевой: счётчики и история всех профилей.
+        Остальные содержат только изменившееся с предыдущего снимка: профили с изменениями, в них — изменившиеся
+        счётчики (исчезнувший счётчик приходит как 0) и историю, если она изменилась.
+        Для разностного снимка полные словари счётчиков не строятся: FSM передаёт cls_id, зарегистрированные
+        на шагах после предыдущего снимка (touched). Счётчик остальных состояний мог только обнулиться,
+        поэтому проверяются лишь touched и счётчики, ненулевые в предыдущем снимке; профиль без изменений
+        пропускается. Без touched счётчики профиля сравниваются полностью.
+        Полное состояние восстанавливается от ближайшего ключевого снимка через apply_runtime_delta().
+    """
+
+    __slots__ = ('_keyframe_every', '_prev', '_count')
+
+    def __init__(self, keyframe_every: int = 16) -> None:
+        """
+            Args:
+                keyframe_every (int): Период ключевых снимков (1 — все снимки полные).
+        """
+        self._keyframe_every: int = keyframe_every
+        # Последний записанный снимок: имя профиля → (ненулевые счётчики {cls_id: count}, история)
+        self._prev: dict[str, tuple[dict[int, int], list[str]]] = {}
+        self._count: int = 0
+
+    @property
+    def count(self) -> int:
+        """ Число выданных снимков. """
+        return self._count
+
+    def next(
+            self,
+            profiles: ProfileDict,
+            touched: Optional[Collection[int]] = None
+    ) -> tuple[bool, dict[str, ProfileRuntime]]:
+        """
+            Готовит очередной снимок.
+            Args:
+                profiles (ProfileDict): Профили FSM.
+                touched (Optional[Collection[int]]): cls_id, зарегистрированные после предыдущего снимка
+                                                     (None — неизвестно, счётчики сравниваются полностью).
+            Returns:
+                tuple[bool, dict[str, ProfileRuntime]]: Ключевой ли снимок и данные профилей
+                                                        (в разностном — только изменившиеся профили).
+        """
+        keyframe = self._count % self._keyframe_every == 0
+        self._count += 1
+        prev = self._prev
+        out: dict[str, ProfileRuntime] = {}
+        for profile in profiles.values():
+            name = str(profile.name)
+            history = [state.name for state in profile.get_history()]
+            last = prev.get(name)
+            if keyframe or last is None:
+                counters = profile.get_counters()
+                prev[name] = ({state.cls_id: count for state, count in counters.items() if count}, history)
+                out[name] = ({state.name: count for state, count in counters.items()}, history)
+                continue
+            last_live, last_history = last
+            if touched is None:
+                live = {state.cls_id: count for state, count in profile.get_counters().items() if count}
+                candidates = live.keys() | last_live.keys()
+            else:
+                live = dict(last_live)
+                candidates = last_live.keys() | set(touched)
+            changed = {}
+            for cls_id in sorted(candidates):
+                value = profile.get_counter_by_cls_id(cls_id)
+                if last_live.get(cls_id, 0) != value:
+                    changed[profile.states[cls_id].name] = value
+                    if value:
+                        live[cls_id] = value
+                    else:
+                        live.pop(cls_id, None)
+            history_changed = history != last_history
+            prev[name] = (live, history)
+            if changed or history_changed:
+                out[name] = (changed, history if history_changed else None)
+        return keyframe, out
+
+    def reset(self) -> None:
+        """ Следующий снимок будет ключевым. """
+        self._prev.clear()
+        self._count = 0
+
+
+def apply_runtime_delta(
+        snapshot: Optional[dict[str, Any]],
+        active_profile: str,
+        profiles: dict[str, ProfileRuntime | dict[str, Any]],
+        keyframe: bool
+) -> dict[str, Any]:
+    """
+        Восстанавливает полный снимок RUNTIME по предыдущему полному снимку и очередному (ключевому или разностному).
+        Args:
+            snapshot: Предыдущий полный снимок (None — ещё не было ключевого).
+            active_profile: Активный профиль очередного снимка.
+            profiles: Профили очередного снимка: {имя: (counters, history)} или {имя: {"counters", "history"}}.
+            keyframe: Ключевой ли снимок.
+        Returns:
+            dict: {"active_profile": str, "profiles": {имя: {"counters": dict, "history": list}}};
+                  counters содержат только ненулевые счётчики (одинаково для плотных и разреженных счётчиков).
+    """
+    base = {} if keyframe or snapshot is None else snapshot["profiles"]
+    result = {name: {"counters": dict(data["counters"]), "history": list(data["history"])}
+              for name, data in base.items()}
+    for name, data in profiles.items():
+        counters, history = (data["counters"], data.get("history")) if isinstance(data, dict) else data
+        entry = result.setdefault(name, {"counters": {}, "history": []})
+        if keyframe:
+            entry["counters"] = {key: value for key, value in counters.items() if value}
+        else:
+            for key, value in counters.items():
+                if value:
+                    entry["counters"][key] = value
+                else:
+                    entry["counters"].pop(key, None)
+        if history is not None:
+            entry["history"] = list(history)
+    return {"active_profile": active_profile, "profiles": result}
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+__all__ = ['BaseHistorySink', 'MemoryRingSink', 'SqliteEventSink']
+
+from collections import deque
+from typing import Iterator, Optional
+
+from .sqlite_event_store import SqliteEventStore
+
+
+class BaseHistorySink:
+    """
+        Приёмник готовых записей писателя истории (подключается к писателю через add_sink()).
+        Получает ровно то, что писатель записал бы в файл: str для текстовых форматов, bytes — для двоичных.
+        Приёмник с structured = True получает события стабильной истории ещё и по полям (write_event) —
+        писатель собирает их, только если такой приёмник подключён.
+        Методы вызываются в потоке, который делает шаг FSM; реализация по умолчанию ничего не делает.
+    """
+
+    __slots__ = ()
+
+    # Принимает ли приёмник события по полям (write_event)
+    structured: bool = False
+
+    def open(self) -> None:
+        """ Готовит приёмник к записи (вызывается при создании писателя и из его open()). """
+
+    def write(self, data: str | bytes, records: int = 1) -> None:
+        """ Принимает готовую запись (records — сколько кадров/событий она содержит). """
+
+    def write_event(
+            self,
+            ts: float,
+            step: int,
+            event: str,
+            state: str,
+            cls_id: int,
+            action: Optional[str] = None,
+            profile: Optional[str] = None,
+            count: Optional[int] = None
+    ) -> None:
+        """ Принимает событие стабильной истории (state — смена состояния, action — действие профиля). """
+
+    def flush(self) -> None:
+        """ Сбрасывает накопленное (по политике писателя или событию шага FSM). """
+
+    def close(self) -> None:
+        """ Закрывает приёмник. """
+
+
+class MemoryRingSink(BaseHistorySink):
+    """
+        Кольцевой буфер последних записей в памяти: для отладки, тестов и выдачи свежей истории без файлов.
+        Хранит не больше capacity записей; старые вытесняются.
+    """
+
+    __slots__ = ('_records', )
+
+    def __init__(self, capacity: int = 10000) -> None:
+        self._records: deque = deque(maxlen=capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self._records.maxlen
+
+    @property
+    def records(self) -> list[str | bytes]:
+        """ Копия буфера: записи от старых к новым. """
+        return list(self._records)
+
+    def write(self, data: str | bytes, records: int = 1) -> None:
+        self._records.append(data)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def __iter__(self) -> Iterator[str | bytes]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} size={len(self._records)}/{self._records.maxlen}>"
+
+
+class SqliteEventSink(BaseHistorySink):
+    """
+        Приёмник событий стабильной истории в базу SQLite: строка таблицы events на событие
+        (ts, stream, step, event, action, state, cls_id, profile, count).
+        Строки отдаются общему на файл базы SqliteEventStore, который пишет их пачками в фоновом потоке,
+        поэтому события всех потоков (FSM) процесса лежат в одной базе и выбираются запросом (SqliteEventReader).
+        Текстовые записи писателя приёмник не принимает.
+    """
+
+    __slots__ = ('_store', '_stream')
+
+    structured = True
+
+    def __init__(self, store: SqliteEventStore, stream: Optional[str] = None) -> None:
+        """
+            Args:
+                store (SqliteEventStore): Хранилище базы.
+                stream (Optional[str]): Id потока (FSM), пишется в колонку stream.
+        """
+        self._store: SqliteEventStore = store
+        self._stream: Optional[str] = stream
+
+    @property
+    def store(self) -> SqliteEventStore:
+        return self._store
+
+    def write_event(
+            self,
+            ts: float,
+            step: int,
+            event: str,
+            state: str,
+            cls_id: int,
+            action: Optional[str] = None,
+            profile: Optional[str] = None,
+            count: Optional[int] = None
+    ) -> None:
+        self._store.put((ts, self._stream, step, event, action, state, cls_id, profile, count))
+
+    def flush(self) -> None:
+        """ Сброс писателя пачку не дробит: строки пишутся по sqlite_batch_size и не позже flush_interval. """
+
+    def close(self) -> None:
+        """ Ждёт записи накопленных строк в базу (хранилище остаётся открытым для других приёмников). """
+        self._store.join()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} stream={self._stream!r} store={self._store!r}>"
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+__all__ = ['SqliteEventStore', 'SQLITE_EVENT_COLUMNS', 'stop_all_stores']
+
+import atexit
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Optional
+
+# Колонки таблицы events в порядке строк, которые кладут приёмники (id назначает SQLite)
+SQLITE_EVENT_COLUMNS: tuple[str, ...] = (
+    "ts", "stream", "step", "event", "action", "state", "cls_id", "profile", "count",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    stream TEXT,
+    step INTEGER,
+    event TEXT NOT NULL,
+    action TEXT,
+    state TEXT,
+    cls_id INTEGER,
+    profile TEXT,
+    count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_events_stream_ts_action ON events (stream, ts, action);
+CREATE INDEX IF NOT EXISTS idx_events_action_ts ON events (action, ts);
+"""
+# Один текст запроса на все пачки: sqlite3 компилирует его один раз и берёт из кэша подготовленных запросов
+_INSERT = (f"INSERT INTO events ({', '.join(SQLITE_EVENT_COLUMNS)}) "
+           f"VALUES ({', '.join('?' * len(SQLITE_EVENT_COLUMNS))})")
+
+# Живые хранилища: при завершении интерпретатора они дописываются до конца
+_STORES: 'weakref.WeakSet[SqliteEventStore]' = weakref.WeakSet()
+
+
+class SqliteEventStore:
+    """
+        Общее на файл базы хранилище событий стабильной истории в SQLite (stdlib sqlite3).
+        Приёмники всех FSM процесса (SqliteEventSink) кладут готовые строки в память под короткой блокировкой;
+        один поток-демон хранилища пишет их пачками: одна транзакция и один executemany
+        по заранее подготовленному INSERT на пачку. Пачка уходит, когда набралось batch_size строк,
+        прошло interval секунд или запрошен сброс (flush / join).
+        База в режиме WAL (synchronous=NORMAL): запись не блокирует читателей, а коммит не ждёт fsync на каждую пачку.
+        Индексы: (stream, ts, action) — выборки по потоку и времени, (action, ts) — по действию во всех потоках.
+        Соединение создаётся потоком хранилища и используется только им. Ошибка записи пачки не останавливает
+        поток; строки пачки учитываются в dropped.
+    """
+
+    __slots__ = ('_path', '_batch_size', '_interval', '_rows', '_cond', '_thread', '_busy', '_flush', '_stopping',
+                 '_written', '_dropped', '__weakref__')
+
+    # Хранилища по абсолютному пути базы
+    _stores: dict[str, SqliteEventStore] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path: str, batch_size: int = 1000, interval: float = 1.0) -> None:
+        """
+            Args:
+                path (str): Путь к файлу базы (каталог создаётся при необходимости).
+                batch_size (int): Строк в пачке, после которых поток пишет её не дожидаясь interval.
+                interval (float): Наибольшая задержка записи строки, секунд (0 — только по batch_size и сбросу).
+        """
+        self._path: str = os.path.abspath(path)
+        self._batch_size: int = batch_size
+        self._interval: Optional[float] = interval or None
+        self._rows: list[tuple] = []
+        self._cond: threading.Condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._busy: bool = False
+        self._flush: bool = False
+        self._stopping: bool = False
+        self._written: int = 0
+        self._dropped: int = 0
+        _STORES.add(self)
+
+    @classmethod
+    def for_path(cls, path: str, batch_size: int = 1000, interval: float = 1.0) -> SqliteEventStore:
+        """ Возвращает хранилище базы (создаёт при первом обращении; параметры берутся из первого запроса). """
+        key = os.path.abspath(path)
+        with cls._stores_lock:
+            store = cls._stores.get(key)
+            if store is None:
+                store = cls._stores[key] = cls(key, batch_size, interval)
+            return store
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def written(self) -> int:
+        """ Число записанных в базу строк. """
+        return self._written
+
+    @property
+    def dropped(self) -> int:
+        """ Число строк, потерянных из-за ошибок записи. """
+        return self._dropped
+
+    def put(self, row: tuple) -> None:
+        """ Добавляет строку (значения по SQLITE_EVENT_COLUMNS); поток будится, только когда набралась пачка. """
+        with self._cond:
+            self._rows.append(row)
+            if self._thread is None:
+                self._start()
+            elif len(self._rows) >= self._batch_size:
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """ Просит поток записать накопленное, не дожидаясь пачки (не ждёт записи). """
+        with self._cond:
+            if self._rows:
+                self._flush = True
+                self._cond.notify_all()
+
+    def join(self) -> None:
+        """ Ждёт, пока всё накопленное будет записано в базу. """
+        with self._cond:
+            self._flush = True
+            self._cond.notify_all()
+            while (self._rows or self._busy) and self._thread is not None and self._thread.is_alive():
+                self._cond.wait()
+
+    def stop(self) -> None:
+        """ Дописывает накопленное и останавливает поток (следующая строка запустит его снова). """
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join()
+        with self._cond:
+            self._thread = None
+            self._stopping = False
+
+    def _start(self) -> None:
+        """ Запускает поток хранилища (под блокировкой). """
+        self._thread = threading.Thread(target=self._run, name='neuro_fsm-sqlite-events', daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """ Открывает базу и создаёт схему; при ошибке накопленные строки теряются, а поток завершается. """
+        connection = None
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            connection = sqlite3.connect(self._path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            return connection
+        except (OSError, sqlite3.Error):
+            if connection is not None:
+                connection.close()
+            with self._cond:
+                # Следующая строка запустит поток заново (повторная попытка открыть базу)
+                self._dropped += len(self._rows)
+                self._rows = []
+                self._thread = None
+                self._cond.notify_all()
+            return None
+
+    def _run(self) -> None:
+        connection = self._connect()
+        if connection is None:
+            return
+        try:
+            while True:
+                with self._cond:
+                    if not (self._stopping or self._flush or len(self._rows) >= self._batch_size):
+                        self._cond.wait(self._interval)
+                    batch, self._rows = self._rows, []
+                    self._flush = False
+                    self._busy = bool(batch)
+                    stopping = self._stopping
+                if batch:
+                    try:
+                        with connection:
+                            connection.executemany(_INSERT, batch)
+                        self._written += len(batch)
+                    except sqlite3.Error:
+                        # Ошибка базы не должна останавливать запись следующих пачек
+                        self._dropped += len(batch)
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+                if stopping:
+                    with self._cond:
+                        if not self._rows:
+                            return
+        finally:
+            connection.close()
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} path={self._path!r} pending={len(self._rows)} "
+                f"written={self._written} dropped={self._dropped}>")
+
+
+@atexit.register
+def stop_all_stores() -> None:
+    """ Дописывает и останавливает все живые хранилища (используется при завершении интерпретатора). """
+    for store in list(_STORES):
+        store.stop()
@@ -1,2 +1,5 @@
-from .enums import ProfileNames, ProfileSwitcherStrategies
+from .enums import ProfileNames, ProfileSwitcherStrategies, FsmStepFlags, CountersModes, HistoryLengthUnits, \
+    WriterOverflowPolicies, HistoryFormats, HistorySinks, HistoryCompressions
 from .result import FsmResult
+from .batch_result import FsmBatchResult
+from .pool_result import FsmPoolResult
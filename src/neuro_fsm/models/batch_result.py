@@ -0,0 +1,98 @@
+__all__ = ['FsmBatchResult']
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from .enums import FsmStepFlags
+
+
+@dataclass(frozen=True, slots=True)
+class FsmBatchResult:
+    """
+        Результат обработки пачки кадров машиной состояний (`Fsm.process_batch`).
+        Колоночное представление вместо N экземпляров FsmResult: по одному элементу
+        компактного массива на кадр, без словарей счётчиков и копий истории.
+        Args:
+            profiles (tuple[str, ...]):
+                Имена профилей; индекс в кортеже — значение колонки profile_idx.
+            cls_ids (array):
+                Входные cls_id по кадрам (array('l')).
+            flags (array):
+                Битовые флаги FsmStepFlags по кадрам (array('B')).
+            profile_idx (array):
+                Индекс активного профиля ПОСЛЕ обработки кадра (array('H')).
+            stage_done_positions (tuple[int, ...]):
+                Позиции кадров внутри пачки, на которых завершилась ожидаемая последовательность.
+            first_step_index (int):
+                step_index первого кадра пачки.
+        Замечания:
+            - Счётчики и история на момент конца пачки доступны через Fsm.result.
+            - Для NumPy используйте to_numpy(): массивы создаются без копирования буферов.
+    """
+    profiles: tuple[str, ...]
+    cls_ids: array
+    flags: array
+    profile_idx: array
+    stage_done_positions: tuple[int, ...]
+    first_step_index: int
+
+    @property
+    def stage_done(self) -> bool:
+        """ True, если хотя бы на одном кадре пачки завершилась ожидаемая последовательность. """
+        return bool(self.stage_done_positions)
+
+    @property
+    def last_step_index(self) -> int:
+        """ step_index последнего кадра пачки. """
+        return self.first_step_index + len(self.cls_ids) - 1
+
+    def active_profile(self, pos: int = -1) -> Optional[str]:
+        """ Имя активного профиля после кадра pos (по умолчанию — последнего). """
+        if not self.profile_idx:
+            return None
+        return self.profiles[self.profile_idx[pos]]
+
+    def has_flag(self, pos: int, flag: FsmStepFlags) -> bool:
+        """ Проверяет, выставлен ли флаг на кадре pos. """
+        return bool(self.flags[pos] & flag)
+
+    def positions(self, flag: FsmStepFlags) -> tuple[int, ...]:
+        """ Возвращает позиции кадров, на которых выставлен флаг. """
+        return tuple(i for i, f in enumerate(self.flags) if f & flag)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """
+            Возвращает колонки как массивы NumPy, разделяющие память с исходными array.
+            Зависимость numpy опциональна, проверяется лениво.
+        """
+        try:
+            import numpy as np  # noqa: WPS433
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError("FsmBatchResult.to_numpy requires 'numpy' to be installed.") from exc
+
+        return {
+            "cls_ids": np.frombuffer(self.cls_ids, dtype=np.dtype(f"i{self.cls_ids.itemsize}")),
+            "flags": np.frombuffer(self.flags, dtype=np.uint8),
+            "profile_idx": np.frombuffer(self.profile_idx, dtype=np.uint16),
+            "step_index": np.arange(self.first_step_index, self.first_step_index + len(self.cls_ids)),
+        }
+
+    @classmethod
+    def create_empty(cls, profiles: tuple[str, ...] = (), first_step_index: int = 0) -> 'FsmBatchResult':
+        """ Создаёт пустой результат (пустая пачка или выключенная fsm). """
+        return cls(
+            profiles=profiles,
+            cls_ids=array('l'),
+            flags=array('B'),
+            profile_idx=array('H'),
+            stage_done_positions=(),
+            first_step_index=first_step_index,
+        )
+
+    def __len__(self) -> int:
+        return len(self.cls_ids)
+
+    def __iter__(self) -> Iterator[tuple[int, int, int]]:
+        """ Итерирует по кадрам: (cls_id, flags, profile_idx). """
+        return zip(self.cls_ids, self.flags, self.profile_idx)
@@ -1,6 +1,7 @@
-__all__ = ['ProfileSwitcherStrategies', 'ProfileNames']
+__all__ = ['ProfileSwitcherStrategies', 'ProfileNames', 'FsmStepFlags', 'CountersModes', 'HistoryLengthUnits',
+           'WriterOverflowPolicies', 'HistoryFormats', 'HistorySinks', 'HistoryCompressions']
 
-from enum import Enum, auto
+from enum import Enum, IntFlag, auto
 
 
 class ProfileSwitcherStrategies(Enum):
@@ -21,3 +22,55 @@ class ProfileNames(str, Enum):
     @classmethod
     def has(cls, name: str) -> bool:
         return name in cls._value2member_map_
+
+
+class FsmStepFlags(IntFlag):
+    """ Битовые флаги шага машины состояний (колонка flags в FsmBatchResult). """
+    NONE = 0
+    RESETTER = 1               # Текущее состояние — reset-триггер
+    BREAKER = 2                # Текущее состояние — прерыватель
+    STABLE = 4                 # Достигнут порог стабильности текущего состояния
+    STAGE_DONE = 8             # Завершена ожидаемая последовательность
+    PROFILE_CHANGED = 16       # Во время шага переключился профиль
+
+
+class CountersModes(Enum):
+    """ Способ хранения счётчиков состояний в профилях. """
+    DENSE = auto()             # Плоский массив по всем состояниям конфигурации (по умолчанию)
+    SPARSE = auto()            # Только ненулевые счётчики — для больших словарей классов
+    AUTO = auto()              # SPARSE, если состояний не меньше порога (ProfileManager.SPARSE_COUNTERS_MIN_STATES)
+
+
+class HistoryLengthUnits(Enum):
+    """ Единицы границы длины сырой истории. """
+    FRAMES = auto()            # Кадры
+    RUNS = auto()              # Серии подряд идущих одинаковых cls_id
+
+
+class WriterOverflowPolicies(Enum):
+    """ Поведение фоновой очереди писателей истории при переполнении. """
+    BLOCK = auto()             # Ждать освобождения места (задержка шага растёт, записи не теряются)
+    DROP_OLDEST = auto()       # Вытеснять самую старую запись очереди
+    DROP_RAW = auto()          # Терять только записи сырой истории; событиям стабильной истории освобождать место
+    SAMPLE = auto()            # Прореживать входящие записи (каждая N-я вытесняет самую старую)
+
+
+class HistoryFormats(Enum):
+    """ Формат файла писателя истории. """
+    TEXT = auto()              # Текст: cls_id через пробел (сырая история) / YAML (стабильная история)
+    BINARY = auto()            # Сырая история: записи фиксированной ширины, читаются через np.memmap
+    JSONL = auto()             # Стабильная история: JSON Lines, один объект на событие
+
+
+class HistorySinks(Enum):
+    """ Приёмники записей писателя истории (в конфигурации можно указать несколько — запись уходит во все). """
+    FILE = auto()              # Файл в fsm_logs/
+    MEMORY = auto()            # Кольцевой буфер последних записей в памяти (MemoryRingSink)
+    SQLITE = auto()            # События стабильной истории в базе SQLite (SqliteEventSink)
+
+
+class HistoryCompressions(Enum):
+    """ Потоковое сжатие файла истории (stdlib). Файл — последовательность независимых блоков, по блоку на сброс. """
+    NONE = auto()              # Без сжатия
+    GZIP = auto()              # gzip (.gz): блок — отдельный gzip-member
+    LZMA = auto()              # xz (.xz): блок — отдельный xz-поток
@@ -0,0 +1,50 @@
+__all__ = ['FsmPoolResult']
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .enums import FsmStepFlags
+
+
+@dataclass(frozen=True, slots=True)
+class FsmPoolResult:
+    """
+        Результат одного такта пула машин состояний (`FsmPool.step`).
+        Колоночное представление: по одному элементу массива NumPy на поток (stream).
+        Args:
+            profiles (tuple[str, ...]):
+                Имена профилей; индекс в кортеже — значение колонки profile_idx.
+            cls_ids (numpy.ndarray):
+                Входные cls_id по потокам.
+            flags (numpy.ndarray):
+                Битовые флаги FsmStepFlags по потокам (uint8).
+            profile_idx (numpy.ndarray):
+                Индекс активного профиля ПОСЛЕ такта по потокам.
+            step_index (numpy.ndarray):
+                step_index такта по потокам.
+        Замечания:
+            - Полный FsmResult (счётчики, история) конкретного потока строится по запросу: FsmPool.result(stream).
+    """
+    profiles: tuple[str, ...]
+    cls_ids: Any
+    flags: Any
+    profile_idx: Any
+    step_index: Any
+
+    @property
+    def stage_done_streams(self) -> Any:
+        """ Индексы потоков, на которых в этом такте завершилась ожидаемая последовательность. """
+        return (self.flags & FsmStepFlags.STAGE_DONE).nonzero()[0]
+
+    def active_profile(self, stream: int) -> Optional[str]:
+        """ Имя активного профиля потока после такта. """
+        if not len(self.profile_idx):
+            return None
+        return self.profiles[int(self.profile_idx[stream])]
+
+    def has_flag(self, stream: int, flag: FsmStepFlags) -> bool:
+        """ Проверяет, выставлен ли флаг у потока. """
+        return bool(self.flags[stream] & flag)
+
+    def __len__(self) -> int:
+        return len(self.cls_ids)
@@ -1,12 +1,22 @@
-__all__ = ['FsmResult']
+__all__ = ['FsmResult', 'LazySnapshot']
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Callable, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..core.states import State
 
+
+class LazySnapshot:
+    """ Снимок, который FsmResult раскладывает в значение поля (materialize()) при первом чтении. """
+
+    __slots__ = ()
+
+    def materialize(self) -> Any:
+        raise NotImplementedError
+
+
 @dataclass(frozen=True, slots=True)
 class FsmResult:
     """
@@ -39,14 +49,21 @@ class FsmResult:
             counters (dict[State, int]):
                 Снимок счётчиков по состояниям на момент завершения шага.
                 Ключ — объект State (иммутабелен), значение — текущий счётчик.
+                Fsm передаёт сюда LazySnapshot счётчиков: словарь строится при первом чтении.
             history (StateTuple):
                 Снимок стабильной истории состояний (последовательность State).
+                Fsm передаёт неизменяемый кортеж: список строится при первом чтении.
+            timestamp (datetime):
+                Время шага. Fsm передаёт time.time(): datetime строится при первом чтении.
         Замечания:
             - Класс — неизменяемый (frozen=True): после публикации результата он
               не должен меняться.
             - Поля отражают факты шага, а не предоставляют доступ к профилям/менеджерам.
             - Поля state, counters, history содержат прямые объекты доменной модели, а не сериализованные структуры.
               Для сериализации используйте их метод as_dict() или конвертируйте вручную.
+            - Ленивые поля counters, history, timestamp материализуются при любом чтении — в том числе
+              через ==, repr, dataclasses.asdict/replace и pickle, — поэтому результат ведёт себя как обычный
+              dataclass с готовыми значениями и остаётся верным после следующих шагов FSM.
     """
     active_profile: str
     prev_profile: Optional[str]
@@ -93,3 +110,37 @@ class FsmResult:
             step_index=0,
             timestamp=datetime.now(),
         )
+
+
+class _LazyField:
+    """
+        Дескриптор поля FsmResult поверх его слота: значение типа lazy_type заменяется на build(значение)
+        при первом чтении. Запись (в __init__ dataclass) идёт в слот как есть.
+    """
+
+    __slots__ = ('_slot', '_lazy_type', '_build')
+
+    def __init__(self, slot: Any, lazy_type: type, build: Callable[[Any], Any]) -> None:
+        self._slot = slot
+        self._lazy_type: type = lazy_type
+        self._build: Callable[[Any], Any] = build
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        value = self._slot.__get__(obj, owner)
+        if isinstance(value, self._lazy_type):
+            value = self._build(value)
+            self._slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        self._slot.__set__(obj, value)
+
+    def __delete__(self, obj: Any) -> None:
+        self._slot.__delete__(obj)
+
+
+FsmResult.counters = _LazyField(FsmResult.__dict__['counters'], LazySnapshot, lambda snapshot: snapshot.materialize())
+FsmResult.history = _LazyField(FsmResult.__dict__['history'], tuple, list)
+FsmResult.timestamp = _LazyField(FsmResult.__dict__['timestamp'], float, datetime.fromtimestamp)
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _logs_in_tmp_path(tmp_path, monkeypatch):
+    """ Писатели истории создают fsm_logs/ в текущем каталоге: каждый тест пишет в свой временный каталог. """
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import random
+
+import pytest
+
+from neuro_fsm import FsmManager, AsyncFsm, BinaryRawHistoryReader, JsonlEventReader
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, result_snapshot, writers_config
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("flush", [{}, {"flush_records": 0, "flush_bytes": 4096, "flush_interval": 0}])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_async_fsm_matches_fsm(make_config, n_classes, pids, flush):
+    manager = FsmManager({**make_config(), **writers_config(raw={"enable": True, **flush},
+                                                           stable={"enable": True, **flush})})
+    reference = manager.create_fsm(stream_id="sync")
+    events = make_events(seed=4, n_classes=n_classes, pids=pids, length=1500)
+
+    async def run() -> tuple[AsyncFsm, list]:
+        results = []
+        async with manager.create_async_fsm(stream_id="async") as fsm:
+            for kind, payload in events:
+                if kind == "switch":
+                    fsm.switch_profile_by_pid(payload)
+                else:
+                    results.append(result_snapshot(await fsm.process_state(payload)))
+            batch = await fsm.process_batch([0, 0, 1])
+            results.append((len(batch), result_snapshot(fsm.result)))
+        return fsm, results
+
+    fsm, results = asyncio.run(run())
+    expected = []
+    for kind, payload in events:
+        if kind == "switch":
+            reference.switch_profile_by_pid(payload)
+        else:
+            expected.append(result_snapshot(reference.process_state(payload)))
+    batch = reference.process_batch([0, 0, 1])
+    expected.append((len(batch), result_snapshot(reference.result)))
+    reference.close()
+
+    assert isinstance(fsm, AsyncFsm) and results == expected
+    # После aclose() всё накопленное на диске: сырая история совпадает с синхронной FSM
+    assert _read(fsm._raw_history_writer.path) == _read(reference._raw_history_writer.path)
+    assert _read(fsm._stable_history_writer.path).count("\n") == _read(reference._stable_history_writer.path).count("\n")
+
+
+def test_sync_close_flushes_pending_records():
+    config = {**DIFFERENTIAL_CASES[0][0](), **writers_config(raw={"enable": True, "flush_records": 0,
+                                                                  "flush_interval": 0, "flush_on_events": []})}
+    fsm = FsmManager(config).create_async_fsm()
+
+    async def run() -> None:
+        for cls_id in (0, 0, 1):
+            await fsm.process_state(cls_id)
+
+    asyncio.run(run())
+    path = fsm._raw_history_writer.path
+    assert not os.path.exists(path) or _read(path) == ""
+    fsm.close()
+    assert _read(fsm._raw_history_writer.path).split() == ["0", "0", "1"]
+
+
+def test_async_process_scores_records_confidence():
+    config = {**DIFFERENTIAL_CASES[0][0](), "FLIGHT_RECORDER": {"enable": True, "triggers": []}}
+    rnd = random.Random(3)
+    scores = [[rnd.random() for _ in range(4)] for _ in range(200)]
+    reference = FsmManager(config).create_fsm()
+    expected = [reference.process_scores(row).state.cls_id for row in scores]
+    reference.dump_flight_recorder()
+    reference.close()
+
+    async def run() -> tuple[AsyncFsm, list]:
+        async with FsmManager(config).create_async_fsm() as fsm:
+            results = [(await fsm.process_scores(row)).state.cls_id for row in scores]
+            await asyncio.wrap_future(fsm.dump_flight_recorder())
+        return fsm, results
+
+    fsm, results = asyncio.run(run())
+    assert results == expected
+    confidence = BinaryRawHistoryReader(fsm.flight_recorder.path).records["confidence"].tolist()
+    assert confidence == BinaryRawHistoryReader(reference.flight_recorder.path).records["confidence"].tolist()
+    assert confidence == pytest.approx([max(row) for row in scores], rel=1e-6)
+
+
+@pytest.mark.parametrize("fields", [["confidence"], ["run_length", "confidence"]])
+def test_async_fsm_writes_configured_formats(fields):
+    raw = {"enable": True, "log_format": "binary", "fields": fields, "name": "{timestamp}_raw.bin"}
+    stable = {"enable": True, "log_format": "jsonl", "name": "{timestamp}_stable.jsonl"}
+    manager = FsmManager({**DIFFERENTIAL_CASES[0][0](), **writers_config(raw=raw, stable=stable)})
+    rnd = random.Random(5)
+    scores = [[rnd.random() for _ in range(4)] for _ in range(300)]
+    reference = manager.create_fsm(stream_id="sync")
+    for row in scores:
+        reference.process_scores(row)
+    reference.close()
+
+    async def run() -> AsyncFsm:
+        async with manager.create_async_fsm(stream_id="async") as fsm:
+            for row in scores:
+                await fsm.process_scores(row)
+        return fsm
+
+    fsm = asyncio.run(run())
+    records = BinaryRawHistoryReader(fsm._raw_history_writer.path).records
+    expected = BinaryRawHistoryReader(reference._raw_history_writer.path).records
+    assert records.dtype == expected.dtype and records.tolist() == expected.tolist()
+
+    def events(writer) -> list[dict]:
+        return [{k: v for k, v in event.items() if k != "ts"} for event in JsonlEventReader(writer.path)]
+
+    assert events(fsm._stable_history_writer) == events(reference._stable_history_writer)
+
+
+def test_async_fsm_rejects_unsupported_formats():
+    config = {**DIFFERENTIAL_CASES[0][0](), **writers_config(raw={"enable": True, "log_format": "jsonl"})}
+    with pytest.raises(ValueError):
+        FsmManager(config).create_async_fsm()
+
+
+def test_sync_close_writes_binary_header_and_held_run():
+    raw = {"enable": True, "log_format": "binary", "fields": ["run_length"], "name": "{timestamp}_raw.bin",
+           "flush_records": 0, "flush_interval": 0, "flush_on_events": []}
+    fsm = FsmManager({**DIFFERENTIAL_CASES[0][0](), **writers_config(raw=raw)}).create_async_fsm()
+
+    async def run() -> None:
+        for cls_id in (0, 0, 1, 1, 1):
+            await fsm.process_state(cls_id)
+
+    asyncio.run(run())
+    fsm.close()
+    records = BinaryRawHistoryReader(fsm._raw_history_writer.path).records
+    assert records[["step", "cls_id", "run_length"]].tolist() == [(1, 0, 2), (3, 1, 3)]
@@ -0,0 +1,126 @@
+import threading
+import time
+import warnings
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.configs import HistoryWriterConfig
+from neuro_fsm.history_writer import BackgroundWriteQueue
+from neuro_fsm.models.enums import WriterOverflowPolicies
+from tests.test_configs.differential_cfg import profiles_config, writers_config
+
+
+class _Writer:
+    """ Писатель для очереди: копит записанные строки; может ждать gate и падать на записи fail. """
+
+    def __init__(self, name: str, droppable: bool, gate: threading.Event, fail: str = "") -> None:
+        self.path, self.droppable, self._gate, self._fail = name, droppable, gate, fail
+        self._dropped = 0
+        self.written: list[str] = []
+
+    def _write(self, text: str, records: int) -> None:
+        self._gate.wait()
+        if text == self._fail:
+            raise OSError(f"disk full on {text}")
+        self.written.append(text)
+
+    def _flush(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+
+def _blocked_queue(policy: WriterOverflowPolicies, capacity: int = 3, **writers):
+    """ Очередь, поток которой занят первой записью до открытия gate. """
+    gate = threading.Event()
+    queue = BackgroundWriteQueue(capacity, policy, sample_every=2)
+    raw, stable = _Writer("raw", True, gate), _Writer("stable", False, gate)
+    queue.put(raw, "blocker")
+    deadline = time.monotonic() + 5
+    while len(queue) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return queue, gate, raw, stable
+
+
+def test_drop_raw_keeps_stable_records_and_reports_losses():
+    queue, gate, raw, stable = _blocked_queue(WriterOverflowPolicies.DROP_RAW)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for text in ("r1", "r2", "r3"):
+            queue.put(raw, text)
+        queue.put(stable, "s1")   # вытесняет самую старую сырую запись
+        queue.put(raw, "r4")      # сырая запись при полной очереди теряется
+        queue.put(stable, "s2")
+    gate.set()
+    queue.stop()
+
+    assert stable.written == ["s1", "s2"]
+    assert raw.written == ["blocker", "r3"]
+    assert raw._dropped == queue.dropped == 3 and stable._dropped == 0
+    assert len([w for w in caught if issubclass(w.category, RuntimeWarning)]) == 1
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("policy, expected", [
+    (WriterOverflowPolicies.DROP_OLDEST, ["blocker", "r3", "r4", "r5"]),
+    (WriterOverflowPolicies.SAMPLE, ["blocker", "r2", "r3", "r5"]),
+])
+def test_lossy_policies(policy, expected):
+    queue, gate, raw, _ = _blocked_queue(policy)
+    for i in range(1, 6):
+        queue.put(raw, f"r{i}")
+    gate.set()
+    queue.stop()
+    assert raw.written == expected
+    assert raw._dropped == queue.dropped == 5 - (len(expected) - 1)
+
+
+def test_block_policy_loses_nothing():
+    queue, gate, raw, stable = _blocked_queue(WriterOverflowPolicies.BLOCK, capacity=2)
+    threading.Timer(0.05, gate.set).start()
+    for i in range(50):
+        queue.put(raw if i % 3 else stable, f"x{i}")
+    queue.stop()
+    assert sorted(raw.written[1:] + stable.written, key=lambda t: int(t[1:])) == [f"x{i}" for i in range(50)]
+    assert queue.dropped == 0
+
+
+def test_write_errors_are_counted_and_raised_from_stop():
+    gate = threading.Event()
+    gate.set()
+    queue = BackgroundWriteQueue(10)
+    failing, other = _Writer("bad", True, gate, fail="boom"), _Writer("good", False, gate)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for text in ("a", "boom", "b"):
+            queue.put(failing, text)
+            queue.put(other, text)
+        with pytest.raises(OSError, match="boom"):
+            queue.stop()
+    assert failing.written == ["a", "b"] and failing._dropped == 1
+    assert other.written == ["a", "boom", "b"]
+    # Ошибка пробрасывается один раз
+    queue.stop()
+
+
+def test_conflicting_background_configs_are_rejected():
+    base = dict(name="x", fields=(), enable=True, background=True)
+    assert BackgroundWriteQueue.from_configs(HistoryWriterConfig(**{**base, "background": False})) is None
+    same = BackgroundWriteQueue.from_configs(HistoryWriterConfig(**base, queue_size=7),
+                                             HistoryWriterConfig(**base, queue_size=7))
+    assert same is not None and same._capacity == 7
+    with pytest.raises(ValueError):
+        BackgroundWriteQueue.from_configs(HistoryWriterConfig(**base, queue_size=7), HistoryWriterConfig(**base))
+    with pytest.raises(ValueError):
+        BackgroundWriteQueue.from_configs(
+            HistoryWriterConfig(**base), HistoryWriterConfig(**base, overflow_policy=WriterOverflowPolicies.DROP_RAW)
+        )
+
+    manager = FsmManager({**profiles_config(), **writers_config(
+        raw={"enable": True, "background": True, "queue_size": 5, "overflow_policy": "drop_raw"},
+        stable={"enable": True, "background": True},
+    )})
+    with pytest.raises(ValueError):
+        manager.create_fsm()
@@ -0,0 +1,76 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from neuro_fsm import FsmManager, BinaryRawHistoryReader
+from neuro_fsm.history_writer.binary_raw_format import binary_raw_columns, encode_binary_raw_header
+from tests.test_configs.differential_cfg import profiles_config, writers_config
+
+RNG = random.Random(3)
+RUNS = [(RNG.randrange(4), RNG.choice([1, 2, 5, 40])) for _ in range(300)]
+FRAMES = [cls_id for cls_id, count in RUNS for _ in range(count)]
+
+
+def _binary_fsm(fields=()):
+    raw = {"enable": True, "log_format": "binary", "fields": list(fields)}
+    return FsmManager({**profiles_config(), **writers_config(raw=raw)}).create_fsm()
+
+
+@pytest.mark.parametrize("mode", ["state", "batch", "run"])
+@pytest.mark.parametrize("fields", [(), ("timestamp", "confidence"), ("run_length",),
+                                    ("run_length", "confidence", "timestamp")])
+def test_binary_log_reads_back_frames(fields, mode):
+    fsm = _binary_fsm(fields)
+    if mode == "state":
+        for cls_id in FRAMES:
+            fsm.process_state(cls_id)
+    elif mode == "batch":
+        fsm.process_batch(FRAMES)
+    else:
+        for cls_id, count in RUNS:
+            fsm.process_run(cls_id, count)
+    fsm.close()
+
+    reader = BinaryRawHistoryReader(fsm._raw_history_writer.path)
+    assert set(fields) <= set(reader.fields)
+    assert reader.frames().tolist() == FRAMES
+    steps = reader.column("step")
+    if reader.has_runs:
+        lengths = reader.column("run_length")
+        assert steps[0] == 1 and (steps[1:] == steps[:-1] + lengths[:-1]).all() and lengths.sum() == len(FRAMES)
+    else:
+        assert steps.tolist() == list(range(1, len(FRAMES) + 1))
+    if "timestamp" in fields:
+        assert (np.diff(reader.column("timestamp")) >= 0).all()
+
+
+def test_binary_log_confidence_and_reload():
+    fsm = _binary_fsm(("confidence",))
+    fsm.process_scores([0.1, 0.7, 0.1, 0.1])
+    fsm.process_state(2)
+    fsm._raw_history_writer.flush()
+    reader = BinaryRawHistoryReader(fsm._raw_history_writer.path)
+    confidence = reader.column("confidence").tolist()
+    assert reader.column("cls_id").tolist() == [1, 2]
+    assert confidence[0] == pytest.approx(0.7) and math.isnan(confidence[1])
+
+    fsm.process_state(3)
+    fsm.close()
+    reader.reload()
+    assert reader.frames().tolist() == [1, 2, 3] and len(reader) == 3
+
+
+def test_append_with_other_columns_closes_the_handle():
+    fsm = _binary_fsm(["confidence"])
+    fsm.process_state(1)
+    fsm.close()
+    writer = fsm._raw_history_writer
+    with open(writer.path, "r+b") as file:
+        file.write(encode_binary_raw_header(binary_raw_columns(("run_length",))))
+    # Дескриптор, переданный для дописывания, закрывается до ValueError
+    handle = open(writer.path, "ab")
+    with pytest.raises(ValueError):
+        writer._on_open(handle)
+    assert handle.closed
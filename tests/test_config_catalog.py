@@ -0,0 +1,42 @@
+import json
+import os
+
+import pytest
+
+from neuro_fsm import FsmManager, JsonlEventReader
+from neuro_fsm.config_parser.parser_factory import ParserFactory
+from neuro_fsm.history_writer import ConfigCatalog
+from tests.test_configs.differential_cfg import profiles_config, random_config, writers_config
+
+
+def _config_ref(writer) -> tuple[str, str]:
+    """ (config_hash, catalog) из начала файла стабильной истории. """
+    if writer.path.endswith(".jsonl"):
+        event = next(iter(JsonlEventReader(writer.path)))
+        assert event["event"] == "config"
+        return event["config_hash"], event["catalog"]
+    with open(writer.path, encoding="utf-8") as file:
+        head = dict(line.strip().split(": ", 1) for line in file.read().split("\n\n")[0].splitlines()[1:])
+    return head["config_hash"], head["catalog"]
+
+
+@pytest.mark.parametrize("stable", [{"enable": True}, {"enable": True, "log_format": "jsonl",
+                                                       "name": "{timestamp}_stable.jsonl"}])
+def test_stable_logs_reference_one_catalog_entry_per_config(stable):
+    configs = [{**make_config(), **writers_config(stable=stable)} for make_config in (profiles_config, random_config)]
+    manager = FsmManager()
+    fsms = [manager.create_fsm(config) for config in configs for _ in range(5)]
+    manager.destroy()
+
+    log_dir = os.path.dirname(fsms[0]._stable_history_writer.path)
+    catalog = ConfigCatalog.for_dir(os.path.join(log_dir, "config_catalog"))
+    refs = [_config_ref(fsm._stable_history_writer) for fsm in fsms]
+    hashes = [config_hash for config_hash, _ in refs]
+    assert len(set(hashes[:5])) == len(set(hashes[5:])) == 1 and hashes[0] != hashes[5]
+    assert sorted(os.listdir(catalog.dir_path)) == sorted(f"{h}.json" for h in {hashes[0], hashes[5]})
+    for config_hash, catalog_path in refs:
+        assert os.path.join(log_dir, catalog_path) == catalog.path_of(config_hash)
+    for config, config_hash in zip(configs, (hashes[0], hashes[5])):
+        parsed = ParserFactory.parse(config)
+        assert parsed.config_hash == config_hash
+        assert catalog.load(config_hash) == json.loads(parsed.to_json())
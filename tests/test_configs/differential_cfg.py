@@ -0,0 +1,111 @@
+import random
+from typing import Optional
+
+from neuro_fsm.models import FsmStepFlags
+
+
+def writers_config(raw: Optional[dict] = None, stable: Optional[dict] = None) -> dict:
+    """ Секции писателей истории (по умолчанию выключены); raw/stable дополняют настройки писателя. """
+    return {
+        "RAW_HISTORY_WRITER": {"enable": False, "name": "{timestamp}_raw.txt", **(raw or {})},
+        "STABLE_HISTORY_WRITER": {"enable": False, "name": "{timestamp}_stable.yaml", **(stable or {})},
+    }
+
+
+def profiles_config() -> dict:
+    """ Три профиля над четырьмя состояниями, переключение по pid (101 — group1, 201 — group2). """
+    return {
+        "ENABLE": True,
+        "STATES": [
+            {"cls_id": 0, "name": "EMPTY", "stable_min_lim": 25, "resettable": True, "reset_trigger": True},
+            {"cls_id": 1, "name": "FULL", "stable_min_lim": 50, "resettable": False, "reset_trigger": True},
+            {"cls_id": 2, "name": "NO_LIBRA", "stable_min_lim": 10, "resettable": True, "reset_trigger": True,
+             "break_trigger": True},
+            {"cls_id": 3, "name": "UNKNOWN", "stable_min_lim": -1, "resettable": True},
+        ],
+        "STATE_PROFILES": [
+            {"name": "group1", "expected_sequences": (("EMPTY", "FULL", "EMPTY"),),
+             "states": {"EMPTY": {"stable_min_lim": 5}, "FULL": {"stable_min_lim": 10}},
+             "init_states": 0, "default_states": "UNKNOWN"},
+            {"name": "group2", "expected_sequences": (("EMPTY", "FULL", "EMPTY"), ("EMPTY", "NO_LIBRA", "FULL")),
+             "states": {"EMPTY": {"stable_min_lim": 3}, "FULL": {"stable_min_lim": 6}},
+             "init_states": ["EMPTY"], "default_states": ["UNKNOWN"]},
+            {"name": "default", "expected_sequences": (("EMPTY", "FULL", "EMPTY"),),
+             "states": {"EMPTY": {"stable_min_lim": 4, "resettable": False}, "FULL": {"stable_min_lim": 8}},
+             "init_states": 0, "default_states": "UNKNOWN"},
+        ],
+        "PROFILE_SWITCHER_STRATEGY": "BY_MAPPED_ID",
+        "DEFAULT_PROFILE": "default",
+        "PROFILE_IDS_MAP": {"group1": [101], "group2": [201], "default": []},
+        **writers_config(),
+    }
+
+
+def random_config(seed: int = 9, n_states: int = 8) -> dict:
+    """ Случайные пороги, флаги сброса и ожидаемые последовательности над n_states состояниями. """
+    rnd = random.Random(seed)
+    states = [
+        {"cls_id": i, "name": f"S{i}", "stable_min_lim": rnd.choice([-1, 1, 2, 3, 4, 6]),
+         "resettable": rnd.random() < 0.6, "reset_trigger": rnd.random() < 0.3,
+         "break_trigger": rnd.random() < 0.2, "threshold": round(rnd.random(), 2)}
+        for i in range(n_states)
+    ]
+    seqs = [tuple(f"S{rnd.randrange(n_states)}" for _ in range(rnd.randint(2, 5))) for _ in range(6)]
+    return {
+        "ENABLE": True,
+        "STATES": states,
+        "STATE_PROFILES": [
+            {"name": "p1", "expected_sequences": tuple(seqs[:3]), "states": {"S1": {"stable_min_lim": 2}},
+             "init_states": 0, "default_states": 1},
+            {"name": "p2", "expected_sequences": tuple(seqs[3:]), "states": {"S2": {"reset_trigger": True}},
+             "init_states": [0, 3], "default_states": 1},
+        ],
+        "PROFILE_SWITCHER_STRATEGY": "BY_MAPPED_ID",
+        "DEFAULT_PROFILE": "p1",
+        "PROFILE_IDS_MAP": {"p2": [2], "p1": []},
+        **writers_config(),
+    }
+
+
+# (фабрика конфигурации, число классов, pid для переключения профилей)
+DIFFERENTIAL_CASES = (
+    (profiles_config, 4, (None, 101, 201)),
+    (random_config, 8, (None, 2)),
+)
+
+
+def make_events(seed: int, n_classes: int, pids: tuple, length: int = 3000) -> list[tuple[str, Optional[int]]]:
+    """
+        Случайный поток кадров с сериями одного класса и редкими ручными сменами профиля:
+        ("cls", cls_id) — кадр, ("switch", pid) — Fsm.switch_profile_by_pid перед следующим кадром.
+    """
+    rnd = random.Random(seed)
+    events: list[tuple[str, Optional[int]]] = []
+    cur = rnd.randrange(n_classes)
+    for _ in range(length):
+        if rnd.random() < 0.15:
+            cur = rnd.randrange(n_classes)
+        if rnd.random() < 0.003:
+            events.append(("switch", rnd.choice(pids)))
+        events.append(("cls", cur))
+    return events
+
+
+def result_flags(result) -> int:
+    """ Флаги FsmStepFlags результата FsmResult (как в колонке flags пакетных результатов). """
+    flags = FsmStepFlags.NONE
+    for name, flag in (("resetter", FsmStepFlags.RESETTER), ("breaker", FsmStepFlags.BREAKER),
+                       ("stable", FsmStepFlags.STABLE), ("stage_done", FsmStepFlags.STAGE_DONE),
+                       ("profile_changed", FsmStepFlags.PROFILE_CHANGED)):
+        if getattr(result, name):
+            flags |= flag
+    return int(flags)
+
+
+def result_snapshot(result) -> tuple:
+    """ Сравнимый снимок FsmResult: профиль, состояние, флаги, счётчики по cls_id, история, step_index. """
+    return (
+        result.active_profile, result.prev_profile, result.state.cls_id, result_flags(result),
+        sorted((state.cls_id, count) for state, count in result.counters.items() if count),
+        [state.cls_id for state in result.history], result.step_index,
+    )
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from neuro_fsm import BinaryRawHistoryReader, FsmManager, FsmStepFlags
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, result_flags
+
+_LEVEL = int(FsmStepFlags.RESETTER | FsmStepFlags.BREAKER | FsmStepFlags.STABLE)
+
+
+def _recorder_fsm(make_config, **recorder):
+    return FsmManager({**make_config(), "FLIGHT_RECORDER": {"enable": True, **recorder}}).create_fsm()
+
+
+def _reference(make_config, events) -> dict[int, tuple[int, int]]:
+    """ step_index → (cls_id, флаги) по process_state без самописца. """
+    fsm = FsmManager(make_config()).create_fsm()
+    reference = {}
+    for kind, payload in events:
+        if kind == "switch":
+            fsm.switch_profile_by_pid(payload)
+        else:
+            result = fsm.process_state(payload)
+            reference[result.step_index] = (payload, result_flags(result))
+    return reference
+
+
+def _frames(path) -> tuple:
+    """ Записи файла самописца, развёрнутые по кадрам: (step, cls_id, flags). """
+    records = BinaryRawHistoryReader(path).records
+    runs = records["run_length"].astype(np.int64)
+    offsets = np.concatenate([np.arange(run) for run in runs.tolist()])
+    return (np.repeat(records["step"], runs) + offsets, np.repeat(records["cls_id"], runs),
+            np.repeat(records["flags"], runs))
+
+
+@pytest.mark.parametrize("mode", ["state", "batch"])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_recorded_frames_match_process_state(make_config, n_classes, pids, mode):
+    events = make_events(seed=4, n_classes=n_classes, pids=pids, length=3000)
+    reference = _reference(make_config, events)
+    fsm = _recorder_fsm(make_config, capacity=len(events))
+    if mode == "state":
+        for kind, payload in events:
+            fsm.switch_profile_by_pid(payload) if kind == "switch" else fsm.process_state(payload)
+    else:
+        # Пачки между ручными сменами профиля (серии тихих кадров пишутся одной записью)
+        batch = []
+        for kind, payload in events + [("switch", None)]:
+            if kind == "cls":
+                batch.append(payload)
+                continue
+            if batch:
+                fsm.process_batch(batch)
+            batch = []
+            fsm.switch_profile_by_pid(payload)
+    fsm.dump_flight_recorder()
+    fsm.close()
+
+    steps, cls_ids, flags = _frames(fsm.flight_recorder.path)
+    # Сбросы по триггерам и финальный ручной сброс вместе покрывают все кадры ровно один раз
+    assert steps.tolist() == sorted(reference)
+    assert list(zip(cls_ids.tolist(), flags.tolist())) == [reference[step] for step in sorted(reference)]
+    if mode == "batch":
+        assert len(BinaryRawHistoryReader(fsm.flight_recorder.path)) < len(steps)
+
+
+@pytest.mark.parametrize("capacity", [7, 64])
+def test_triggers_dump_preceding_frames_once_per_edge(capacity):
+    make_config, n_classes, pids = DIFFERENTIAL_CASES[0]
+    events = make_events(seed=12, n_classes=n_classes, pids=pids, length=3000)
+    reference = _reference(make_config, events)
+    triggers = int(FsmStepFlags.BREAKER | FsmStepFlags.STAGE_DONE | FsmStepFlags.PROFILE_CHANGED)
+    fsm = _recorder_fsm(make_config, capacity=capacity, triggers=["breaker", "stage_done", "profile_changed"])
+    for kind, payload in events:
+        fsm.switch_profile_by_pid(payload) if kind == "switch" else fsm.process_state(payload)
+    fsm.close()
+
+    # Состояния срабатывают по фронту, события — на каждом шаге
+    edges, last = [], 0
+    for step in sorted(reference):
+        flags = reference[step][1]
+        if flags & triggers & ~(last & _LEVEL):
+            edges.append(step)
+        last = flags
+    assert edges and fsm.flight_recorder.dumps == len(edges)
+
+    steps, cls_ids, flags = _frames(fsm.flight_recorder.path)
+    # Сброс — кадры с прошлого сброса по кадр-триггер включительно, но не больше capacity последних
+    expected, prev = [], 0
+    for step in edges:
+        expected.extend(range(max(prev, step - capacity) + 1, step + 1))
+        prev = step
+    assert steps.tolist() == expected
+    assert list(zip(cls_ids.tolist(), flags.tolist())) == [reference[step] for step in expected]
+
+
+def test_manual_dump_without_new_frames_returns_previous_future():
+    fsm = _recorder_fsm(DIFFERENTIAL_CASES[0][0], capacity=16, triggers=[])
+    assert fsm.dump_flight_recorder() is None
+    fsm.process_state(1)
+    future = fsm.dump_flight_recorder()
+    future.result()
+    assert fsm.dump_flight_recorder() is future
+    assert len(BinaryRawHistoryReader(fsm.flight_recorder.path)) == 1
+    fsm.close()
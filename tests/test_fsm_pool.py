@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+import pytest
+
+from neuro_fsm import FsmManager
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, result_flags, result_snapshot
+
+N_STREAMS = 8
+
+
+@pytest.mark.parametrize("seed", range(2))
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_pool_matches_independent_fsms(make_config, n_classes, pids, seed):
+    manager = FsmManager(make_config())
+    fsms = [manager.create_fsm() for _ in range(N_STREAMS)]
+    pool = manager.create_pool(N_STREAMS)
+    rnd = random.Random(seed)
+    cur = [rnd.randrange(n_classes) for _ in range(N_STREAMS)]
+    stage_done = 0
+    for _ in range(1500):
+        for s in range(N_STREAMS):
+            if rnd.random() < 0.15:
+                cur[s] = rnd.randrange(n_classes)
+        if rnd.random() < 0.01:
+            pid, streams = rnd.choice(pids), rnd.sample(range(N_STREAMS), 4)
+            for s in streams:
+                fsms[s].switch_profile_by_pid(pid)
+            pool.switch_profile_by_pid(pid, streams)
+        if rnd.random() < 0.005:
+            streams = rnd.sample(range(N_STREAMS), 3)
+            for s in streams:
+                fsms[s].reset()
+            pool.reset(streams)
+            assert all(pool.result(s) is None for s in streams)
+
+        step = pool.step(np.array(cur))
+        for s in range(N_STREAMS):
+            expected = fsms[s].process_state(cur[s])
+            assert step.active_profile(s) == expected.active_profile
+            assert int(step.flags[s]) == result_flags(expected)
+            assert int(step.step_index[s]) == expected.step_index
+            assert result_snapshot(pool.result(s)) == result_snapshot(expected)
+            stage_done += expected.stage_done
+    assert stage_done
+
+
+def test_pool_reset_restores_profiles_counters_and_history():
+    manager = FsmManager(DIFFERENTIAL_CASES[0][0]())
+    pool, fresh = manager.create_pool(3), manager.create_pool(3)
+    pool.switch_profile_by_pid(201, [0, 1])
+    for cls_id in [0] * 5 + [1] * 8 + [0] * 5:
+        pool.step([cls_id] * 3)
+    assert pool.get_history(0) != fresh.get_history(0)
+
+    pool.reset([0])
+    assert pool.result(0) is None and pool.result(1) is not None
+    assert pool.get_history(0) == fresh.get_history(0) and pool.get_history(1) != fresh.get_history(1)
+    assert pool.get_counters(0) == fresh.get_counters(0)
+    for cls_id in [3, 0, 0, 0, 0, 1]:
+        pool.step([cls_id] * 3)
+        fresh.step([cls_id] * 3)
+        assert result_snapshot(pool.result(0)) == result_snapshot(fresh.result(0))
+    assert pool.result(0).active_profile == "default" and pool.result(1).active_profile == "group2"
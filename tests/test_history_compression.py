@@ -0,0 +1,112 @@
+import lzma
+import os
+import zlib
+
+import pytest
+
+from neuro_fsm import FsmManager, JsonlEventReader
+from neuro_fsm.configs import HistoryWriterConfig
+from neuro_fsm.history_writer import FileSink, HistoryFilePool
+from neuro_fsm.history_writer.history_compression import open_history_log
+from neuro_fsm.models.enums import HistoryCompressions
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, writers_config
+
+
+def _run(make_config, n_classes, pids, compression, **options):
+    raw = {"enable": True, "compression": compression, "compression_block_bytes": 512, **options}
+    stable = {"enable": True, "log_format": "jsonl", "compression": compression, "compression_block_bytes": 512}
+    fsm = FsmManager({**make_config(), **writers_config(raw=raw, stable=stable)}).create_fsm()
+    for kind, payload in make_events(seed=4, n_classes=n_classes, pids=pids, length=1500):
+        if kind == "switch":
+            fsm.switch_profile_by_pid(payload)
+        else:
+            fsm.process_state(payload)
+    fsm.close()
+    return fsm
+
+
+def _without_ts(path) -> list[dict]:
+    return [{k: v for k, v in event.items() if k != "ts"} for event in JsonlEventReader(path)]
+
+
+@pytest.mark.parametrize("compression, suffix", [("gzip", ".gz"), ("lzma", ".xz")])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_compressed_logs_read_back_as_uncompressed(make_config, n_classes, pids, compression, suffix):
+    plain = _run(make_config, n_classes, pids, "none")
+    packed = _run(make_config, n_classes, pids, compression)
+    assert packed._raw_history_writer.path.endswith(suffix)
+
+    with open(plain._raw_history_writer.path, encoding="utf-8") as file:
+        expected = file.read()
+    with open_history_log(packed._raw_history_writer.path) as file:
+        assert file.read() == expected
+    assert _without_ts(packed._stable_history_writer.path) == _without_ts(plain._stable_history_writer.path)
+
+
+@pytest.mark.parametrize("compression", ["gzip", "lzma"])
+def test_explicit_flush_makes_written_records_readable(compression):
+    make_config, n_classes, pids = DIFFERENTIAL_CASES[0]
+    raw = {"enable": True, "compression": compression, "flush_on_events": []}
+    fsm = FsmManager({**make_config(), **writers_config(raw=raw)}).create_fsm()
+    writer = fsm._raw_history_writer
+    written = []
+    for _ in range(3):
+        for cls_id in (0, 0, 1, 2, 1):
+            fsm.process_state(cls_id)
+            written.append(f"{cls_id} ")
+        writer.flush()
+        # Файл не закрыт: всё записанное должно читаться из уже сброшенных байт
+        with open(writer.path, "rb") as file:
+            data = file.read()
+        if compression == "lzma":
+            text = lzma.decompress(data)
+        else:
+            text = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data)
+        assert text.decode("utf-8") == "".join(written)
+    fsm.close()
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+@pytest.mark.parametrize("compression", ["gzip", "lzma"])
+def test_flush_after_per_record_flushes_reaches_disk(tmp_path, compression, pooled):
+    # flush_records=1: каждая запись уже сброшена политикой, flush() всё равно должен вытолкнуть сжатое
+    config = HistoryWriterConfig(name="log.txt", fields=(), compression=HistoryCompressions[compression.upper()], flush_records=1)
+    pool = HistoryFilePool(capacity=2) if pooled else None
+    sink = FileSink(config, str(tmp_path / "log.txt"), pool=pool)
+    sink.open()
+    written = []
+    for i in range(3):
+        for j in range(40):
+            sink.write(f"{i} {j}\n")
+            written.append(f"{i} {j}\n")
+        sink.flush()
+        with open(sink.path, "rb") as file:
+            data = file.read()
+        if compression == "lzma":
+            text = lzma.decompress(data)
+        else:
+            text = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data)
+        assert text.decode("utf-8") == "".join(written)
+    sink.close()
+    if pool is not None:
+        pool.close_all()
+
+
+@pytest.mark.parametrize("compression, flush_on_events", [("gzip", None), ("gzip", []), ("lzma", [])])
+def test_compressed_log_is_smaller_than_uncompressed(compression, flush_on_events):
+    make_config, n_classes, pids = DIFFERENTIAL_CASES[0]
+    events = make_events(seed=6, n_classes=n_classes, pids=pids, length=20000)
+    sizes = []
+    for packing in ("none", compression):
+        raw = {"enable": True, "compression": packing}
+        if flush_on_events is not None:
+            raw["flush_on_events"] = flush_on_events
+        fsm = FsmManager({**make_config(), **writers_config(raw=raw)}).create_fsm()
+        for kind, payload in events:
+            fsm.switch_profile_by_pid(payload) if kind == "switch" else fsm.process_state(payload)
+        fsm.close()
+        sizes.append(os.path.getsize(fsm._raw_history_writer.path))
+    # Сбросы по политике (flush_records=1 по умолчанию) не добавляют к каждой записи маркер синхронизации
+    plain_size, packed_size = sizes
+    # Сбросы по событиям (здесь — примерно каждый шестой кадр) по-прежнему выталкивают сжатое
+    assert packed_size * (1 if flush_on_events is None else 8) < plain_size
@@ -0,0 +1,118 @@
+import asyncio
+import os
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.history_writer import HistoryFilePool
+from tests.test_configs.differential_cfg import make_events, profiles_config, writers_config
+
+
+def _config(**raw) -> dict:
+    return {**profiles_config(), **writers_config(raw={"enable": True, **raw}, stable={"enable": True})}
+
+
+def _run(fsm, events) -> None:
+    for kind, payload in events:
+        if kind == "switch":
+            fsm.switch_profile_by_pid(payload)
+        else:
+            fsm.process_state(payload)
+
+
+def _read(path) -> str:
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("raw", [{}, {"flush_records": 25}, {"background": True}])
+def test_stream_logs_match_single_fsm_logs_under_eviction(monkeypatch, raw):
+    pool = HistoryFilePool(capacity=3)
+    monkeypatch.setattr(HistoryFilePool, "_shared", pool)
+    n_streams = 12
+    streams = [make_events(seed=i, n_classes=4, pids=(None, 101, 201), length=300) for i in range(n_streams)]
+
+    manager = FsmManager(_config(**raw))
+    fsms = [manager.create_fsm(stream_id=f"cam/{i}") for i in range(n_streams)]
+    # Кадры потоков чередуются, как в конвейере с несколькими камерами
+    for t in range(max(map(len, streams))):
+        for fsm, events in zip(fsms, streams):
+            _run(fsm, events[t:t + 1])
+        assert pool.open_files <= pool.capacity
+    manager.destroy()
+    assert pool.evictions > 0 and pool.open_files == 0
+
+    paths = [(fsm._raw_history_writer.path, fsm._stable_history_writer.path) for fsm in fsms]
+    assert len({path for pair in paths for path in pair}) == 2 * n_streams
+    assert all("cam_" in os.path.basename(path) for pair in paths for path in pair)
+    for (raw_path, _), events in zip(paths, streams):
+        # Эталон — та же последовательность в отдельной FSM, которая пишет без чередования с другими потоками
+        reference = FsmManager(_config(**raw)).create_fsm()
+        _run(reference, events)
+        reference.close()
+        assert _read(raw_path) == _read(reference._raw_history_writer.path)
+        os.remove(reference._raw_history_writer.path)
+
+
+def test_pool_reopens_the_least_recently_used_file(tmp_path):
+    class Sink:
+        def __init__(self, path):
+            self.path, self.opened = path, 0
+
+        def _open_pooled(self):
+            self.opened += 1
+            return open(self.path, "a", encoding="utf-8")
+
+    pool = HistoryFilePool(capacity=2)
+    a, b, c = (Sink(str(tmp_path / name)) for name in "abc")
+    for sink, data in [(a, "1"), (b, "2"), (a, "3"), (c, "4"), (a, "5"), (b, "6")]:
+        pool.write(sink, data)
+    assert (a.opened, b.opened, c.opened) == (1, 2, 1)
+    assert pool.evictions == 2 and pool.open_files == 2
+    pool.resize(1)
+    assert pool.open_files == 1
+    pool.release(b.path)
+    pool.close_all()
+    assert [_read(sink.path) for sink in (a, b, c)] == ["135", "26", "4"]
+    with pytest.raises(ValueError):
+        pool.resize(0)
+
+
+def test_stream_ids_are_unique_per_manager():
+    manager = FsmManager(_config())
+    manager.create_fsm(stream_id="cam")
+    with pytest.raises(ValueError):
+        manager.create_fsm(stream_id="cam")
+    assert manager.create_fsm().stream_id != manager.create_fsm().stream_id
+    manager.destroy()
+
+
+def test_async_streams_share_the_pool(monkeypatch):
+    pool = HistoryFilePool(capacity=3)
+    monkeypatch.setattr(HistoryFilePool, "_shared", pool)
+    n_streams = 8
+    streams = [make_events(seed=i, n_classes=4, pids=(None, 101, 201), length=300) for i in range(n_streams)]
+    manager = FsmManager(_config())
+
+    async def run() -> list:
+        fsms = [manager.create_async_fsm(stream_id=f"cam/{i}") for i in range(n_streams)]
+        for t in range(max(map(len, streams))):
+            for fsm, events in zip(fsms, streams):
+                for kind, payload in events[t:t + 1]:
+                    if kind == "switch":
+                        fsm.switch_profile_by_pid(payload)
+                    else:
+                        await fsm.process_state(payload)
+            assert pool.open_files <= pool.capacity
+        for fsm in fsms:
+            await fsm.aclose()
+        return fsms
+
+    fsms = asyncio.run(run())
+    assert pool.evictions > 0 and pool.open_files == 0
+    for fsm, events in zip(fsms, streams):
+        reference = FsmManager(_config()).create_fsm()
+        _run(reference, events)
+        reference.close()
+        assert _read(fsm._raw_history_writer.path) == _read(reference._raw_history_writer.path)
+        os.remove(reference._raw_history_writer.path)
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.configs import HistoryWriterConfig
+from neuro_fsm.config_parser.config_with_profile_parser import ConfigWithProfileParser
+from tests.test_configs.differential_cfg import profiles_config, writers_config
+
+
+def _raw_fsm(**raw):
+    config = {**profiles_config(), **writers_config(raw={"enable": True, **raw})}
+    return FsmManager(config).create_fsm()
+
+
+def _size(fsm) -> int:
+    path = fsm._raw_history_writer.path
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def test_default_policy_flushes_every_record():
+    assert HistoryWriterConfig(name="x", fields=()).flush_records == 1
+    fsm = _raw_fsm()
+    sizes = []
+    for cls_id in (0, 0, 1):
+        fsm.process_state(cls_id)
+        sizes.append(_size(fsm))
+    assert 0 < sizes[0] < sizes[1] < sizes[2]
+    fsm.close()
+
+
+def test_buffered_policy_flushes_on_threshold_and_close():
+    fsm = _raw_fsm(flush_records=0, flush_bytes=0, flush_interval=0, flush_on_events=[])
+    for _ in range(20):
+        fsm.process_state(0)
+    assert _size(fsm) == 0
+    fsm.close()
+    assert _size(fsm) > 0
+
+    fsm = _raw_fsm(flush_records=5, flush_interval=0, flush_on_events=[])
+    sizes = []
+    for _ in range(10):
+        fsm.process_state(0)
+        sizes.append(_size(fsm))
+    assert sizes[:4] == [0] * 4 and sizes[4] > 0 and sizes[4] == sizes[8] < sizes[9]
+    fsm.close()
+
+
+def test_parser_options():
+    parsed = ConfigWithProfileParser({**profiles_config(), **writers_config(raw={
+        "flush_bytes": "4096", "flush_records": 0, "flush_interval": "0.5", "flush_on_events": ["stage_done"],
+    })}).parse()
+    raw = parsed.raw_history_writer
+    assert (raw.flush_bytes, raw.flush_records, raw.flush_interval) == (4096, 0, 0.5)
+    assert parsed.stable_history_writer.flush_records == 1
+    with pytest.raises(ValueError):
+        HistoryWriterConfig(name="x", fields=(), flush_records=-1)
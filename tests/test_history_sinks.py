@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.configs import HistoryWriterConfig
+from neuro_fsm.history_writer import (BackgroundWriteQueue, BaseHistorySink, FileSink, HistoryFilePool,
+                                      MemoryRingSink, RawHistoryWriter)
+from neuro_fsm.history_writer.history_compression import COMPRESSION_SUFFIXES, open_history_log
+from neuro_fsm.models import HistoryCompressions, HistorySinks
+from tests.test_configs.differential_cfg import make_events, profiles_config, writers_config
+
+RECORDS = [f"{i}\t{i % 3}\n" for i in range(500)]
+
+
+def _config(**options) -> HistoryWriterConfig:
+    return HistoryWriterConfig(name="x", fields=(), flush_interval=0, **options)
+
+
+@pytest.mark.parametrize("options, kwargs", [
+    ({}, {}),
+    ({"flush_records": 0, "flush_bytes": 256}, {}),
+    ({"compression": HistoryCompressions.GZIP, "compression_block_bytes": 700}, {}),
+    ({"compression": HistoryCompressions.LZMA, "compression_block_bytes": 700}, {}),
+    ({"flush_records": 7}, {"pool": HistoryFilePool(capacity=1)}),
+    ({"background": True}, {"queue": BackgroundWriteQueue(capacity=16)}),
+])
+def test_file_sink_writes_every_record(tmp_path, options, kwargs):
+    config = _config(**options)
+    path = str(tmp_path / ("sink.log" + COMPRESSION_SUFFIXES[config.compression]))
+    sink = FileSink(config, path, **kwargs)
+    sink.open()
+    for i, record in enumerate(RECORDS):
+        sink.write(record)
+        if i % 97 == 0:
+            sink.flush()
+    sink.close()
+    if "queue" in kwargs:
+        kwargs["queue"].stop()
+
+    with open_history_log(path) as file:
+        assert file.read() == "".join(RECORDS)
+
+
+def test_writer_dispatches_the_same_records_to_every_sink():
+    class ListSink(BaseHistorySink):
+        def __init__(self):
+            self.records, self.flushes, self.closed = [], 0, False
+
+        def write(self, data, records=1):
+            self.records.append(data)
+
+        def flush(self):
+            self.flushes += 1
+
+        def close(self):
+            self.closed = True
+
+    config = {**profiles_config(), **writers_config(raw={"enable": True, "sinks": ["FILE", "MEMORY"]})}
+    fsm = FsmManager(config).create_fsm()
+    writer = fsm._raw_history_writer
+    extra = ListSink()
+    writer.add_sink(extra)
+    assert [type(sink) for sink in writer.sinks] == [MemoryRingSink, FileSink, ListSink]
+    for kind, payload in make_events(seed=3, n_classes=4, pids=(None, 101, 201), length=500):
+        if kind == "switch":
+            fsm.switch_profile_by_pid(payload)
+        else:
+            fsm.process_state(payload)
+    fsm.close()
+
+    memory = writer.sinks[0]
+    with open(writer.path, encoding="utf-8") as file:
+        assert file.read() == "".join(memory.records) == "".join(extra.records)
+    assert extra.flushes > 0 and extra.closed
+
+
+def test_writer_without_file_sink_creates_no_files():
+    writer = RawHistoryWriter(HistoryWriterConfig(name="raw.txt", fields=(), sinks=(HistorySinks.MEMORY,)))
+    writer.write_frame(0, 1)
+    writer.close()
+
+    assert writer.path is None and writer.dropped == 0 and not writer.background
+    assert [type(sink) for sink in writer.sinks] == [MemoryRingSink]
+    assert not os.path.exists("fsm_logs")
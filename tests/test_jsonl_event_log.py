@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from neuro_fsm import FsmManager, JsonlEventReader
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, writers_config
+
+
+def _profiles_state(fsm) -> dict:
+    """ Счётчики (ненулевые) и история всех профилей по именам состояний — как в снимке runtime. """
+    return {
+        name: {"counters": {s.name: c for s, c in profile.get_counters().items() if c},
+               "history": [s.name for s in profile.get_history()]}
+        for name, profile in fsm._profile_manager.profiles.items()
+    }
+
+
+@pytest.mark.parametrize("keyframe_every", [1, 4])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_jsonl_log_reads_back_events_and_runtime(make_config, n_classes, pids, keyframe_every):
+    stable = {"enable": True, "log_format": "jsonl", "runtime_keyframe_every": keyframe_every}
+    fsm = FsmManager({**make_config(), **writers_config(stable=stable)}).create_fsm()
+    live, stage_done = {}, []
+    for kind, payload in make_events(seed=1, n_classes=n_classes, pids=pids, length=2000):
+        if kind == "switch":
+            fsm.switch_profile_by_pid(payload)
+            continue
+        result = fsm.process_state(payload)
+        live[result.step_index] = (result.active_profile, _profiles_state(fsm))
+        if result.stage_done:
+            stage_done.append(result.step_index)
+    fsm.close()
+
+    path = fsm._stable_history_writer.path
+    with open(path, encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    reader = JsonlEventReader(path)
+    events = list(reader)
+    assert events == lines and events[0]["event"] == "config"
+    assert [e["step"] for e in events] == sorted(e["step"] for e in events)
+
+    done = list(reader.events(action="expected_seq_done"))
+    assert [e["step"] for e in done] == stage_done
+    snapshots = list(reader.runtime_snapshots())
+    assert len(snapshots) == len(stage_done)
+    for snapshot in snapshots:
+        active, profiles = live[snapshot["step"]]
+        assert snapshot["active_profile"] == active
+        assert snapshot["profiles"] == profiles
+
+    # Фильтры читателя совпадают с фильтрацией разобранных событий
+    mid = events[len(events) // 2]["ts"]
+    assert list(reader.events(since=mid)) == [e for e in events if e["ts"] >= mid]
+    assert list(reader.events(event="state")) == [e for e in events if e["event"] == "state"]
+    name = next(e["profile"] for e in events if e["event"] == "action")
+    assert list(reader.events(event="action", profile=name)) == \
+        [e for e in events if e["event"] == "action" and e["profile"] == name]
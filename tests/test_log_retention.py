@@ -0,0 +1,103 @@
+import os
+import random
+import time
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.history_writer import LogRetentionManager
+from tests.test_configs.differential_cfg import profiles_config, writers_config
+
+
+def _make_files(dir_path, names_sizes):
+    os.makedirs(dir_path, exist_ok=True)
+    for name, size in names_sizes:
+        with open(os.path.join(dir_path, name), "wb") as file:
+            file.write(b"x" * size)
+
+
+def _expected_after_size_limit(dir_path, rules, active):
+    """ Эталон: по каждому суффиксу (самое длинное совпадение) удаляются самые старые неактивные файлы сверх лимита. """
+    entries = []
+    for name in os.listdir(dir_path):
+        path = os.path.join(dir_path, name)
+        stat = os.stat(path)
+        suffix = max((s for s in rules if name.endswith(s)), key=len, default=None)
+        entries.append((suffix, stat.st_ctime, stat.st_size, path))
+    keep = set()
+    for suffix in set(rules) | {None}:
+        files = sorted(e[1:] for e in entries if e[0] == suffix)
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if suffix is None or path in active or not (rules[suffix] and total > rules[suffix]):
+                keep.add(path)
+            else:
+                total -= size
+    return keep
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return predicate()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_size_limits_match_reference(tmp_path, seed):
+    rnd = random.Random(seed)
+    dir_path = str(tmp_path / "logs")
+    suffixes = [".txt", ".yaml", ".yaml.gz", ".log"]
+    _make_files(dir_path, [(f"f{i}{rnd.choice(suffixes)}", rnd.randint(1, 400)) for i in range(120)])
+    rules = {".txt": 3000, ".yaml": 0, ".yaml.gz": 1500}
+    active = {os.path.join(dir_path, name) for name in rnd.sample(sorted(os.listdir(dir_path)), 10)}
+    expected = _expected_after_size_limit(dir_path, rules, active)
+
+    manager = LogRetentionManager(dir_path)
+    for path in active:
+        manager.register(path, ".txt", 14, rules[".txt"])
+    for suffix, limit in rules.items():
+        manager.register(os.path.join(dir_path, f"new{suffix}"), suffix, 14, limit)
+        manager.release(os.path.join(dir_path, f"new{suffix}"))
+    manager.run_cleanup()
+    manager.stop()
+
+    assert {os.path.join(dir_path, name) for name in os.listdir(dir_path)} == expected
+    assert set(manager.files) == expected
+
+
+def test_age_limit_spares_files_in_use_until_released(tmp_path):
+    dir_path = str(tmp_path / "logs")
+    _make_files(dir_path, [("old1_raw.txt", 10), ("old2_raw.txt", 10), ("stable.yaml", 10)])
+    in_use = os.path.join(dir_path, "old1_raw.txt")
+    manager = LogRetentionManager(dir_path, interval=0.05)
+    manager.register(in_use, ".txt", 0)
+
+    assert _wait_for(lambda: sorted(os.listdir(dir_path)) == ["old1_raw.txt", "stable.yaml"])
+    manager.release(in_use)
+    assert _wait_for(lambda: sorted(os.listdir(dir_path)) == ["stable.yaml"])
+    manager.stop()
+
+
+def test_writers_register_without_scanning_the_directory(monkeypatch):
+    _make_files("fsm_logs", [(f"old_{i}_raw.txt", 10) for i in range(50)])
+    scans = []
+    original = LogRetentionManager._rescan
+
+    def counting_rescan(self):
+        scans.append(self)
+        return original(self)
+
+    monkeypatch.setattr(LogRetentionManager, "_rescan", counting_rescan)
+    manager = LogRetentionManager.for_dir("fsm_logs")
+    manager.stop()
+    # Регистрация из конструктора писателя не сканирует каталог; сканирует только фоновый поток менеджера
+    monkeypatch.setattr(LogRetentionManager, "_ensure_thread", lambda self: None)
+    fsm = FsmManager({**profiles_config(), **writers_config(raw={"enable": True, "max_total_bytes": 100})}).create_fsm()
+    assert scans == []
+    assert os.path.abspath(fsm._raw_history_writer.path) in manager.files
+    manager.run_cleanup()
+    assert len(scans) == 1
+    # 50 старых файлов по 10 байт при лимите 100 байт: остаются 10 самых новых
+    assert len([name for name in os.listdir("fsm_logs") if name.startswith("old_")]) == 10
+    fsm.close()
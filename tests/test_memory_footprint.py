@@ -0,0 +1,30 @@
+import pytest
+
+from neuro_fsm import FsmManager
+from tests.test_configs.differential_cfg import profiles_config
+
+
+def test_runtime_objects_have_no_instance_dict():
+    fsm = FsmManager(profiles_config()).create_fsm()
+    fsm.process_state(0)
+    manager = fsm._profile_manager
+    objects = [fsm, manager, manager._switcher, fsm._raw_history, fsm.result]
+    for profile in manager.profiles.values():
+        objects += [profile, profile._counters, profile._history]
+    for obj in objects:
+        assert not hasattr(obj, "__dict__"), type(obj).__name__
+
+
+@pytest.mark.parametrize("n_fsms", [1, 4])
+def test_manager_footprint_counts_shared_objects_once(n_fsms):
+    manager = FsmManager(profiles_config())
+    fsms = [manager.create_fsm() for _ in range(n_fsms)]
+    report = manager.memory_footprint()
+
+    assert report["fsms"] == n_fsms
+    assert report["total"] == report["shared"] + report["private"]
+    assert report["shared"] == fsms[0].memory_footprint()["shared"]
+    per_fsm = [fsm.memory_footprint(set()) for fsm in fsms]
+    assert all(r["private"] == sum(v for k, v in r.items() if k not in ("private", "shared")) for r in per_fsm)
+    # Общие State и таблицы не входят в собственные данные потока
+    assert report["private"] < sum(r["private"] + r["shared"] for r in per_fsm)
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.models import FsmStepFlags
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, profiles_config, make_events, result_flags, \
+    result_snapshot
+
+
+def _chunks(events, seed):
+    """ Режет поток на пачки случайной длины; смена профиля — между пачками. """
+    rnd = random.Random(seed)
+    i = 0
+    while i < len(events):
+        if events[i][0] == "switch":
+            yield "switch", events[i][1]
+            i += 1
+            continue
+        j, lim = i, i + rnd.randint(1, 70)
+        while j < len(events) and j < lim and events[j][0] == "cls":
+            j += 1
+        yield "batch", [cls_id for _, cls_id in events[i:j]]
+        i = j
+
+
+@pytest.mark.parametrize("as_numpy", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_process_batch_matches_process_state(make_config, n_classes, pids, seed, as_numpy):
+    manager = FsmManager(make_config())
+    reference, batched = manager.create_fsm(), manager.create_fsm()
+    stage_done = 0
+    for kind, payload in _chunks(make_events(seed, n_classes, pids), seed + 100):
+        if kind == "switch":
+            reference.switch_profile_by_pid(payload)
+            batched.switch_profile_by_pid(payload)
+            continue
+        expected = [reference.process_state(cls_id) for cls_id in payload]
+        batch = batched.process_batch(np.asarray(payload, dtype=np.int32) if as_numpy else payload)
+
+        assert list(batch.cls_ids) == payload
+        assert list(batch.flags) == [result_flags(r) for r in expected]
+        assert [batch.active_profile(k) for k in range(len(batch))] == [r.active_profile for r in expected]
+        assert batch.first_step_index == expected[0].step_index
+        assert batch.stage_done_positions == tuple(k for k, r in enumerate(expected) if r.stage_done)
+        assert result_snapshot(batched.result) == result_snapshot(expected[-1])
+        stage_done += len(batch.stage_done_positions)
+    assert stage_done
+
+
+def test_process_batch_empty_and_disabled():
+    fsm = FsmManager(profiles_config()).create_fsm()
+    fsm.process_state(0)
+    empty = fsm.process_batch([])
+    assert len(empty) == 0 and empty.first_step_index == 2 and not empty.stage_done
+    assert fsm.process_batch([1, 1]).positions(FsmStepFlags.STABLE) == ()
+
+    disabled = FsmManager({**profiles_config(), "ENABLE": False}).create_fsm()
+    assert len(disabled.process_batch([0, 1])) == 0 and disabled.result is None
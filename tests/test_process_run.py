@@ -0,0 +1,50 @@
+import itertools
+
+import pytest
+
+from neuro_fsm import FsmManager
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, profiles_config, make_events, result_snapshot
+
+
+def _runs(events):
+    """ Поток событий как серии: ("run", (cls_id, n)) и ("switch", pid). """
+    for (kind, payload), group in itertools.groupby(events):
+        if kind == "switch":
+            for _ in group:
+                yield kind, payload
+        else:
+            yield "run", (payload, sum(1 for _ in group))
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_process_run_matches_process_state(make_config, n_classes, pids, seed):
+    manager = FsmManager(make_config())
+    reference, runner = manager.create_fsm(), manager.create_fsm()
+    stage_done = 0
+    for kind, payload in _runs(make_events(seed, n_classes, pids, length=4000)):
+        if kind == "switch":
+            reference.switch_profile_by_pid(payload)
+            runner.switch_profile_by_pid(payload)
+            continue
+        cls_id, count = payload
+        expected = {r.step_index: r for r in (reference.process_state(cls_id) for _ in range(count))}
+        results = runner.process_run(cls_id, count)
+
+        assert results[-1] is runner.result
+        assert results[-1].step_index == max(expected)
+        assert [r.step_index for r in results] == sorted({r.step_index for r in results})
+        for result in results:
+            assert result_snapshot(result) == result_snapshot(expected[result.step_index])
+        # Все кадры с событиями попадают в результаты серии
+        eventful = {i for i, r in expected.items() if r.stage_done or r.profile_changed}
+        assert eventful <= {r.step_index for r in results}
+        stage_done += len([i for i in eventful if expected[i].stage_done])
+        assert runner.raw_history.records == reference.raw_history.records
+    assert stage_done
+
+
+def test_process_run_rejects_empty_run():
+    fsm = FsmManager(profiles_config()).create_fsm()
+    with pytest.raises(ValueError):
+        fsm.process_run(0, 0)
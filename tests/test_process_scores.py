@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from neuro_fsm import FsmManager
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, result_flags, result_snapshot
+
+
+def _scores(events, n_classes, seed):
+    """ Матрица вероятностей, argmax которой — cls_id события, с уверенностью около порогов. """
+    rng = np.random.default_rng(seed)
+    cls_ids = [payload for kind, payload in events if kind == "cls"]
+    scores = rng.uniform(0.0, 0.3, size=(len(cls_ids), n_classes))
+    scores[np.arange(len(cls_ids)), cls_ids] = rng.uniform(0.3, 1.0, size=len(cls_ids))
+    return scores
+
+
+def _expected_cls_id(fsm, row) -> int:
+    """ Эталон: argmax, если его вероятность не ниже порога состояния в активном профиле, иначе default. """
+    profile = fsm._profile_manager.active_profile
+    best = int(np.argmax(row))
+    return best if row[best] >= profile.states[best].threshold else profile.default_states[0].cls_id
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_process_scores_matches_thresholded_argmax(make_config, n_classes, pids, seed):
+    manager = FsmManager(make_config())
+    reference, scored, batched = manager.create_fsm(), manager.create_fsm(), manager.create_fsm()
+    events = make_events(seed, n_classes, pids, length=1500)
+    scores = _scores(events, n_classes, seed)
+
+    row, rejected, start = 0, 0, 0
+    for kind, payload in events + [("switch", None)]:
+        if kind == "cls":
+            cls_id = _expected_cls_id(reference, scores[row])
+            rejected += cls_id != payload
+            expected = reference.process_state(cls_id)
+            assert result_snapshot(scored.process_scores(scores[row])) == result_snapshot(expected)
+            row += 1
+            continue
+        # Пачка по вероятностям между сменами профиля сравнивается с покадровой обработкой
+        if row > start:
+            batch = batched.process_scores_batch(scores[start:row])
+            assert list(batch.flags)[-1] == result_flags(expected)
+            assert result_snapshot(batched.result) == result_snapshot(expected)
+            start = row
+        for fsm in (reference, scored, batched):
+            fsm.switch_profile_by_pid(payload)
+    has_thresholds = any(state.get("threshold") for state in make_config()["STATES"])
+    assert rejected < row and bool(rejected) == has_thresholds
+
+
+def test_process_scores_accepts_plain_sequences():
+    fsm = FsmManager(DIFFERENTIAL_CASES[1][0]()).create_fsm()
+    reference = FsmManager(DIFFERENTIAL_CASES[1][0]()).create_fsm()
+    rows = [[0.1, 0.0, 0.95, 0.2, 0.0, 0.0, 0.0, 0.0], [0.0] * 7 + [0.01]]
+    for values in rows:
+        expected = reference.process_state(_expected_cls_id(reference, np.asarray(values)))
+        assert result_snapshot(fsm.process_scores(values)) == result_snapshot(expected)
+    with pytest.raises(ValueError):
+        fsm.process_scores_batch(np.zeros(8))
@@ -0,0 +1,70 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from neuro_fsm.core.history import RawStateHistory
+from neuro_fsm.core.states import State, StateTable
+from neuro_fsm.models import HistoryLengthUnits
+
+STATES = {cls_id: State(cls_id=cls_id, name=f"S{cls_id}") for cls_id in (-1, 0, 1, 2, 5)}
+TABLE = StateTable(STATES)
+
+
+def _reference_runs(frames: list[tuple[int, int]], max_len: int, unit: HistoryLengthUnits) -> list[tuple]:
+    """ Эталон: серии (cls_id, run_length, first_step) по списку кадров (step, cls_id) с обрезкой по max_len. """
+    runs = []
+    for cls_id, group in itertools.groupby(frames, key=lambda frame: frame[1]):
+        steps = [step for step, _ in group]
+        runs.append((cls_id, len(steps), steps[0]))
+    if unit is HistoryLengthUnits.RUNS:
+        return runs[-max_len:]
+    kept, total = [], 0
+    for cls_id, length, first in reversed(runs):
+        take = min(length, max_len - total)
+        if take <= 0:
+            break
+        kept.append((cls_id, take, first + length - take))
+        total += take
+    return kept[::-1]
+
+
+@pytest.mark.parametrize("unit", list(HistoryLengthUnits))
+@pytest.mark.parametrize("seed", range(3))
+def test_rle_history_matches_frame_list(unit, seed):
+    rnd = random.Random(seed)
+    max_len = rnd.choice((3, 10, 40))
+    history, frames, step = RawStateHistory(TABLE, max_len=max_len, unit=unit), [], 0
+    for _ in range(2000):
+        if rnd.random() < 0.01:
+            history.clear()
+            frames, step = [], 0
+            assert history.count_last_repeats() == 0 and history.last() is None
+            continue
+        cls_id, count = rnd.choice(tuple(STATES)), rnd.choice((1, 1, 2, 7))
+        if count == 1 and rnd.random() < 0.5:
+            history.add(STATES[cls_id])
+        else:
+            history.add_repeated(STATES[cls_id], count)
+        frames += [(step + k + 1, cls_id) for k in range(count)]
+        step += count
+
+        runs = _reference_runs(frames, max_len, unit)
+        assert [(state.cls_id, length, first) for state, length, first in history.runs()] == runs
+        assert history.count_last_repeats() == runs[-1][1]
+        assert history.last() is STATES[runs[-1][0]]
+        assert len(history) == sum(length for _, length, _ in runs) and history.runs_count == len(runs)
+    columns = history.to_numpy()
+    assert list(zip(*(columns[name].tolist() for name in ("cls_id", "run_length", "first_step")))) == runs
+    assert [s.cls_id for s in history] == [cls_id for cls_id, length, _ in runs for _ in range(length)]
+    assert history[-1] is history.last() and history[0] is STATES[runs[0][0]]
+
+
+def test_add_repeated_is_constant_size():
+    history = RawStateHistory(TABLE, max_len=4, unit=HistoryLengthUnits.FRAMES)
+    history.add_repeated(STATES[2], 10 ** 9)
+    assert history.runs_count == 1 and len(history) == 4 and history.count_last_repeats() == 4
+    assert np.array_equal(history.to_numpy()["first_step"], [10 ** 9 - 3])
+    with pytest.raises(ValueError):
+        RawStateHistory(TABLE, max_len=0)
@@ -0,0 +1,93 @@
+import dataclasses
+import gc
+import pickle
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.core.counters import CountersJournal
+from neuro_fsm.models import FsmResult
+from neuro_fsm.models.result import LazySnapshot
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, result_snapshot
+
+
+@pytest.mark.parametrize("counters_mode", ["dense", "sparse"])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_held_results_read_later_match_results_read_immediately(make_config, n_classes, pids, counters_mode):
+    manager = FsmManager({**make_config(), "COUNTERS_MODE": counters_mode})
+    eager, lazy = manager.create_fsm(), manager.create_fsm()
+    expected, held = [], []
+    # Поток длиннее участка журнала (CountersJournal.MIN_LENGTH), чтобы снимки попадали в закрытые участки
+    for kind, payload in make_events(seed=5, n_classes=n_classes, pids=pids, length=20 * CountersJournal.MIN_LENGTH):
+        if kind == "switch":
+            eager.switch_profile_by_pid(payload)
+            lazy.switch_profile_by_pid(payload)
+            continue
+        expected.append(result_snapshot(eager.process_state(payload)))
+        held.append(lazy.process_state(payload))
+    assert [result_snapshot(result) for result in held] == expected
+
+
+def test_result_is_a_dataclass():
+    fsm = FsmManager(DIFFERENTIAL_CASES[0][0]()).create_fsm()
+    for cls_id in [0] * 6 + [1] * 4:
+        result = fsm.process_state(cls_id)
+
+    assert dataclasses.is_dataclass(result)
+    assert [field.name for field in dataclasses.fields(result)][-4:] == ["counters", "history", "step_index",
+                                                                         "timestamp"]
+    # Ключи counters — State (тоже dataclass), поэтому asdict раскладывает поля без рекурсии в словарь
+    as_dict = dataclasses.asdict(dataclasses.replace(result, counters={}))
+    assert isinstance(as_dict["history"], list) and isinstance(as_dict["timestamp"], datetime)
+    assert as_dict["state"] == dataclasses.asdict(result.state) and as_dict["step_index"] == result.step_index
+    assert {state.cls_id: count for state, count in result.counters.items()}[1] == 4
+
+    copy = dataclasses.replace(result)
+    assert copy == result and copy is not result
+    assert dataclasses.replace(result, stage_done=True) != result
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored == result and restored.counters == result.counters
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.stage_done = True
+
+
+def test_unread_held_results_do_not_copy_counters():
+    n_states = 3000
+    config = {
+        "ENABLE": True,
+        "STATES": [{"cls_id": i, "name": f"S{i}", "stable_min_lim": 3} for i in range(n_states)],
+        "STATE_PROFILES": [{"name": "p1", "expected_sequences": (("S0", "S1", "S0"),),
+                            "init_states": 0, "default_states": 1}],
+        "PROFILE_SWITCHER_STRATEGY": "BY_MAPPED_ID",
+        "DEFAULT_PROFILE": "p1",
+        "PROFILE_IDS_MAP": {"p1": []},
+        "RAW_HISTORY_WRITER": {"enable": False, "name": "{timestamp}_raw.txt"},
+        "STABLE_HISTORY_WRITER": {"enable": False, "name": "{timestamp}_stable.yaml"},
+    }
+    fsm = FsmManager(config).create_fsm()
+    steps = 2 * n_states
+    gc.collect()
+    tracemalloc.start()
+    held = [fsm.process_state((i // 7) % 3) for i in range(steps)]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Прежний FsmResult держал словарь на n_states счётчиков в каждом результате
+    assert retained / steps < n_states
+    reference = FsmManager(config).create_fsm()
+    expected = {i: result_snapshot(reference.process_state((i // 7) % 3)) for i in range(steps)}
+    for i in (0, 10, n_states, steps - 1):
+        assert result_snapshot(held[i]) == expected[i]
+
+
+def test_read_result_releases_its_snapshots():
+    fsm = FsmManager(DIFFERENTIAL_CASES[0][0]()).create_fsm()
+    held = [fsm.process_state(cls_id) for cls_id in [0] * 6 + [1] * 4 + [2] * 3]
+    assert any(isinstance(ref, LazySnapshot) for result in held for ref in gc.get_referents(result))
+    for result in held:
+        result.counters, result.history, result.timestamp
+    # Прочитанный результат держит только готовые значения: снимок счётчиков и участок журнала освобождены
+    referents = [ref for result in held for ref in gc.get_referents(result)]
+    assert not any(isinstance(ref, (LazySnapshot, tuple, float)) for ref in referents)
@@ -0,0 +1,55 @@
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.history_writer import RuntimeDeltaTracker, apply_runtime_delta
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events
+
+
+def _live(profiles) -> dict:
+    return {name: {"counters": {s.name: c for s, c in profile.get_counters().items() if c},
+                   "history": [s.name for s in profile.get_history()]}
+            for name, profile in profiles.items()}
+
+
+@pytest.mark.parametrize("keyframe_every", [1, 4, 1000])
+@pytest.mark.parametrize("counters_mode", ["dense", "sparse"])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_touched_deltas_match_full_comparison(make_config, n_classes, pids, counters_mode, keyframe_every):
+    fsm = FsmManager({**make_config(), "COUNTERS_MODE": counters_mode}).create_fsm()
+    profiles = fsm._profile_manager.profiles
+    full, fast = RuntimeDeltaTracker(keyframe_every), RuntimeDeltaTracker(keyframe_every)
+    touched, snapshot, n_deltas = set(), None, 0
+    # Снимки и после шагов FSM, и после ручной смены профиля и сброса FSM без шагов
+    for i, (kind, payload) in enumerate(make_events(seed=8, n_classes=n_classes, pids=pids, length=3000)):
+        if kind == "switch":
+            fsm.switch_profile_by_pid(payload)
+        elif i % 997 == 0:
+            fsm.reset()
+        else:
+            fsm.process_state(payload)
+            touched.add(payload)
+            if i % 13:
+                continue
+        expected = full.next(profiles)
+        keyframe, delta = fast.next(profiles, touched)
+        touched.clear()
+        assert (keyframe, delta) == expected
+        n_deltas += not keyframe
+        snapshot = apply_runtime_delta(snapshot, "", delta, keyframe)
+        assert snapshot["profiles"] == _live(profiles)
+    assert n_deltas or keyframe_every == 1
+
+
+def test_untouched_profiles_are_skipped():
+    fsm = FsmManager(DIFFERENTIAL_CASES[0][0]()).create_fsm()
+    profiles = fsm._profile_manager.profiles
+    tracker = RuntimeDeltaTracker(keyframe_every=100)
+    for cls_id in [0] * 30 + [1] * 3:
+        fsm.process_state(cls_id)
+    assert tracker.next(profiles)[0]
+    # Без новых кадров разностный снимок пуст
+    assert tracker.next(profiles, set()) == (False, {})
+    fsm.process_state(1)
+    keyframe, delta = tracker.next(profiles, {1})
+    assert not keyframe and {counters["FULL"] for counters, _ in delta.values()} == {4}
+    assert all(history is None and set(counters) == {"FULL"} for counters, history in delta.values())
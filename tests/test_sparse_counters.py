@@ -0,0 +1,49 @@
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.config_parser.config_with_profile_parser import ConfigWithProfileParser
+from neuro_fsm.core.counters import StableStateCounters, SparseStateCounters
+from neuro_fsm.core.profiles import ProfileManager
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, result_snapshot
+
+
+def _counters_types(manager: FsmManager) -> set[type]:
+    profiles = manager.create_fsm()._profile_manager.profiles
+    return {type(profile._counters) for profile in profiles.values()}
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_sparse_fsm_matches_dense_fsm(make_config, n_classes, pids, seed):
+    dense = FsmManager({**make_config(), "COUNTERS_MODE": "dense"}).create_fsm()
+    sparse = FsmManager({**make_config(), "COUNTERS_MODE": "sparse"}).create_fsm()
+    stage_done = 0
+    for kind, payload in make_events(seed, n_classes, pids):
+        if kind == "switch":
+            dense.switch_profile_by_pid(payload)
+            sparse.switch_profile_by_pid(payload)
+            continue
+        expected = dense.process_state(payload)
+        result = sparse.process_state(payload)
+        assert result_snapshot(result) == result_snapshot(expected)
+        # Разреженный режим отдаёт только живые счётчики
+        assert all(result.counters.values())
+        stage_done += expected.stage_done
+    assert stage_done
+
+
+def test_counters_mode_selection():
+    config = DIFFERENTIAL_CASES[0][0]()
+    assert _counters_types(FsmManager(config)) == {StableStateCounters}
+    assert _counters_types(FsmManager({**config, "COUNTERS_MODE": "sparse"})) == {SparseStateCounters}
+    assert _counters_types(FsmManager({**config, "COUNTERS_MODE": "auto"})) == {StableStateCounters}
+
+    n_states = ProfileManager.SPARSE_COUNTERS_MIN_STATES
+    large = {**config, "STATES": [{"cls_id": i, "name": f"S{i}", "stable_min_lim": 3} for i in range(n_states)],
+             "STATE_PROFILES": [{"name": "default", "expected_sequences": (("S0", "S1"),),
+                                 "init_states": 0, "default_states": 1}],
+             "PROFILE_IDS_MAP": {"default": []}}
+    assert _counters_types(FsmManager({**large, "COUNTERS_MODE": "auto"})) == {SparseStateCounters}
+
+    with pytest.raises(ValueError):
+        ConfigWithProfileParser({**config, "COUNTERS_MODE": "compressed"}).parse()
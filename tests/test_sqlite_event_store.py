@@ -0,0 +1,92 @@
+import os
+import sqlite3
+
+import pytest
+
+from neuro_fsm import FsmManager, JsonlEventReader, SqliteEventReader
+from neuro_fsm.history_writer import SqliteEventStore
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, writers_config
+
+_JSONL = {"enable": True, "log_format": "jsonl", "name": "{timestamp}_stable.jsonl"}
+_FIELDS = ("step", "event", "action", "state", "cls_id", "profile", "count")
+
+
+def _run(fsm, events) -> None:
+    for kind, payload in events:
+        if kind == "switch":
+            fsm.switch_profile_by_pid(payload)
+        else:
+            fsm.process_state(payload)
+
+
+def _jsonl_events(path) -> list[tuple]:
+    """ События state/action из JSONL-лога в колонках таблицы events (без ts и stream). """
+    return [tuple(event.get(field) for field in _FIELDS)
+            for event in JsonlEventReader(path).events() if event["event"] in ("state", "action")]
+
+
+@pytest.mark.parametrize("stable", [
+    {"enable": True, "sinks": ["file", "sqlite"]},
+    {**_JSONL, "sinks": ["sqlite"]},
+])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_sqlite_events_match_jsonl_log(make_config, n_classes, pids, stable):
+    n_streams = 3
+    streams = [make_events(seed=20 + i, n_classes=n_classes, pids=pids, length=2000) for i in range(n_streams)]
+    manager = FsmManager({**make_config(), **writers_config(stable=stable)})
+    fsms = [manager.create_fsm(stream_id=f"cam{i}") for i in range(n_streams)]
+    # Кадры потоков чередуются: строки всех FSM идут в одно хранилище вперемешку
+    for t in range(max(map(len, streams))):
+        for fsm, events in zip(fsms, streams):
+            _run(fsm, events[t:t + 1])
+    manager.destroy()
+
+    reader = SqliteEventReader(os.path.join("fsm_logs", "fsm_events.sqlite"))
+    rows, n_expected = list(reader), 0
+    assert [row["ts"] for row in rows] == sorted(row["ts"] for row in rows)
+    for i, events in enumerate(streams):
+        # Эталон — JSONL-лог той же последовательности в отдельной FSM без SQLite
+        reference = FsmManager({**make_config(), **writers_config(stable=_JSONL)}).create_fsm()
+        _run(reference, events)
+        reference.close()
+        expected = _jsonl_events(reference._stable_history_writer.path)
+        os.remove(reference._stable_history_writer.path)
+        stored = [tuple(row[field] for field in _FIELDS) for row in reader.events(stream=f"cam{i}")]
+        assert expected and stored == expected
+        n_expected += len(expected)
+    assert len(rows) == n_expected
+
+
+def test_reader_filters_match_python_filtering():
+    make_config, n_classes, pids = DIFFERENTIAL_CASES[0]
+    manager = FsmManager({**make_config(), **writers_config(stable={"enable": True, "sinks": ["sqlite"]})})
+    for i in range(2):
+        _run(manager.create_fsm(stream_id=f"cam{i}"), make_events(seed=i, n_classes=n_classes, pids=pids))
+    manager.destroy()
+
+    reader = SqliteEventReader(os.path.join("fsm_logs", "fsm_events.sqlite"))
+    rows = list(reader)
+    since, until = rows[len(rows) // 4]["ts"], rows[3 * len(rows) // 4]["ts"]
+    for filters in ({"stream": "cam1"}, {"event": "state"}, {"action": "expected_seq_done"},
+                    {"stream": "cam0", "profile": "group1"}, {"since": since, "until": until},
+                    {"stream": "cam1", "action": "state_changed", "since": since}):
+        expected = [row for row in rows if all(
+            row["ts"] >= value if key == "since" else row["ts"] < value if key == "until" else row[key] == value
+            for key, value in filters.items()
+        )]
+        assert list(reader.events(**filters)) == expected
+    assert any(reader.events(action="expected_seq_done"))
+
+
+def test_store_writes_every_row_in_batches(tmp_path):
+    path = str(tmp_path / "events.sqlite")
+    store = SqliteEventStore(path, batch_size=64, interval=60.0)
+    rows = [(float(i), f"cam{i % 3}", i, "action", "state_changed", "EMPTY", 0, "default", i) for i in range(1000)]
+    for row in rows:
+        store.put(row)
+    store.join()
+    assert store.written == len(rows) and store.dropped == 0
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal", )
+    assert [tuple(row.values()) for row in SqliteEventReader(path)] == rows
+    store.stop()
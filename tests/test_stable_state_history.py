@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from neuro_fsm.core.history import StableStateHistory
+from neuro_fsm.core.states import State
+
+STATES = {name: State(cls_id=i, name=name) for i, name in enumerate(("EMPTY", "FULL", "NO_LIBRA", "UNKNOWN"))}
+SEQUENCES = (("EMPTY", "FULL", "EMPTY"), ("EMPTY", "NO_LIBRA", "FULL"), ("FULL", "FULL"))
+
+
+def _history(max_len: int = 100) -> StableStateHistory:
+    return StableStateHistory(tuple(tuple(STATES[name] for name in seq) for seq in SEQUENCES), max_len=max_len)
+
+
+def _is_prefix_tail(names: list[str]) -> bool:
+    """ Эталон: есть ли непустой хвост истории, совпадающий с началом какого-либо шаблона. """
+    return any(tuple(names[-k:]) == seq[:k] for seq in SEQUENCES for k in range(1, min(len(seq), len(names)) + 1))
+
+
+def test_impossible_differs_from_not_valid():
+    history = _history()
+    assert history.is_impossible() and not history.is_valid()
+
+    # Живой префикс: шаблон ещё не совпал, но и не невозможен
+    history.add(STATES["EMPTY"], STATES["FULL"])
+    assert not history.is_valid() and not history.is_impossible()
+
+    history.add(STATES["EMPTY"])
+    assert history.is_valid() and not history.is_impossible()
+
+    history.add(STATES["UNKNOWN"])
+    assert not history.is_valid() and history.is_impossible()
+
+    history.clear()
+    assert history.is_impossible()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_automaton_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    history, names = _history(), []
+    for _ in range(500):
+        name = rnd.choice(tuple(STATES))
+        history.add(STATES[name])
+        names.append(name)
+        assert history.is_valid() == any(tuple(names[-len(seq):]) == seq for seq in SEQUENCES)
+        assert history.is_impossible() == (not _is_prefix_tail(names))
+        assert history.progress == max(
+            (k for seq in SEQUENCES for k in range(1, min(len(seq), len(names)) + 1)
+             if tuple(names[-k:]) == seq[:k]), default=0)
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.core.counters import StableStateCounters, SparseStateCounters
+from neuro_fsm.core.states import State
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES, make_events, result_snapshot
+
+STATES = {cls_id: State(cls_id=cls_id, name=f"S{cls_id}", is_resettable=cls_id % 3 != 0) for cls_id in range(-2, 10)}
+RESETTABLE = {cls_id for cls_id, state in STATES.items() if state.is_resettable}
+
+
+def _live(counters: dict) -> dict:
+    return {cls_id: count for cls_id, count in counters.items() if count}
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("counters_cls", [StableStateCounters, SparseStateCounters])
+def test_counters_match_reference_with_epoch_resets(counters_cls, seed):
+    rnd = random.Random(seed)
+    counters, reference = counters_cls(STATES), dict.fromkeys(STATES, 0)
+    held = []
+    for _ in range(3000):
+        op, cls_id = rnd.random(), rnd.choice(tuple(STATES))
+        except_id = rnd.choice((None, cls_id))
+        if op < 0.7:
+            count = rnd.randint(1, 3)
+            reference[cls_id] += count
+            assert counters.increment(cls_id, count) == reference[cls_id]
+        elif op < 0.8:
+            counters.reset_resettable(except_id)
+            reference.update({i: 0 for i in RESETTABLE if i != except_id})
+        elif op < 0.85:
+            counters.reset_all()
+            reference = dict.fromkeys(STATES, 0)
+        elif op < 0.9:
+            counters.reset_all_except(cls_id)
+            reference = {i: count if i == cls_id else 0 for i, count in reference.items()}
+        elif op < 0.95:
+            ids = rnd.sample(tuple(STATES), 4)
+            counters.reset_many(ids, except_id)
+            reference.update({i: 0 for i in ids if i != except_id})
+        else:
+            counters.reset(cls_id)
+            reference[cls_id] = 0
+        assert all(counters.get(i) == reference[i] for i in STATES)
+        if rnd.random() < 0.3:
+            held.append((counters.snapshot(), _live(reference)))
+    assert _live(counters.as_dict()) == _live(reference)
+    # Снимки, прочитанные после всех сбросов, видят значения на момент снимка
+    assert all(_live(snapshot.as_dict()) == expected for snapshot, expected in held)
+
+
+def test_reset_resettable_does_not_touch_buffers():
+    counters = StableStateCounters(STATES)
+    for cls_id in STATES:
+        counters.increment(cls_id, 5)
+    values = counters._values.tolist()
+    counters.reset_resettable(except_id=1)
+    assert counters._values.tolist() == values
+    assert {cls_id: counters.get(cls_id) for cls_id in STATES} == {
+        cls_id: 5 if cls_id == 1 or cls_id not in RESETTABLE else 0 for cls_id in STATES
+    }
+
+
+@pytest.mark.parametrize("counters_mode", ["dense", "sparse"])
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_fsm_reset_matches_fresh_fsm(make_config, n_classes, pids, counters_mode):
+    manager = FsmManager({**make_config(), "COUNTERS_MODE": counters_mode})
+    used = manager.create_fsm()
+    events = make_events(seed=3, n_classes=n_classes, pids=pids, length=600)
+    for kind, payload in events:
+        if kind == "cls":
+            used.process_state(payload)
+    manager.reset_all()
+
+    fresh = manager.create_fsm()
+    for kind, payload in events:
+        if kind == "switch":
+            used.switch_profile_by_pid(payload)
+            fresh.switch_profile_by_pid(payload)
+        else:
+            assert result_snapshot(used.process_state(payload)) == result_snapshot(fresh.process_state(payload))
@@ -0,0 +1,49 @@
+import dataclasses
+import os
+import pickle
+import subprocess
+import sys
+
+from neuro_fsm import FsmManager
+from neuro_fsm.core.states import State
+from tests.test_configs.differential_cfg import profiles_config
+
+
+def test_hash_is_not_a_field():
+    state = State(cls_id=3, name="FULL", stable_min_lim=5)
+    assert hash(state) == hash((3, "FULL"))
+    assert "_hash" not in {field.name for field in dataclasses.fields(State)}
+    assert "_hash" not in dataclasses.asdict(state)
+    assert state == dataclasses.replace(state, stable_min_lim=7) and hash(state) == hash(dataclasses.replace(state))
+
+
+def test_pickled_state_is_rehashed_in_another_process():
+    # Хэш str зависит от PYTHONHASHSEED: словарь с ключами State, собранный в другом процессе, должен работать здесь
+    code = (
+        "import pickle, sys\n"
+        "from neuro_fsm.core.states import State\n"
+        "state = State(cls_id=1, name='EMPTY')\n"
+        "sys.stdout.buffer.write(pickle.dumps((state, {state: 5})))\n"
+    )
+    env = {**os.environ, "PYTHONHASHSEED": "12345",
+           "PYTHONPATH": os.pathsep.join([os.path.abspath(p) for p in sys.path if p.endswith("src")] +
+                                         [os.environ.get("PYTHONPATH", "")])}
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, check=True).stdout
+    state, counters = pickle.loads(output)
+
+    local = State(cls_id=1, name="EMPTY")
+    assert hash(state) == hash(local)
+    assert counters[local] == 5 and counters.get(state) == 5
+
+
+def test_states_shared_across_profiles_and_fsms():
+    manager = FsmManager(profiles_config())
+    first, second = manager.create_fsm(), manager.create_fsm()
+    profiles = first._profile_manager.profiles
+    # Переопределения профиля создают свои State, остальные — общие для всех профилей
+    unknown = {id(profile.states[3]) for profile in profiles.values()}
+    assert len(unknown) == 1
+    for name, profile in profiles.items():
+        other = second._profile_manager.profiles[name]
+        assert all(other.states[cls_id] is state for cls_id, state in profile.states.items())
+        assert other.table is profile.table
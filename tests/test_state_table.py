@@ -0,0 +1,61 @@
+import math
+
+import pytest
+
+from neuro_fsm import FsmManager
+from neuro_fsm.core.states import State, StateTable
+from tests.test_configs.differential_cfg import DIFFERENTIAL_CASES
+
+
+def _states(*states: State) -> dict[int, State]:
+    return {state.cls_id: state for state in states}
+
+
+def test_table_matches_state_attributes_with_negative_and_sparse_ids():
+    states = _states(
+        State(cls_id=-2, name="NONE", stable_min_lim=-1, is_resettable=True, is_breaker=True),
+        State(cls_id=0, name="EMPTY", stable_min_lim=5, is_resettable=False, threshold=0.4),
+        State(cls_id=3, name="FULL", stable_min_lim=None, is_resetter=True, threshold=0.7),
+        State(cls_id=4, name="FULL_ALIAS", stable_min_lim=2, alias_of=3),
+    )
+    table = StateTable(states)
+
+    assert table.offset == -2 and len(table.states) == 7 and len(table) == 4
+    assert table.all_ids == (-2, 0, 3, 4)
+    assert table.resettable_ids == (-2, 3, 4)
+    for cls_id, state in states.items():
+        assert cls_id in table
+        assert table.state(cls_id) is state
+        assert table.states[table.index(cls_id)] is state
+        assert table.stable_lim(cls_id) == (state.stable_min_lim if (state.stable_min_lim or 0) > 0 else 0)
+        assert table.is_resettable(cls_id) == state.is_resettable
+        assert table.is_resetter(cls_id) == state.is_resetter
+        assert table.is_breaker(cls_id) == state.is_breaker
+        assert table.base_id(cls_id) == state.get_base_cls_id()
+        assert table.threshold(cls_id) == state.threshold
+    for missing in (-3, -1, 1, 2, 5):
+        assert missing not in table
+        with pytest.raises(KeyError):
+            table.index(missing)
+
+
+def test_score_thresholds_block_unconfigured_columns():
+    table = StateTable(_states(State(cls_id=0, name="A", threshold=0.3), State(cls_id=2, name="B", threshold=0.6)))
+    vector = table.score_thresholds(4)
+    assert vector.tolist() == [0.3, math.inf, 0.6, math.inf]
+    assert table.score_thresholds(4) is vector and not vector.flags.writeable
+
+
+@pytest.mark.parametrize("make_config, n_classes, pids", DIFFERENTIAL_CASES)
+def test_profile_tables_agree_with_profile_states(make_config, n_classes, pids):
+    manager = FsmManager(make_config())
+    fsm = manager.create_fsm()
+    for name in fsm._profile_manager.profile_names:
+        profile = fsm._profile_manager.profiles[name]
+        for cls_id, state in profile.states.items():
+            assert profile.table.state(cls_id) is state
+            assert profile.table.is_resetter(cls_id) == state.is_resetter
+            assert profile.table.is_breaker(cls_id) == state.is_breaker
+        # Одинаковые наборы State разделяют одну таблицу (в том числе между FSM менеджера)
+        other = manager.create_fsm()._profile_manager.profiles[name]
+        assert other.table is profile.table